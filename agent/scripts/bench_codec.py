@@ -0,0 +1,159 @@
+"""
+Benchmark the payload codec on strategy and chat history payloads.
+
+Encodes and decodes synthetic payloads shaped like the ones the flows write:
+the strategy `parameters` sent to the REST API, the full `StrategyData` sent
+to the RAG API, and the native form of a multi-stage chat history. Reports
+encode/decode throughput and payload size for every format whose library is
+installed.
+
+Usage:
+    python -m scripts.bench_codec [--strategies 200] [--messages 12] [--repeat 5]
+"""
+
+import argparse
+import dataclasses
+import random
+import time
+from typing import Any, Callable, Dict, List
+
+from src import codec
+from src.datatypes import StrategyData
+from src.types import ChatHistory, Message
+
+
+def synthesize_text(rng: random.Random, words: int) -> str:
+    vocabulary = [
+        "ETH", "USDC", "swap", "price", "liquidity", "the", "0x7d1afa7b718fb893db30a3abc0cfc608aacfebb0",
+        "volume", "24h", "trend", "buy", "sell", "of", "is", "token", "balance", "\n",
+    ]
+    return " ".join(rng.choice(vocabulary) for _ in range(words))
+
+
+def synthesize_strategy(rng: random.Random, index: int) -> StrategyData:
+    """
+    Build a strategy shaped like the ones `assisted_flow` saves.
+
+    Args:
+        rng (random.Random): Seeded generator
+        index (int): Index of the strategy, used in its id
+
+    Returns:
+        StrategyData: The strategy
+    """
+    metric_state = str(
+        {
+            "eth_balance": rng.random(),
+            "token_balances": [
+                {"symbol": "USDC", "balance": rng.random() * 1000, "value_usd": rng.random() * 1000}
+                for _ in range(4)
+            ],
+        }
+    )
+    return StrategyData(
+        strategy_id=f"strategy-{index:06d}",
+        agent_id="agent-000001",
+        summarized_desc=synthesize_text(rng, 60),
+        full_desc=synthesize_text(rng, 600),
+        parameters={
+            "apis": ["Coingecko (env variables COINGECKO_API_KEY)", "DuckDuckGo"],
+            "trading_instruments": ["spot"],
+            "metric_name": "wallet",
+            "start_metric_state": metric_state,
+            "end_metric_state": metric_state,
+            "summarized_state_change": synthesize_text(rng, 80),
+            "summarized_code": synthesize_text(rng, 150),
+            "code_output": synthesize_text(rng, 200),
+            "prev_strat": synthesize_text(rng, 60),
+        },
+        strategy_result=rng.choice(["success", "failed"]),
+    )
+
+
+def synthesize_chat_history(rng: random.Random, messages: int) -> ChatHistory:
+    ch = ChatHistory(Message(role="system", content=synthesize_text(rng, 80)))
+    for i in range(messages):
+        ch = ch.append(
+            Message(
+                role="user" if i % 2 == 0 else "assistant",
+                content=synthesize_text(rng, 400),
+            )
+        )
+    return ch
+
+
+def measure(
+    fn: Callable[[Any], Any], values: List[Any], repeat: int
+) -> float:
+    """
+    Time a function over every value, keeping the fastest of `repeat` runs.
+
+    Returns:
+        float: Microseconds per value
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for value in values:
+            fn(value)
+        best = min(best, time.perf_counter() - started)
+    return best / len(values) * 1e6
+
+
+def bench(name: str, values: List[Any], repeat: int) -> List[Dict[str, Any]]:
+    rows = []
+    baseline_size = None
+    for fmt in codec.PAYLOAD_FORMATS:
+        try:
+            codec.check_format(fmt)
+        except ValueError as e:
+            print(f"{name}: skipping {fmt}, {e}")
+            continue
+
+        payloads = [codec.encode(value, fmt) for value in values]  # type: ignore
+        assert [codec.decode(p) for p in payloads] == values, f"{fmt} did not round-trip"
+
+        size = sum(len(p.encode()) for p in payloads) / len(payloads)
+        baseline_size = baseline_size or size
+        rows.append(
+            {
+                "payload": name,
+                "format": fmt,
+                "encode_us": measure(lambda v: codec.encode(v, fmt), values, repeat),  # type: ignore
+                "decode_us": measure(codec.decode, payloads, repeat),
+                "size": size,
+                "size_ratio": size / baseline_size,
+            }
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--strategies", type=int, default=200)
+    parser.add_argument("--messages", type=int, default=12, help="Messages per chat history")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    strategies = [synthesize_strategy(rng, i) for i in range(args.strategies)]
+    histories = [
+        synthesize_chat_history(rng, args.messages).as_native()
+        for _ in range(max(1, args.strategies // 10))
+    ]
+
+    rows = []
+    rows += bench("parameters", [s.parameters for s in strategies], args.repeat)
+    rows += bench("strategy_data", [dataclasses.asdict(s) for s in strategies], args.repeat)
+    rows += bench("chat_history", histories, args.repeat)
+
+    print(f"{'payload':<14} {'format':<8} {'encode us':>10} {'decode us':>10} {'bytes':>9} {'vs json':>8}")
+    for row in rows:
+        print(
+            f"{row['payload']:<14} {row['format']:<8} {row['encode_us']:>10.1f} "
+            f"{row['decode_us']:>10.1f} {row['size']:>9.0f} {row['size_ratio']:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Benchmark the orchestration overhead of the agent flows offline.
+
+Replays a cassette recorded during real cycles through `assisted_flow` (trading)
+or `unassisted_flow` (marketing). Genner, container and sensor calls are served
+from the cassette by `ReplayGenner`, `ReplayContainerManager` and `ReplaySensor`;
+the DB and RAG are in-memory no-ops. No LLM provider, Docker or chain is needed.
+
+Record a cassette by running a session with `AGENT_CASSETTE_PATH` set:
+
+    AGENT_CASSETTE_PATH=cassettes/trading.jsonl python -m scripts.main trading <session_id> <agent_id>
+
+The overhead of a cycle is its wall time minus the latency replayed from the
+cassette, so `--latency original` and `--latency zero` should report the same
+overhead; `zero` is faster to run.
+
+Usage:
+    python -m scripts.bench_flow cassettes/trading.jsonl [--latency zero] [--repeat 5]
+"""
+
+import argparse
+import statistics
+import time
+from functools import partial
+from typing import Any, Callable, Dict, List
+
+from loguru import logger
+
+from src.genner.Replay import ReplayGenner
+from src.helper import services_to_prompts
+from src.replay import (
+    Cassette,
+    ReplayContainerManager,
+    ReplaySensor,
+    cycle_args,
+)
+from src.summarizer import get_summarizer
+
+
+class OfflineDB:
+    """Accepts the flows' writes without a REST API."""
+
+    def insert_chat_history(self, *args: Any, **kwargs: Any) -> bool:
+        return True
+
+    def insert_strategy_and_result(self, *args: Any, **kwargs: Any) -> bool:
+        return True
+
+
+class OfflineRAG:
+    """Finds no related strategies, as a RAG with an empty index would."""
+
+    def relevant_strategy_raw(self, query: str) -> List:
+        return []
+
+
+class OfflineTools:
+    """Stands in for `ResearchTools`; `ReplayGenner` serves the recorded tool calls without running them."""
+
+
+def build_flow(cassette: Cassette) -> Callable:
+    """
+    Rebuild the recorded session's agent and flow around the replay stubs.
+
+    Args:
+        cassette (Cassette): Replaying cassette
+
+    Returns:
+        Callable: The flow, taking the previous strategy and notifications of a cycle
+    """
+    meta = cassette.meta
+    fe_data: Dict[str, Any] = meta["fe_data"]
+    apis = services_to_prompts(fe_data["research_tools"])
+    summarizer = get_summarizer(ReplayGenner(cassette, "genner:summarizer"))
+
+    components = dict(
+        agent_id=meta["agent_id"],
+        rag=OfflineRAG(),
+        db=OfflineDB(),
+        sensor=ReplaySensor(cassette),
+        genner=ReplayGenner(cassette, "genner:main"),
+        container_manager=ReplayContainerManager(cassette),
+    )
+
+    if meta["agent_type"] == "trading":
+        from src.agent.trading import TradingAgent, TradingPromptGenerator
+        from src.flows.trading import assisted_flow
+
+        agent = TradingAgent(
+            prompt_generator=TradingPromptGenerator(prompts=fe_data["prompts"]),
+            tools=OfflineTools() if meta.get("tool_mode") else None,  # type: ignore
+            **components,
+        )
+        flow = partial(
+            assisted_flow,
+            agent=agent,
+            session_id="replay",
+            role=fe_data["role"],
+            network=fe_data["network"],
+            time=fe_data["time"],
+            apis=apis,
+            trading_instruments=fe_data["trading_instruments"],
+            metric_name=fe_data["metric_name"],
+            txn_service_url=meta["txn_service_url"],
+            summarizer=summarizer,
+        )
+    else:
+        from src.agent.marketing import MarketingAgent, MarketingPromptGenerator
+        from src.flows.marketing import unassisted_flow
+
+        agent = MarketingAgent(
+            prompt_generator=MarketingPromptGenerator(fe_data["prompts"]),
+            **components,
+        )
+        flow = partial(
+            unassisted_flow,
+            agent=agent,
+            session_id="replay",
+            role=fe_data["role"],
+            time=fe_data["time"],
+            apis=apis,
+            metric_name=fe_data["metric_name"],
+            summarizer=summarizer,
+        )
+
+    return lambda prev_strat, notif_str: flow(prev_strat=prev_strat, notif_str=notif_str)
+
+
+def run_once(path: str, latency: str) -> Dict[str, Any]:
+    """
+    Replay every recorded cycle of a cassette once.
+
+    Args:
+        path (str): Path of the cassette
+        latency (str): "original" or "zero"
+
+    Returns:
+        Dict[str, Any]: Per-cycle wall and overhead seconds, and the replay statistics
+    """
+    cassette = Cassette.load(path, latency)  # type: ignore
+    flow = build_flow(cassette)
+
+    walls, overheads = [], []
+    for cycle in cassette.cycles:
+        replayed_before = cassette.replayed_latency_s
+        started = time.perf_counter()
+        flow(*cycle_args(cycle))
+        wall = time.perf_counter() - started
+        walls.append(wall)
+        overheads.append(wall - (cassette.replayed_latency_s - replayed_before))
+
+    return {
+        "walls": walls,
+        "overheads": overheads,
+        "served": cassette.served,
+        "mismatches": cassette.mismatches,
+        "remaining": {k: v for k, v in cassette.remaining().items() if v},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("cassette", help="Cassette recorded with AGENT_CASSETTE_PATH")
+    parser.add_argument("--latency", choices=["original", "zero"], default="zero")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--verbose", action="store_true", help="Keep the flows' logs")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logger.remove()
+
+    runs = [run_once(args.cassette, args.latency) for _ in range(args.repeat)]
+    overheads = [o for run in runs for o in run["overheads"]]
+    walls = [w for run in runs for w in run["walls"]]
+    if not walls:
+        print("No recorded cycles in the cassette")
+        return
+
+    last = runs[-1]
+    print(f"cycles replayed:   {len(walls)} ({len(runs[0]['walls'])} x {args.repeat})")
+    print(f"calls served/run:  {last['served']}")
+    print(f"input mismatches:  {last['mismatches']}")
+    if last["remaining"]:
+        print(f"calls not served:  {last['remaining']}")
+    print(f"wall/cycle:        mean {statistics.mean(walls) * 1e3:.2f} ms")
+    print(
+        f"overhead/cycle:    mean {statistics.mean(overheads) * 1e3:.2f} ms, "
+        f"min {min(overheads) * 1e3:.2f} ms, max {max(overheads) * 1e3:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Benchmark the OpenRouter SSE decoding path.
+
+Replays a recorded `text/event-stream` body through the previous str-buffer
+decoder and through `SSEDecoder`, split into network-sized chunks, and reports
+the CPU time spent per token.
+
+A recording is the raw response body of a streaming chat completion, e.g.:
+
+    curl -N https://openrouter.ai/api/v1/chat/completions \\
+        -H "Authorization: Bearer $KEY" -H "Content-Type: application/json" \\
+        -d '{"model": "deepseek/deepseek-r1", "stream": true, ...}' > r1.sse
+
+Without `--recording`, a synthetic 100k-token reasoning stream in the same
+format is generated (use `--save` to keep it for later runs).
+
+Usage:
+    python -m scripts.bench_sse [--recording r1.sse] [--tokens 100000] [--chunk-sizes 64 1024 16384]
+"""
+
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+from src.client.sse import SSEDecoder
+from src.client.sse import loads as sse_loads
+
+
+def synthesize_stream(tokens: int, reasoning_ratio: float = 0.8) -> bytes:
+    """
+    Build an OpenRouter-style SSE body with the given number of token events.
+
+    Args:
+        tokens (int): Number of token events to generate
+        reasoning_ratio (float): Share of tokens sent as reasoning before the content
+
+    Returns:
+        bytes: The stream body, terminated by `data: [DONE]`
+    """
+    rng = random.Random(0)
+    words = ["the", " price", " of", " ETH", " is", " likely", " to", " swap", " 0x", "USDC", "\n"]
+    reasoning_tokens = int(tokens * reasoning_ratio)
+
+    parts: List[bytes] = [b": OPENROUTER PROCESSING\n\n"]
+    for i in range(tokens):
+        field = "reasoning" if i < reasoning_tokens else "content"
+        chunk = {
+            "id": "gen-1740000000-abcdefghijklmnop",
+            "provider": "DeepSeek",
+            "model": "deepseek/deepseek-r1",
+            "object": "chat.completion.chunk",
+            "created": 1740000000,
+            "choices": [
+                {
+                    "index": 0,
+                    "delta": {"role": "assistant", "content": "", field: rng.choice(words)},
+                    "finish_reason": None,
+                    "native_finish_reason": None,
+                    "logprobs": None,
+                }
+            ],
+        }
+        parts.append(b"data: " + json.dumps(chunk).encode() + b"\n\n")
+        if i % 500 == 0:
+            parts.append(b": OPENROUTER PROCESSING\n\n")
+    parts.append(b"data: [DONE]\n\n")
+
+    return b"".join(parts)
+
+
+def chunked(body: bytes, size: int) -> Iterator[bytes]:
+    for i in range(0, len(body), size):
+        yield body[i : i + size]
+
+
+def legacy_decode(chunks: Iterator[bytes]) -> Iterator[Tuple[str, str]]:
+    """The decoding loop `OpenRouter._stream_response` used before `SSEDecoder`."""
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk.decode("utf-8")
+        while "\n" in buffer:
+            line_end = buffer.find("\n")
+            line = buffer[:line_end].strip()
+            buffer = buffer[line_end + 1 :]
+            if line.startswith(": OPENROUTER PROCESSING"):
+                continue
+            if line.startswith("data: "):
+                data = line[6:]
+                if data == "[DONE]":
+                    return
+                try:
+                    data_obj = json.loads(data)
+                    if "choices" in data_obj and data_obj["choices"]:
+                        delta = data_obj["choices"][0].get("delta", {})
+                        if delta.get("reasoning") is not None:
+                            yield (delta["reasoning"], "reasoning")
+                        elif delta.get("content") is not None:
+                            yield (delta["content"], "main")
+                except json.JSONDecodeError:
+                    pass
+
+
+def sse_decode(chunks: Iterator[bytes]) -> Iterator[Tuple[str, str]]:
+    """The decoding loop `OpenRouter._stream_response` uses now."""
+    decoder = SSEDecoder()
+    for chunk in chunks:
+        for event in decoder.feed(chunk):
+            if event.data == b"[DONE]":
+                return
+            try:
+                data_obj = sse_loads(event.data)
+            except ValueError:
+                continue
+            if not data_obj.get("choices"):
+                continue
+            delta = data_obj["choices"][0].get("delta", {})
+            if delta.get("reasoning") is not None:
+                yield (delta["reasoning"], "reasoning")
+            elif delta.get("content") is not None:
+                yield (delta["content"], "main")
+
+
+def measure(decode, body: bytes, chunk_size: int, repeats: int) -> Tuple[float, int]:
+    """
+    Get the best CPU time over several replays, and the number of tokens decoded.
+
+    Args:
+        decode: Decoding function taking an iterator of chunks
+        body (bytes): The recorded stream body
+        chunk_size (int): Bytes per replayed network chunk
+        repeats (int): Number of replays
+
+    Returns:
+        Tuple[float, int]: Best CPU seconds and the number of yielded tokens
+    """
+    best = float("inf")
+    tokens = 0
+    for _ in range(repeats):
+        started = time.process_time()
+        tokens = sum(1 for _ in decode(chunked(body, chunk_size)))
+        best = min(best, time.process_time() - started)
+    return best, tokens
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--recording", type=Path, help="Raw SSE body to replay")
+    parser.add_argument("--tokens", type=int, default=100_000)
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[64, 1024, 16384, 65536])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--save", type=Path, help="Write the synthetic stream here")
+    args = parser.parse_args()
+
+    if args.recording:
+        body = args.recording.read_bytes()
+        source = str(args.recording)
+    else:
+        body = synthesize_stream(args.tokens)
+        source = f"synthetic {args.tokens} tokens"
+        if args.save:
+            args.save.write_bytes(body)
+
+    print(f"Stream: {source}, {len(body) / 1e6:.1f} MB")
+    print(f"{'chunk':>8} {'decoder':>8} {'tokens':>8} {'cpu s':>8} {'us/token':>9}")
+    for size in args.chunk_sizes:
+        results = {}
+        for name, decode in (("legacy", legacy_decode), ("sse", sse_decode)):
+            cpu, tokens = measure(decode, body, size, args.repeats)
+            results[name] = cpu
+            print(f"{size:>8} {name:>8} {tokens:>8} {cpu:>8.3f} {cpu / max(tokens, 1) * 1e6:>9.2f}")
+        print(f"{size:>8} {'speedup':>8} {results['legacy'] / results['sse']:>27.2f}x")
@@ -0,0 +1,88 @@
+"""
+OpenAI-compatible batching proxy in front of the local DeepSeek server.
+
+Every agent session is its own process, so requests from different sessions
+only meet in a shared front-end. This proxy puts a `LocalBatchQueue` between
+all sessions and the local llama.cpp-style server: requests are ordered by the
+`X-Priority` header the genners send (trading code ahead of summaries), sent to
+the server's parallel slots, and identical requests in flight are coalesced.
+
+Point the agents at the proxy instead of the server:
+
+    DEEPSEEK_LOCAL_SERVICE_URL=http://localhost:8090/v1
+
+Environment:
+    LOCAL_BATCH_UPSTREAM_URL: URL of the local server, e.g. http://localhost:8080/v1
+    LOCAL_BATCH_SLOTS: Number of parallel slots the server runs with (`--parallel`), default 4
+    DEEPSEEK_LOCAL_API_KEY: API key of the local server
+
+Usage:
+    uvicorn scripts.local_batch_proxy:app --port 8090
+"""
+
+import os
+from typing import Any, Dict
+
+from dotenv import load_dotenv
+from fastapi import Body, FastAPI, Header
+from fastapi.responses import StreamingResponse
+from openai import OpenAI
+
+from src.client.batching import DEFAULT_PRIORITY, LocalBatchQueue
+
+load_dotenv()
+
+LOCAL_BATCH_UPSTREAM_URL = os.getenv("LOCAL_BATCH_UPSTREAM_URL") or ""
+LOCAL_BATCH_SLOTS = int(os.getenv("LOCAL_BATCH_SLOTS") or 4)
+DEEPSEEK_LOCAL_API_KEY = os.getenv("DEEPSEEK_LOCAL_API_KEY") or ""
+
+batch_queue = LocalBatchQueue(
+    OpenAI(base_url=LOCAL_BATCH_UPSTREAM_URL, api_key=DEEPSEEK_LOCAL_API_KEY),
+    slots=LOCAL_BATCH_SLOTS,
+)
+
+app = FastAPI(title="Local DeepSeek batching proxy")
+
+
+def split_body(body: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Turn a request body into `chat.completions.create` arguments.
+
+    Fields the OpenAI client does not know about (e.g. llama.cpp sampling
+    options) are forwarded untouched through `extra_body`.
+    """
+    body = dict(body)
+    kwargs = {
+        "model": body.pop("model", ""),
+        "messages": body.pop("messages"),
+        "stream": body.pop("stream", False),
+    }
+    if body:
+        kwargs["extra_body"] = body
+    return kwargs
+
+
+@app.post("/v1/chat/completions")
+def chat_completions(
+    body: Dict[str, Any] = Body(...),
+    x_priority: int | None = Header(default=None),
+):
+    priority = DEFAULT_PRIORITY if x_priority is None else x_priority
+    kwargs = split_body(body)
+
+    if kwargs["stream"]:
+
+        def events():
+            for chunk in batch_queue.create(priority=priority, **kwargs):
+                yield f"data: {chunk.model_dump_json()}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return batch_queue.create(priority=priority, **kwargs).model_dump()
+
+
+@app.get("/stats")
+def stats():
+    """Queue depth and the wait/generation split per priority."""
+    return batch_queue.snapshot()
@@ -24,12 +24,16 @@ from src.db import APIDB
 from src.flows.marketing import unassisted_flow as marketing_unassisted_flow
 from src.flows.trading import assisted_flow as trading_assisted_flow
 from src.genner import get_genner
+from src.genner.Replay import RecordingGenner
 from src.helper import services_to_envs, services_to_prompts
 from src.manager import ManagerClient
 from src.client.rag import RAGClient
 from src.sensor.marketing import MarketingSensor
 from src.sensor.trading import TradingSensor
+from src.replay import Cassette, record_session
 from src.summarizer import get_summarizer
+from src.telemetry import Telemetry
+from src.tools import ResearchTools
 from src.twitter import TweepyTwitterClient
 from src.client.openrouter import OpenRouter
 
@@ -73,11 +77,17 @@ RAG_SERVICE_URL            = os.getenv("RAG_SERVICE_URL") or ""
 # Our services keys
 MANAGER_SERVICE_API_KEY = os.getenv("MANAGER_SERVICE_URL") or ""
 DB_SERVICE_API_KEY = os.getenv("DB_SERVICE_API_KEY") or ""
+DB_SERVICE_HTTP2 = (os.getenv("DB_SERVICE_HTTP2") or "").lower() in ("1", "true", "yes")
 DEEPSEEK_LOCAL_API_KEY = os.getenv("DEEPSEEK_LOCAL_API_KEY") or ""
 VAULT_API_KEY = os.getenv("VAULT_API_KEY") or ""
 TXN_SERVICE_API_KEY = os.getenv("TXN_SERVICE_API_KEY") or ""
 RAG_SERVICE_API_KEY = os.getenv("RAG_SERVICE_API_KEY") or ""
 
+# Record the session's LLM and container calls for offline replay (scripts/bench_flow.py)
+AGENT_CASSETTE_PATH = os.getenv("AGENT_CASSETTE_PATH") or ""
+AGENT_PAYLOAD_FORMAT = os.getenv("AGENT_PAYLOAD_FORMAT") or "json"
+AGENT_TOOL_MODE = (os.getenv("AGENT_TOOL_MODE") or "").lower() in ("1", "true", "yes")
+
 # Clients Setup
 deepseek_or_client = OpenRouter(
     base_url="https://openrouter.ai/api/v1",
@@ -112,7 +122,12 @@ def setup_trading_agent_flow(
 
     in_con_env = services_to_envs(services_used)
     apis = services_to_prompts(services_used)
-    db = APIDB(base_url=DB_SERVICE_URL, api_key=DB_SERVICE_API_KEY)
+    db = APIDB(
+        base_url=DB_SERVICE_URL,
+        api_key=DB_SERVICE_API_KEY,
+        payload_format=AGENT_PAYLOAD_FORMAT,  # type: ignore
+        http2=DB_SERVICE_HTTP2,
+    )
     if fe_data["model"] == "deepseek":
         fe_data["model"] = "deepseek_or"
 
@@ -142,9 +157,19 @@ def setup_trading_agent_flow(
     rag = RAGClient(
         session_id=session_id,
         agent_id=agent_id,
+        payload_format=AGENT_PAYLOAD_FORMAT,  # type: ignore
     )
     rag.save_result_batch(previous_strategies)
 
+    tools = None
+    if AGENT_TOOL_MODE:
+        tools = ResearchTools(
+            sensor=sensor,
+            db=db,
+            notif_sources=notif_sources,
+            coingecko_api_key=COINGECKO_API_KEY,
+        )
+
     agent = TradingAgent(
         agent_id=agent_id,
         sensor=sensor,
@@ -153,6 +178,7 @@ def setup_trading_agent_flow(
         prompt_generator=prompt_generator,
         db=db,
         rag=rag,
+        tools=tools,
     )
 
     flow_func = partial(
@@ -191,7 +217,12 @@ def setup_marketing_agent_flow(
 
     in_con_env = services_to_envs(services_used)
     apis = services_to_prompts(services_used)
-    db = APIDB(base_url=DB_SERVICE_URL, api_key=DB_SERVICE_API_KEY)
+    db = APIDB(
+        base_url=DB_SERVICE_URL,
+        api_key=DB_SERVICE_API_KEY,
+        payload_format=AGENT_PAYLOAD_FORMAT,  # type: ignore
+        http2=DB_SERVICE_HTTP2,
+    )
 
     auth = tweepy.OAuth1UserHandler(
         consumer_key=TWITTER_API_KEY,
@@ -235,6 +266,7 @@ def setup_marketing_agent_flow(
     rag = RAGClient(
         session_id=session_id,
         agent_id=agent_id,
+        payload_format=AGENT_PAYLOAD_FORMAT,  # type: ignore
     )
     rag.save_result_batch(previous_strategies)
 
@@ -276,7 +308,12 @@ if __name__ == "__main__":
         session_id = sys.argv[2]
         agent_id = sys.argv[3]
 
-    db = APIDB(base_url=DB_SERVICE_URL, api_key=DB_SERVICE_API_KEY)
+    db = APIDB(
+        base_url=DB_SERVICE_URL,
+        api_key=DB_SERVICE_API_KEY,
+        payload_format=AGENT_PAYLOAD_FORMAT,  # type: ignore
+        http2=DB_SERVICE_HTTP2,
+    )
 
     try:
         session = db.create_agent_session(session_id, agent_id, datetime.now().isoformat(), "running")
@@ -294,7 +331,7 @@ if __name__ == "__main__":
         print(f"No session found, using default session_interval: {session_interval}")
         # Add other default values for any other session properties used later
     else:
-        session_interval = session.get("data", {}).get("session_interval", 15)
+        session_interval = session.get("session_interval", 15)
 
     if session is not None:
         db.update_agent_session(session_id, agent_id, "running")
@@ -306,24 +343,50 @@ if __name__ == "__main__":
             status="running",
         )
 
+    telemetry = Telemetry(session_id, db)
+
     fe_data = manager_client.fetch_fe_data(agent_type)
     db.update_agent_session(session_id, agent_id, "running", json.dumps(fe_data))
     logger.info(f"Running {agent_type} agent for session {session_id}")
 
+    cassette = None
+    if AGENT_CASSETTE_PATH:
+        cassette = Cassette.create(AGENT_CASSETTE_PATH)
+        cassette.record_meta(
+            agent_type=agent_type,
+            agent_id=agent_id,
+            txn_service_url=TXN_SERVICE_URL,
+            tool_mode=AGENT_TOOL_MODE,
+            fe_data={
+                k: v for k, v in fe_data.items() if k != "twitter_access_token"
+            },
+        )
+        summarizer_genner = RecordingGenner(
+            summarizer_genner, cassette, "genner:summarizer"
+        )
+
     if agent_type == "trading":
         agent, notif_sources, flow = setup_trading_agent_flow(
             fe_data, session_id, agent_id
         )
+        if cassette is not None:
+            flow = record_session(agent, flow, cassette)
+        agent.genner.prepare(session_interval)
+        summarizer_genner.prepare(session_interval)
+        agent.genner.set_telemetry(telemetry)
+        summarizer_genner.set_telemetry(telemetry)
         delay_between_cycle = 60
 
         flow(None, None)
+        telemetry.flush()
+        logger.info(APIDB.format_stats(db.pop_stats(), agent.db.pop_stats()))
         logger.info(f"Waiting for {session_interval} seconds before starting a new cycle...")
         time.sleep(session_interval)
 
         while True:
             db.add_cycle_count(session_id, agent_id)
             session = agent.db.get_agent_session(session_id, agent_id)
-            if session and session.get("data", {}).get("status") == "stopping":
+            if session and session.get("status") == "stopping":
                 agent.db.update_agent_session(session_id, agent_id, "stopped")
                 sys.exit()
 
@@ -340,6 +403,8 @@ if __name__ == "__main__":
             logger.info("Added the previous strat onto the RAG manager")
 
             flow(prev_strat, current_notif)
+            telemetry.flush()
+            logger.info(APIDB.format_stats(db.pop_stats(), agent.db.pop_stats()))
 
             logger.info(f"Waiting for {session_interval} seconds before starting a new cycle...")
             time.sleep(session_interval)
@@ -348,16 +413,24 @@ if __name__ == "__main__":
         agent, notif_sources, flow = setup_marketing_agent_flow(
             fe_data, session_id, agent_id
         )
+        if cassette is not None:
+            flow = record_session(agent, flow, cassette)
+        agent.genner.prepare(session_interval)
+        summarizer_genner.prepare(session_interval)
+        agent.genner.set_telemetry(telemetry)
+        summarizer_genner.set_telemetry(telemetry)
         delay_between_cycle = 60
 
         flow(None, None)
+        telemetry.flush()
+        logger.info(APIDB.format_stats(db.pop_stats(), agent.db.pop_stats()))
         logger.info(f"Waiting for {session_interval} seconds before starting a new cycle...")
         time.sleep(session_interval)
 
         while True:
             db.add_cycle_count(session_id, agent_id)
             session = agent.db.get_agent_session(session_id, agent_id)
-            if session and session.get("data", {}).get("status") == "stopping":
+            if session and session.get("status") == "stopping":
                 agent.db.update_agent_session(session_id, agent_id, "stopped")
                 sys.exit()
 
@@ -384,6 +457,8 @@ if __name__ == "__main__":
             logger.info("Added the previous strat onto the RAG manager")
 
             flow(prev_strat, current_notif)
+            telemetry.flush()
+            logger.info(APIDB.format_stats(db.pop_stats(), agent.db.pop_stats()))
 
             logger.info(f"Waiting for {session_interval} seconds before starting a new cycle...")
             time.sleep(session_interval)
@@ -1,3 +1,4 @@
+import json
 import re
 from textwrap import dedent
 from typing import Dict, List, Set, Tuple
@@ -10,6 +11,7 @@ from src.db import APIDB
 from src.genner.Base import Genner
 from src.client.rag import RAGClient
 from src.sensor.trading import TradingSensor
+from src.tools import ResearchTools, research_tools
 from src.types import ChatHistory, Message
 
 
@@ -372,6 +374,56 @@ class TradingPromptGenerator:
         """
         return self.prompts["address_research_code_prompt"].format()
 
+    def generate_research_tools_prompt(
+        self,
+        notifications_str: str,
+        prev_strategy: str,
+        rag_summary: str,
+        before_metric_state: str,
+        after_metric_state: str,
+        network: str,
+    ) -> str:
+        """
+        Generate a prompt for researching the market by calling tools.
+
+        Args:
+                notifications_str (str): String containing recent notifications
+                prev_strategy (str): Description of the previous strategy
+                rag_summary (str): Summary from retrieval-augmented generation
+                before_metric_state (str): State of the metric before strategy execution
+                after_metric_state (str): State of the metric after strategy execution
+                network (str): Blockchain network being used
+
+        Returns:
+                str: Formatted prompt for tool-based research
+        """
+        return self.prompts["research_tools_prompt"].format(
+            notifications_str=notifications_str,
+            prev_strategy=prev_strategy,
+            rag_summary=rag_summary,
+            before_metric_state=before_metric_state,
+            after_metric_state=after_metric_state,
+            network=network,
+        )
+
+    def generate_address_research_tools_prompt(
+        self, strategy_output: str, network: str
+    ) -> str:
+        """
+        Generate a prompt for looking up token addresses by calling tools.
+
+        Args:
+                strategy_output (str): Output from the strategy formulation
+                network (str): Blockchain network being used
+
+        Returns:
+                str: Formatted prompt for tool-based address research
+        """
+        return self.prompts["address_research_tools_prompt"].format(
+            strategy_output=strategy_output,
+            network=network,
+        )
+
     def generate_trading_code_prompt(
         self,
         strategy_output: str,
@@ -568,6 +620,47 @@ class TradingPromptGenerator:
             
             main()
             ```
+        """).strip(),
+            #
+            #
+            #
+            "research_tools_prompt": dedent("""
+            Here is what is going on in your environment right now :
+            <LatestNotification>
+            {notifications_str}
+            </LatestNotification>
+            Your current strategy is:
+            <PrevStrategy>
+            {prev_strategy}
+            </PrevStrategy>
+            For reference, in the past when you encountered a similar situation you reasoned as follows:
+            <RAG>
+            {rag_summary}
+            </RAG>
+            The result of this RAG was
+            <BeforeStrategyExecution>
+            {before_metric_state}
+            </BeforeStrategyExecution>
+            <AfterStrategyExecution>
+            {after_metric_state}
+            </AfterStrategyExecution>
+            Use the tools you are given to research the state of the market on the {network} network and how best to react to it.
+            Call as many tools as you need, then write down everything you learnt: token names, CoinGecko ids, prices, price changes and your wallet balances.
+            DO NOT GENERATE CODE!
+        """).strip(),
+            #
+            #
+            #
+            "address_research_tools_prompt": dedent("""
+            This is your strategy:
+            <Strategy>
+            {strategy_output}
+            </Strategy>
+            Use the tools you are given to find the contract address on the {network} network of every token the strategy buys or sells.
+            For native token, on ethereum compatible chain (like ethereum, polygon, arbitrum, optimism, etc...) just use burn address 0x0000000000000000000000000000000000000000 or wrapped token like wrapped WETH 0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2
+            For solana compatible chain, just use burn address 1nc1nerator11111111111111111111111111111111 or wrapped SOL So11111111111111111111111111111111111111112.
+            Answer with one line per token, in the format SYMBOL: ADDRESS.
+            DO NOT GENERATE CODE!
         """).strip(),
             #
             #
@@ -840,6 +933,7 @@ class TradingAgent:
         genner: Genner,
         container_manager: ContainerManager,
         prompt_generator: TradingPromptGenerator,
+        tools: ResearchTools | None = None,
     ):
         """
         Initialize the trading agent with all required components.
@@ -852,6 +946,8 @@ class TradingAgent:
                 genner (Genner): Generator for creating code and strategies
                 container_manager (ContainerManager): Manager for code execution in containers
                 prompt_generator (TradingPromptGenerator): Generator for creating prompts
+                tools (ResearchTools | None): Research tools the model can call directly,
+                        or None to research only by generating code
         """
         self.agent_id = agent_id
         self.db = db
@@ -860,6 +956,7 @@ class TradingAgent:
         self.genner = genner
         self.container_manager = container_manager
         self.prompt_generator = prompt_generator
+        self.tools = tools
 
         self.chat_history = ChatHistory()
 
@@ -987,6 +1084,104 @@ class TradingAgent:
 
         return Ok((processed_codes[0], ctx_ch))
 
+    def _run_research_tools(
+        self, prompt: str, caller: str
+    ) -> Result[Tuple[str, ChatHistory], str]:
+        """
+        Answer a prompt by letting the model call the research tools.
+
+        Args:
+                prompt (str): The user prompt
+                caller (str): Name of the calling method, for error messages
+
+        Returns:
+                Result[Tuple[str, ChatHistory], str]: Success with the model's answer and a chat
+                        history holding the prompt, each tool call and the answer, or error message
+        """
+        if self.tools is None:
+            return Err(f"TradingAgent.{caller}, err: \nNo research tools configured")
+
+        ctx_ch = ChatHistory(Message(role="user", content=prompt))
+
+        gen_result = self.genner.run_tools(
+            self.chat_history + ctx_ch, research_tools, self.tools
+        )
+
+        if err := gen_result.err():
+            return Err(f"TradingAgent.{caller}, err: \n{err}")
+
+        response, records = gen_result.unwrap()
+        if not response.strip():
+            return Err(f"TradingAgent.{caller}, err: \nEmpty answer after calling tools")
+
+        for record in records:
+            ctx_ch = ctx_ch.append(
+                Message(
+                    role="tool",
+                    content=f"{record.name}({json.dumps(record.arguments)}) -> {record.output}",
+                )
+            )
+        ctx_ch = ctx_ch.append(Message(role="assistant", content=response))
+
+        return Ok((response, ctx_ch))
+
+    def gen_research_with_tools(
+        self,
+        notifications_str: str,
+        prev_strategy: str,
+        rag_summary: str,
+        before_metric_state: str,
+        after_metric_state: str,
+        network: str,
+    ) -> Result[Tuple[str, ChatHistory], str]:
+        """
+        Research the market by calling tools instead of generating research code.
+
+        Args:
+                notifications_str (str): String containing recent notifications
+                prev_strategy (str): Description of the previous strategy
+                rag_summary (str): Summary from retrieval-augmented generation
+                before_metric_state (str): State of the metric before strategy execution
+                after_metric_state (str): State of the metric after strategy execution
+                network (str): Blockchain network to operate on
+
+        Returns:
+                Result[Tuple[str, ChatHistory], str]: Success with the research findings and chat history,
+                        or error message
+        """
+        return self._run_research_tools(
+            self.prompt_generator.generate_research_tools_prompt(
+                notifications_str=notifications_str,
+                prev_strategy=prev_strategy,
+                rag_summary=rag_summary,
+                before_metric_state=before_metric_state,
+                after_metric_state=after_metric_state,
+                network=network,
+            ),
+            "gen_research_with_tools",
+        )
+
+    def gen_address_research_with_tools(
+        self, strategy_output: str, network: str
+    ) -> Result[Tuple[str, ChatHistory], str]:
+        """
+        Look up the token addresses of a strategy by calling tools instead of generating code.
+
+        Args:
+                strategy_output (str): Output from the strategy formulation
+                network (str): Blockchain network to operate on
+
+        Returns:
+                Result[Tuple[str, ChatHistory], str]: Success with the token addresses and chat history,
+                        or error message
+        """
+        return self._run_research_tools(
+            self.prompt_generator.generate_address_research_tools_prompt(
+                strategy_output=strategy_output, network=network
+            ),
+            "gen_address_research_with_tools",
+        )
+
     def gen_strategy(
         self,
         notifications_str: str,
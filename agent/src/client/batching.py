@@ -0,0 +1,280 @@
+import hashlib
+import itertools
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Dict, Generator, List, Optional
+
+from loguru import logger
+from openai import OpenAI
+
+# Lower runs first. Code that is about to be executed is what the session is
+# waiting on, summaries and first-pass research can wait for a free slot.
+STAGE_PRIORITY = {
+    "trading": 0,
+    "marketing": 0,
+    "address_research": 1,
+    "strategy": 1,
+    "research": 2,
+    "summarizer": 3,
+}
+DEFAULT_PRIORITY = 2
+# Lets the batching proxy read the priority off a plain OpenAI client's request
+PRIORITY_HEADER = "X-Priority"
+
+
+def stage_priority(stage: Optional[str]) -> int:
+    """
+    Get the queue priority of a flow stage.
+
+    Args:
+        stage (Optional[str]): Stage set on the genner, e.g. "trading"
+
+    Returns:
+        int: Priority, lower runs first
+    """
+    if stage is None:
+        return DEFAULT_PRIORITY
+    return STAGE_PRIORITY.get(stage, DEFAULT_PRIORITY)
+
+
+@dataclass(order=True)
+class _Job:
+    priority: int
+    seq: int
+    kwargs: Dict[str, Any] = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    future: Optional[Future] = field(default=None, compare=False)
+    sink: Optional[queue.Queue] = field(default=None, compare=False)
+    cancelled: threading.Event = field(default_factory=threading.Event, compare=False)
+    key: Optional[str] = field(default=None, compare=False)
+
+
+@dataclass
+class QueueStats:
+    """
+    Where the time of the requests at one priority went.
+
+    Attributes:
+        requests (int): Requests sent to the server
+        coalesced (int): Requests answered by an identical request already in flight
+        errors (int): Requests that failed
+        wait_s (float): Total seconds requests spent queued for a slot
+        generation_s (float): Total seconds requests spent on the server
+    """
+
+    requests: int = 0
+    coalesced: int = 0
+    errors: int = 0
+    wait_s: float = 0.0
+    generation_s: float = 0.0
+
+    def as_dict(self) -> Dict[str, float | int]:
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "avg_wait_s": self.wait_s / self.requests if self.requests else 0.0,
+            "avg_generation_s": (
+                self.generation_s / self.requests if self.requests else 0.0
+            ),
+        }
+
+
+class LocalBatchQueue:
+    """
+    Priority queue in front of a local llama.cpp-style OpenAI-compatible server.
+
+    Requests are queued by priority and sent by `slots` workers, one per server
+    slot (llama.cpp `--parallel`), so the server keeps every slot busy with
+    continuous batching instead of queueing connections itself in arrival order.
+    Identical non-streaming requests that are queued or running at the same time
+    are coalesced into a single server call. Each request's queue wait and
+    generation time are logged and aggregated per priority.
+    """
+
+    def __init__(self, client: OpenAI, slots: int = 4, cache_prompt: bool = True):
+        """
+        Initialize the queue and start its workers.
+
+        Args:
+            client (OpenAI): OpenAI client pointed at the local server
+            slots (int): Number of parallel slots the server was started with
+            cache_prompt (bool): Ask the server to reuse the KV cache of a slot
+                for the shared prompt prefix
+        """
+        self.client = client
+        self.slots = slots
+        self.cache_prompt = cache_prompt
+
+        self._queue: queue.PriorityQueue[_Job] = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._inflight: Dict[str, Future] = {}
+        self._stats: Dict[int, QueueStats] = {}
+        self._lock = threading.Lock()
+
+        self._workers: List[threading.Thread] = []
+        for i in range(slots):
+            worker = threading.Thread(
+                target=self._work, name=f"local-batch-{i}", daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def create(self, priority: int = DEFAULT_PRIORITY, **kwargs: Any) -> Any:
+        """
+        Create a chat completion through the queue.
+
+        Takes the same keyword arguments as `client.chat.completions.create`.
+
+        Args:
+            priority (int): Queue priority, lower runs first
+            **kwargs: Arguments for the completion
+
+        Returns:
+            Any: A `ChatCompletion`, or a generator of `ChatCompletionChunk` when `stream=True`
+        """
+        if kwargs.get("stream"):
+            return self._stream(priority, kwargs)
+        return self.submit(priority, **kwargs).result()
+
+    def submit(self, priority: int = DEFAULT_PRIORITY, **kwargs: Any) -> Future:
+        """
+        Queue a non-streaming chat completion.
+
+        Args:
+            priority (int): Queue priority, lower runs first
+            **kwargs: Arguments for `client.chat.completions.create`
+
+        Returns:
+            Future: Resolves to the `ChatCompletion`
+        """
+        key = hashlib.sha256(
+            json.dumps(kwargs, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+        with self._lock:
+            if key in self._inflight:
+                self._get_stats(priority).coalesced += 1
+                return self._inflight[key]
+
+            future: Future = Future()
+            self._inflight[key] = future
+
+        self._queue.put(
+            _Job(
+                priority=priority,
+                seq=next(self._seq),
+                kwargs=kwargs,
+                enqueued_at=time.monotonic(),
+                future=future,
+                key=key,
+            )
+        )
+        return future
+
+    def _stream(
+        self, priority: int, kwargs: Dict[str, Any]
+    ) -> Generator[Any, None, None]:
+        sink: queue.Queue = queue.Queue()
+        job = _Job(
+            priority=priority,
+            seq=next(self._seq),
+            kwargs=kwargs,
+            enqueued_at=time.monotonic(),
+            sink=sink,
+        )
+        self._queue.put(job)
+
+        try:
+            while True:
+                item = sink.get()
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Frees the slot if the consumer stops early
+            job.cancelled.set()
+
+    def _get_stats(self, priority: int) -> QueueStats:
+        if priority not in self._stats:
+            self._stats[priority] = QueueStats()
+        return self._stats[priority]
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if job.cancelled.is_set():
+                continue
+
+            started = time.monotonic()
+            ok = True
+            try:
+                kwargs = dict(job.kwargs)
+                if self.cache_prompt:
+                    kwargs["extra_body"] = {
+                        "cache_prompt": True,
+                        **(kwargs.get("extra_body") or {}),
+                    }
+
+                if job.sink is not None:
+                    stream = self.client.chat.completions.create(**kwargs)
+                    try:
+                        for chunk in stream:
+                            if job.cancelled.is_set():
+                                break
+                            job.sink.put(chunk)
+                    finally:
+                        stream.close()
+                    job.sink.put(None)
+                else:
+                    assert job.future is not None
+                    job.future.set_result(self.client.chat.completions.create(**kwargs))
+            except Exception as e:
+                ok = False
+                if job.sink is not None:
+                    job.sink.put(e)
+                elif job.future is not None:
+                    job.future.set_exception(e)
+            finally:
+                finished = time.monotonic()
+                self._record(job, started - job.enqueued_at, finished - started, ok)
+
+    def _record(self, job: _Job, wait: float, generation: float, ok: bool):
+        with self._lock:
+            if job.key is not None:
+                self._inflight.pop(job.key, None)
+
+            stats = self._get_stats(job.priority)
+            stats.requests += 1
+            stats.wait_s += wait
+            stats.generation_s += generation
+            if not ok:
+                stats.errors += 1
+
+        logger.info(
+            f"LocalBatchQueue: priority {job.priority} request waited {wait:.2f}s "
+            f"for a slot, generated in {generation:.2f}s"
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the queue depth and the wait/generation split per priority.
+
+        Returns:
+            Dict[str, Any]: Queue depth, slot count and per-priority statistics
+        """
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "slots": self.slots,
+                "priorities": {
+                    priority: stats.as_dict()
+                    for priority, stats in sorted(self._stats.items())
+                },
+            }
@@ -1,8 +1,21 @@
 import httpx
 import json
+import queue
+import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
 from typing import Optional, Dict, Generator, List, Any, Tuple, Union
 from dataclasses import dataclass
 
+from loguru import logger
+
+from src.client.routing import ProviderRouter
+from src.config import ReasoningConfig
+from src.client.sse import SSEDecoder
+from src.client.sse import loads as sse_loads
+
 
 @dataclass
 class Message:
@@ -16,6 +29,92 @@ class OpenRouterError(Exception):
     pass
 
 
+class _HedgeLeg:
+    """
+    One request of a hedged call, which the caller can abort from its own thread.
+
+    Closing an httpx response does not wake up the thread blocked reading it,
+    so `cancel` shuts down the socket of the response instead, which makes the
+    pending read fail right away.
+    """
+
+    def __init__(self):
+        self.cancelled = threading.Event()
+        # Provider and usage of the request once it completed, see `OpenRouter.last_usage`
+        self.usage: Dict[str, Any] = {}
+        self._response: Optional[httpx.Response] = None
+        self._lock = threading.Lock()
+
+    def attach(self, response: httpx.Response) -> None:
+        with self._lock:
+            self._response = response
+            if self.cancelled.is_set():
+                self._abort()
+
+    def detach(self) -> None:
+        # Under the lock, so a connection back in the pool is never shut down
+        with self._lock:
+            self._response = None
+
+    def cancel(self) -> None:
+        with self._lock:
+            self.cancelled.set()
+            if self._response is not None:
+                self._abort()
+
+    def _abort(self) -> None:
+        network_stream = self._response.extensions.get("network_stream")
+        if network_stream is None:
+            return
+        sock = network_stream.get_extra_info("socket")
+        if sock is None:
+            return
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+@contextmanager
+def _attached(leg: Optional[_HedgeLeg], response: httpx.Response):
+    """Let `leg` abort `response` while it is being read, nothing without a leg."""
+    if leg is None:
+        yield
+        return
+    leg.attach(response)
+    try:
+        yield
+    finally:
+        leg.detach()
+
+
+def reasoning_params(reasoning: ReasoningConfig) -> Dict[str, Any]:
+    """
+    Map reasoning controls to OpenRouter's unified `reasoning` parameter.
+
+    OpenRouter takes either a token budget or an effort level, so a set
+    `max_tokens` wins over `effort`. Models that cannot stop reasoning (e.g.
+    DeepSeek R1) still reason when it is disabled, but the reasoning is not
+    sent back.
+
+    Args:
+        reasoning (ReasoningConfig): Reasoning controls for the current stage
+
+    Returns:
+        Dict[str, Any]: Value for the `reasoning` field of the request
+    """
+    if not reasoning.enabled:
+        return {"enabled": False, "exclude": True}
+
+    params: Dict[str, Any] = {}
+    if reasoning.max_tokens is not None:
+        params["max_tokens"] = reasoning.max_tokens
+    elif reasoning.effort is not None:
+        params["effort"] = reasoning.effort
+
+    return params
+
+
 class OpenRouter:
     def __init__(
         self,
@@ -30,6 +129,9 @@ class OpenRouter:
         timeout: int = 60,
         model: str = "deepseek/deepseek-r1",
         include_reasoning: bool = True,
+        adaptive_routing: bool = True,
+        hedge: bool = False,
+        hedge_percentile: float = 0.95,
     ):
         """
         Initialize the OpenRouter client.
@@ -37,8 +139,12 @@ class OpenRouter:
         Args:
             api_key: Your OpenRouter API key
             base_url: The base URL for OpenRouter API
+            providers: Providers in their static preference order
             timeout: Request timeout in seconds
             include_reasoning: Whether to include reasoning tokens in streaming responses
+            adaptive_routing: Whether to reorder providers by observed TTFT, throughput and errors
+            hedge: Whether to send a second request to the next provider when the first is slow
+            hedge_percentile: Percentile of the observed latency to wait before hedging
         """
         self.api_key = api_key
         self.base_url = base_url.rstrip("/")
@@ -46,6 +152,12 @@ class OpenRouter:
         self.timeout = timeout
         self.include_reasoning = include_reasoning
         self.model = model
+        self.adaptive_routing = adaptive_routing
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.router = ProviderRouter(providers)
+        # Provider and usage of the most recently completed request
+        self.last_usage: Dict[str, Any] = {}
 
         # Create a client with explicit headers matching the working example
         self.headers = {
@@ -63,6 +175,7 @@ class OpenRouter:
         include_reasoning: Optional[bool] = None,
         max_tokens: Optional[int] = None,
         stream: bool = False,
+        reasoning: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """
         Prepare the payload for API requests.
@@ -78,6 +191,8 @@ class OpenRouter:
             include_reasoning (Optional[bool], optional): Whether to include reasoning. Defaults to None.
             max_tokens (Optional[int], optional): Maximum tokens to generate. Defaults to None.
             stream (bool, optional): Whether to stream the response. Defaults to False.
+            reasoning (Optional[Dict[str, Any]], optional): OpenRouter `reasoning` parameters,
+                replacing `include_reasoning` when given. Defaults to None.
 
         Returns:
             Dict[str, Any]: Formatted payload for the API request
@@ -89,15 +204,21 @@ class OpenRouter:
 
         payload = {
             "messages": processed_messages,
-            "provider": {"order": self.providers},
+            "provider": {"order": providers},
             "max_tokens": max_tokens,
             "include_reasoning": include_reasoning,
             "model": model,
             "stream": stream,
+            # Report reasoning tokens separately in the usage
+            "usage": {"include": True},
         }
 
         if not providers:
-            payload["provider"] = {"order": self.providers}
+            payload["provider"] = {
+                "order": self.router.order(model or self.model)
+                if self.adaptive_routing
+                else self.providers
+            }
 
         if temperature is not None:
             payload["temperature"] = temperature
@@ -105,7 +226,10 @@ class OpenRouter:
         if max_tokens is not None:
             payload["max_tokens"] = max_tokens
 
-        if include_reasoning is None:
+        if reasoning is not None:
+            payload["reasoning"] = reasoning
+            del payload["include_reasoning"]
+        elif include_reasoning is None:
             payload["include_reasoning"] = self.include_reasoning
 
         if model is None:
@@ -121,20 +245,29 @@ class OpenRouter:
         model: Optional[str] = None,
         include_reasoning: Optional[bool] = None,
         max_tokens: Optional[int] = None,
+        reasoning: Optional[Dict[str, Any]] = None,
     ) -> str:
         """
         Create a non-streaming chat completion.
 
+        The reasoning is not returned by this method, so it is not requested back
+        unless `include_reasoning` or `reasoning` explicitly ask for it.
+
         Args:
             messages: List of message dictionaries or Message objects
             model: The model to use (e.g., "openai/gpt-4o", "deepseek/deepseek-r1")
             temperature: Sampling temperature (0-2)
             max_tokens: Maximum tokens to generate
-            **kwargs: Additional parameters to pass to the API
+            reasoning: OpenRouter `reasoning` parameters, see `reasoning_params`
 
         Returns:
             The generated text response as a string
         """
+        if reasoning is not None:
+            reasoning = {"exclude": True, **reasoning}
+        elif include_reasoning is None:
+            include_reasoning = False
+
         payload = self._prepare_payload(
             messages=messages,
             temperature=temperature,
@@ -143,10 +276,16 @@ class OpenRouter:
             max_tokens=max_tokens,
             include_reasoning=include_reasoning,
             stream=False,
+            reasoning=reasoning,
         )
 
+        self.last_usage = {}
         endpoint = f"{self.base_url}/chat/completions"
-        response = self._send_request(endpoint, payload)
+        delay = self._hedge_delay(payload)
+        if delay is not None:
+            response = self._send_hedged_request(endpoint, payload, delay)
+        else:
+            response = self._send_request(endpoint, payload)
 
         try:
             content = response["choices"][0]["message"]["content"]
@@ -158,7 +297,72 @@ class OpenRouter:
         except (KeyError, IndexError) as e:
             raise OpenRouterError(f"Unexpected response format: {str(e)}")
 
-    def _send_request(self, endpoint: str, payload: Dict) -> Dict:
+    def create_tool_completion(
+        self,
+        messages: List[Dict],
+        tools: List[Dict[str, Any]],
+        tool_choice: Dict[str, Any] | str = "auto",
+        providers: List[str] = [],
+        temperature: Optional[float] = None,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        reasoning: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Create a non-streaming chat completion with tools the model can call.
+
+        Only providers that support every parameter of the request are used, so
+        the request is not routed to a provider that silently drops the tools.
+
+        Args:
+            messages: List of message dictionaries or Message objects
+            tools: Tool schemas in the OpenAI `tools` format
+            tool_choice: "auto", "required", or a specific function to call
+            model: The model to use
+            temperature: Sampling temperature (0-2)
+            max_tokens: Maximum tokens to generate
+            reasoning: OpenRouter `reasoning` parameters, see `reasoning_params`
+
+        Returns:
+            The assistant message, with its `content` and `tool_calls`
+        """
+        if reasoning is not None:
+            reasoning = {"exclude": True, **reasoning}
+
+        payload = self._prepare_payload(
+            messages=messages,
+            temperature=temperature,
+            providers=providers,
+            model=model,
+            max_tokens=max_tokens,
+            include_reasoning=False if reasoning is None else None,
+            stream=False,
+            reasoning=reasoning,
+        )
+        payload["tools"] = tools
+        payload["tool_choice"] = tool_choice
+        payload["provider"]["require_parameters"] = True
+
+        self.last_usage = {}
+        endpoint = f"{self.base_url}/chat/completions"
+        delay = self._hedge_delay(payload)
+        if delay is not None:
+            response = self._send_hedged_request(endpoint, payload, delay)
+        else:
+            response = self._send_request(endpoint, payload)
+
+        try:
+            message = response["choices"][0]["message"]
+        except (KeyError, IndexError) as e:
+            raise OpenRouterError(f"Unexpected response format: {str(e)}")
+
+        if not isinstance(message, dict):
+            raise OpenRouterError("Unexpected response format: message is not an object")
+        return message
+
+    def _send_request(
+        self, endpoint: str, payload: Dict, leg: Optional[_HedgeLeg] = None
+    ) -> Dict:
         """
         Send a regular (non-streaming) request to the API.
 
@@ -168,6 +372,8 @@ class OpenRouter:
         Args:
             endpoint (str): API endpoint URL
             payload (Dict): Request payload
+            leg (Optional[_HedgeLeg]): Set when this is one request of a hedged call,
+                it then keeps the usage instead of `last_usage`
 
         Returns:
             Dict: JSON response from the API
@@ -175,15 +381,18 @@ class OpenRouter:
         Raises:
             OpenRouterError: If an HTTP error or other exception occurs
         """
+        started = time.monotonic()
         try:
             # Exactly mirror the requests implementation that works
-            response = self.http_client.post(
+            with self.http_client.stream(
+                "POST",
                 endpoint,
                 headers=self.headers,
                 content=json.dumps(
                     payload
                 ),  # This is key - using content with json.dumps() instead of json=payload
-            )
+            ) as response, _attached(leg, response):
+                response.read()
 
             if response.status_code != 200:
                 error_text = response.text
@@ -191,12 +400,192 @@ class OpenRouter:
                     f"HTTP error {response.status_code}: {error_text}"
                 )
 
-            return response.json()
-        except httpx.HTTPError as e:
-            raise OpenRouterError(f"HTTP error occurred: {str(e)}")
+            data = response.json()
         except Exception as e:
+            if leg is not None and leg.cancelled.is_set():
+                # Aborted as the losing request of a hedged call, it was at least this slow
+                self._record(payload, None, started, None, 0, ok=True, censored=True)
+                raise OpenRouterError("Hedged request cancelled") from e
+            self._record(payload, None, started, None, 0, ok=False)
+            if isinstance(e, OpenRouterError):
+                raise
+            if isinstance(e, httpx.HTTPError):
+                raise OpenRouterError(f"HTTP error occurred: {str(e)}")
             raise OpenRouterError(f"Error occurred: {str(e)}")
 
+        usage = data.get("usage") or {}
+        self._record(
+            payload,
+            data.get("provider"),
+            started,
+            None,
+            usage.get("completion_tokens") or 0,
+            ok=True,
+        )
+        last_usage = self._log_usage(payload, data.get("provider"), usage)
+        if leg is None:
+            self.last_usage = last_usage
+        else:
+            leg.usage = last_usage
+        return data
+
+    def _send_hedged_request(self, endpoint: str, payload: Dict, delay: float) -> Dict:
+        """
+        Send a non-streaming request, hedging it if the first provider is slow.
+
+        The primary request goes out immediately. If it has not completed after
+        `delay` seconds, a second request is sent with the primary provider moved
+        to the end of the order, and whichever answers first successfully wins.
+        The losing request is aborted, and only the winner sets `last_usage`.
+
+        Args:
+            endpoint (str): API endpoint URL
+            payload (Dict): Request payload
+            delay (float): Seconds to wait before hedging
+
+        Returns:
+            Dict: JSON response from the first request to succeed
+
+        Raises:
+            OpenRouterError: If every issued request fails
+        """
+        legs = [_HedgeLeg(), _HedgeLeg()]
+        executor = ThreadPoolExecutor(max_workers=2)
+        try:
+            first = executor.submit(self._send_request, endpoint, payload, legs[0])
+            futures = {first: legs[0]}
+            done, pending = wait(futures, timeout=delay)
+
+            if not done or first.exception() is not None:
+                hedge = executor.submit(
+                    self._send_request, endpoint, self._hedge_payload(payload), legs[1]
+                )
+                futures[hedge] = legs[1]
+                pending.add(hedge)
+
+            error: BaseException | None = None
+            while done or pending:
+                for future in done:
+                    if future.exception() is None:
+                        self.last_usage = futures[future].usage
+                        return future.result()
+                    error = future.exception()
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+            raise error if error else OpenRouterError("Hedged request failed")
+        finally:
+            # Abort whichever request is still running
+            for leg in legs:
+                leg.cancel()
+            executor.shutdown(wait=False)
+
+    def _hedge_delay(self, payload: Dict) -> Optional[float]:
+        """
+        Get the hedging delay for a payload, or None if it should not be hedged.
+
+        Args:
+            payload (Dict): Request payload
+
+        Returns:
+            Optional[float]: Seconds to wait on the primary provider before hedging
+        """
+        order = payload["provider"]["order"]
+        if not self.hedge or len(order) < 2:
+            return None
+
+        return self.router.hedge_delay(
+            order[0], payload["model"], payload["stream"], self.hedge_percentile
+        )
+
+    @staticmethod
+    def _hedge_payload(payload: Dict) -> Dict:
+        """
+        Copy a payload with its primary provider moved to the end of the order.
+
+        Args:
+            payload (Dict): Request payload
+
+        Returns:
+            Dict: Payload for the hedged request
+        """
+        order = payload["provider"]["order"]
+        return {
+            **payload,
+            "provider": {**payload["provider"], "order": order[1:] + order[:1]},
+        }
+
+    def _record(
+        self,
+        payload: Dict,
+        provider: Optional[str],
+        started: float,
+        first_token_at: Optional[float],
+        output_tokens: int,
+        ok: bool,
+        censored: bool = False,
+    ) -> None:
+        """
+        Record a request outcome in the provider router.
+
+        Args:
+            payload (Dict): Request payload
+            provider (Optional[str]): Provider reported by OpenRouter, defaults to the first in the order
+            started (float): Monotonic time the request was sent
+            first_token_at (Optional[float]): Monotonic time of the first token, None for non-streaming
+            output_tokens (int): Number of generated tokens, 0 if unknown
+            ok (bool): Whether the request succeeded
+            censored (bool): Whether the request was abandoned before it answered
+        """
+        order = payload["provider"]["order"]
+        provider = provider or (order[0] if order else None)
+        if not provider:
+            return
+
+        now = time.monotonic()
+        latency = now - started
+        ttft = (first_token_at or now) - started
+        self.router.record(
+            provider,
+            payload["model"],
+            ttft,
+            latency,
+            output_tokens,
+            ok=ok,
+            censored=censored,
+        )
+
+    def _log_usage(
+        self, payload: Dict, provider: Optional[str], usage: Dict
+    ) -> Dict[str, Any]:
+        """
+        Log how the completion tokens of a completed request split into
+        reasoning and output.
+
+        Args:
+            payload (Dict): Request payload
+            provider (Optional[str]): Provider reported by OpenRouter
+            usage (Dict): The `usage` object of the response
+
+        Returns:
+            Dict[str, Any]: The provider and usage, as kept in `last_usage`
+        """
+        last_usage = {"provider": provider, "usage": usage}
+
+        completion_tokens = usage.get("completion_tokens")
+        if not completion_tokens:
+            return last_usage
+
+        details = usage.get("completion_tokens_details") or {}
+        reasoning_tokens = details.get("reasoning_tokens") or 0
+        logger.info(
+            f"OpenRouter usage for {payload['model']} via {provider or 'unknown provider'}: "
+            f"{reasoning_tokens} reasoning + {completion_tokens - reasoning_tokens} output tokens, "
+            f"{usage.get('prompt_tokens', 0)} prompt tokens"
+        )
+        return last_usage
+
     def create_chat_completion_stream(
         self,
         messages: List[Dict],
@@ -205,6 +594,7 @@ class OpenRouter:
         model: Optional[str] = None,
         include_reasoning: Optional[bool] = None,
         max_tokens: Optional[int] = None,
+        reasoning: Optional[Dict[str, Any]] = None,
     ) -> Generator[Tuple[str, str], None, None]:
         """
         Create a streaming chat completion with support for reasoning models.
@@ -214,7 +604,7 @@ class OpenRouter:
             model: The model to use (e.g., "openai/gpt-4o", "deepseek/deepseek-r1")
             temperature: Sampling temperature (0-2)
             max_tokens: Maximum tokens to generate
-            **kwargs: Additional parameters to pass to the API
+            reasoning: OpenRouter `reasoning` parameters, see `reasoning_params`
 
         Returns:
             Generator yielding tuples of (content, type) where type is "reasoning" or "main"
@@ -227,25 +617,121 @@ class OpenRouter:
             include_reasoning=include_reasoning,
             max_tokens=max_tokens,
             stream=True,
+            reasoning=reasoning,
         )
 
+        self.last_usage = {}
         endpoint = f"{self.base_url}/chat/completions"
+        delay = self._hedge_delay(payload)
+        if delay is not None:
+            return self._hedged_stream_response(endpoint, payload, delay)
         return self._stream_response(endpoint, payload)
 
+    def _hedged_stream_response(
+        self, endpoint: str, payload: Dict, delay: float
+    ) -> Generator[Tuple[str, str], None, None]:
+        """
+        Stream a response, hedging it if the first provider is slow to start.
+
+        The primary stream is opened immediately. If no token arrives within `delay`
+        seconds, a second stream is opened with the primary provider moved to the
+        end of the order. The first stream to produce a token is yielded, the
+        other one is aborted, and only the winner sets `last_usage`.
+
+        Args:
+            endpoint (str): API endpoint URL
+            payload (Dict): Request payload
+            delay (float): Seconds to wait for the first token before hedging
+
+        Returns:
+            Generator[Tuple[str, str], None, None]: Generator yielding tuples of
+                (content, type) where type is "reasoning" or "main"
+
+        Raises:
+            OpenRouterError: If every opened stream fails before producing a token
+        """
+        items: queue.Queue = queue.Queue()
+        legs = [_HedgeLeg(), _HedgeLeg()]
+        finished = object()
+
+        def pump(index: int, stream_payload: Dict):
+            stream = self._stream_response(endpoint, stream_payload, legs[index])
+            try:
+                for item in stream:
+                    if legs[index].cancelled.is_set():
+                        return
+                    items.put((index, item))
+                items.put((index, finished))
+            except Exception as e:
+                items.put((index, e))
+            finally:
+                stream.close()
+
+        def start(index: int, stream_payload: Dict):
+            threading.Thread(
+                target=pump, args=(index, stream_payload), daemon=True
+            ).start()
+
+        start(0, payload)
+        started = 1
+        alive = {0}
+        winner: int | None = None
+
+        try:
+            while True:
+                try:
+                    timeout = delay if winner is None and started == 1 else None
+                    index, item = items.get(timeout=timeout)
+                except queue.Empty:
+                    start(1, self._hedge_payload(payload))
+                    started = 2
+                    alive.add(1)
+                    continue
+
+                if winner is not None and index != winner:
+                    continue
+
+                if isinstance(item, Exception) or item is finished:
+                    alive.discard(index)
+                    if winner is None and alive:
+                        continue
+                    if winner is None and started == 1 and isinstance(item, Exception):
+                        # The primary failed before the hedge was due, try the next provider now
+                        start(1, self._hedge_payload(payload))
+                        started = 2
+                        alive.add(1)
+                        continue
+                    if isinstance(item, Exception):
+                        raise item
+                    self.last_usage = legs[index].usage
+                    return
+
+                if winner is None:
+                    winner = index
+                    for other in alive - {index}:
+                        legs[other].cancel()
+                yield item
+        finally:
+            for leg in legs:
+                leg.cancel()
+
     def _stream_response(
-        self, endpoint: str, payload: Dict
+        self, endpoint: str, payload: Dict, leg: Optional[_HedgeLeg] = None
     ) -> Generator[Tuple[str, str], None, None]:
         """
         Stream the response from the API, handling both content and reasoning tokens.
 
         This method handles the streaming HTTP request to the OpenRouter API and processes
-        the response chunks, separating reasoning tokens from main content tokens.
+        the response chunks with an incremental bytes-level SSE decoder, separating
+        reasoning tokens from main content tokens.
         It cleans up special tokens and manages the transition between reasoning and
         response phases.
 
         Args:
             endpoint (str): API endpoint URL
             payload (Dict): Request payload
+            leg (Optional[_HedgeLeg]): Set when this is one stream of a hedged call,
+                it then keeps the usage instead of `last_usage`
 
         Returns:
             Generator[Tuple[str, str], None, None]: Generator yielding tuples of
@@ -254,6 +740,13 @@ class OpenRouter:
         Raises:
             OpenRouterError: If an HTTP error or other exception occurs during streaming
         """
+        started = time.monotonic()
+        first_token_at: Optional[float] = None
+        provider: Optional[str] = None
+        output_tokens = 0
+        token_chunks = 0
+        usage_obj: Dict = {}
+        completed = False
         try:
             with self.http_client.stream(
                 "POST",
@@ -261,55 +754,97 @@ class OpenRouter:
                 headers=self.headers,
                 content=json.dumps(payload),
                 timeout=self.timeout,
-            ) as response:
+            ) as response, _attached(leg, response):
                 if response.status_code != 200:
                     error_text = response.read().decode("utf-8")
                     raise OpenRouterError(
                         f"HTTP error {response.status_code}: {error_text}"
                     )
-                buffer = ""
+                decoder = SSEDecoder()
                 in_reasoning_phase = False
-                for chunk in response.iter_raw():
-                    buffer += chunk.decode("utf-8")
-                    while "\n" in buffer:
-                        line_end = buffer.find("\n")
-                        line = buffer[:line_end].strip()
-                        buffer = buffer[line_end + 1 :]
-                        if line.startswith(": OPENROUTER PROCESSING"):
-                            continue
-                        if line.startswith("data: "):
-                            data = line[6:]
-                            if data == "[DONE]":
-                                return
-                            try:
-                                data_obj = json.loads(data)
-                                if "choices" in data_obj and data_obj["choices"]:
-                                    delta = data_obj["choices"][0].get("delta", {})
-                                    content = delta.get("content")
-                                    reasoning = delta.get("reasoning")
-
-                                    # Process tokens but DON'T emit the <think> tags
-                                    if reasoning is not None and self.include_reasoning:
-                                        # Clean various tokens that might appear
-                                        reasoning = (
-                                            reasoning.replace("</s>", "")
-                                            .replace("<response>", "")
-                                            .replace("</thinking>", "")
-                                        )
-                                        # Track phase but don't emit tag
-                                        in_reasoning_phase = True
-                                        # Just yield the reasoning content
-                                        yield (reasoning, "reasoning")
-                                    elif content is not None:
-                                        # Track phase change but don't emit closing tag
-                                        if in_reasoning_phase:
-                                            in_reasoning_phase = False
-
-                                        # Yield main content without checking for </think>
-                                        yield (content, "main")
-                            except json.JSONDecodeError:
-                                pass
-        except httpx.HTTPError as e:
-            raise OpenRouterError(f"HTTP error occurred during streaming: {str(e)}")
+                for event in decoder.iter_events(response.iter_raw()):
+                    if event.data == b"[DONE]":
+                        completed = True
+                        return
+                    try:
+                        data_obj = sse_loads(event.data)
+                    except ValueError:
+                        continue
+                    if not isinstance(data_obj, dict):
+                        continue
+                    if "error" in data_obj:
+                        raise OpenRouterError(
+                            f"Provider error during streaming: {data_obj['error']}"
+                        )
+
+                    provider = data_obj.get("provider") or provider
+                    usage = data_obj.get("usage")
+                    if usage and usage.get("completion_tokens"):
+                        output_tokens = usage["completion_tokens"]
+                        usage_obj = usage
+                    if not data_obj.get("choices"):
+                        continue
+
+                    delta = data_obj["choices"][0].get("delta", {})
+                    content = delta.get("content")
+                    reasoning = delta.get("reasoning")
+
+                    if content or reasoning:
+                        token_chunks += 1
+                        if first_token_at is None:
+                            first_token_at = time.monotonic()
+
+                    # Process tokens but DON'T emit the <think> tags
+                    if reasoning is not None and self.include_reasoning:
+                        # Clean various tokens that might appear
+                        reasoning = (
+                            reasoning.replace("</s>", "")
+                            .replace("<response>", "")
+                            .replace("</thinking>", "")
+                        )
+                        # Track phase but don't emit tag
+                        in_reasoning_phase = True
+                        # Just yield the reasoning content
+                        yield (reasoning, "reasoning")
+                    elif content is not None:
+                        # Track phase change but don't emit closing tag
+                        if in_reasoning_phase:
+                            in_reasoning_phase = False
+
+                        # Yield main content without checking for </think>
+                        yield (content, "main")
+                completed = True
+        except GeneratorExit:
+            # Closed by the consumer, e.g. the losing side of a hedged stream.
+            # Only a stream that never produced a token tells us anything here:
+            # its first token would have come later than now.
+            if first_token_at is None:
+                self._record(payload, provider, started, None, 0, ok=True, censored=True)
+            raise
         except Exception as e:
+            if leg is not None and leg.cancelled.is_set():
+                # Aborted as the losing side of a hedged stream, as above
+                if first_token_at is None:
+                    self._record(payload, provider, started, None, 0, ok=True, censored=True)
+                raise OpenRouterError("Hedged stream cancelled") from e
+            self._record(payload, provider, started, first_token_at, 0, ok=False)
+            if isinstance(e, OpenRouterError):
+                raise
+            if isinstance(e, httpx.HTTPError):
+                raise OpenRouterError(f"HTTP error occurred during streaming: {str(e)}")
             raise OpenRouterError(f"Error occurred during streaming: {str(e)}")
+        finally:
+            if completed:
+                self._record(
+                    payload,
+                    provider,
+                    started,
+                    first_token_at,
+                    output_tokens or token_chunks,
+                    ok=True,
+                )
+                last_usage = self._log_usage(payload, provider, usage_obj)
+                if leg is None:
+                    self.last_usage = last_usage
+                else:
+                    leg.usage = last_usage
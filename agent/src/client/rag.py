@@ -1,6 +1,6 @@
-import json
 from pprint import pformat, pprint
 import requests
+from src import codec
 from src.datatypes import StrategyData
 from typing import List, TypedDict, Any
 import dataclasses
@@ -25,11 +25,11 @@ class Metadata(TypedDict):
     Attributes:
         created_at (str): Timestamp when the content was created
         reference_id (str): Reference identifier for the content
-        strategy_data (str): JSON string containing StrategyData
+        strategy_data (str): StrategyData payload, see `src.codec`
     """
     created_at: str
     reference_id: str
-    strategy_data: str  # JSON string containing StrategyData
+    strategy_data: str  # StrategyData payload, plain JSON or headed by src.codec
 
 
 class PageContent(TypedDict):
@@ -70,6 +70,7 @@ class RAGClient:
         agent_id: str,
         session_id: str,
         base_url: str = "http://localhost:8080",
+        payload_format: codec.PayloadFormat = "json",
     ):
         """
         Initialize the RAG client with agent and session information.
@@ -79,7 +80,14 @@ class RAGClient:
             session_id (str): Identifier for the session
             base_url (str, optional): Base URL for the RAG API. 
                 Defaults to "localhost:8080".
+            payload_format (codec.PayloadFormat, optional): Format the strategy data is saved in.
+                Defaults to "json".
+
+        Raises:
+            ValueError: If the payload format is unknown or its library is missing
         """
+        codec.check_format(payload_format)
+        self.payload_format = payload_format
         self.base_url = base_url
         self.agent_id = agent_id
         self.session_id = session_id
@@ -112,7 +120,9 @@ class RAGClient:
                 payload.append(
                     {
                         "strategy": data.summarized_desc,
-                        "strategy_data": json.dumps(dataclasses.asdict(data)),
+                        "strategy_data": codec.encode(
+                            dataclasses.asdict(data), self.payload_format
+                        ),
                         "reference_id": data.strategy_id,
                         "agent_id": self.agent_id,
                         "session_id": self.session_id,
@@ -161,7 +171,7 @@ class RAGClient:
 
             result = []
             for item in r["data"]:
-                strategy_data = json.loads(item["metadata"]["strategy_data"])
+                strategy_data = codec.decode(item["metadata"]["strategy_data"])
                 result.append(
                     StrategyData(
                         strategy_id=strategy_data["strategy_id"],
@@ -169,6 +179,7 @@ class RAGClient:
                         parameters=strategy_data["parameters"],
                         summarized_desc=strategy_data["summarized_desc"],
                         full_desc=strategy_data["full_desc"],
+                        strategy_result=strategy_data.get("strategy_result", ""),
                     )
                 )
 
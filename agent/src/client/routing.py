@@ -0,0 +1,301 @@
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Tuple
+
+
+@dataclass
+class ProviderSample:
+    """
+    A single observed request against a provider.
+
+    Attributes:
+        at (float): Monotonic timestamp when the sample was recorded
+        ttft (float): Seconds until the first token (total latency for non-streaming calls)
+        latency (float): Total seconds the request took
+        tokens_per_s (float): Output throughput, 0.0 when unknown
+        ok (bool): Whether the request succeeded
+        censored (bool): Whether the request was abandoned before it answered, e.g.
+            the losing side of a hedge, so `ttft` and `latency` are only lower bounds
+    """
+
+    at: float
+    ttft: float
+    latency: float
+    tokens_per_s: float
+    ok: bool
+    censored: bool = False
+
+
+@dataclass
+class ProviderStats:
+    """
+    Rolling latency, throughput and error statistics for one provider and model.
+
+    Samples older than `max_age` seconds are dropped, so a provider that was slow
+    in the morning can win again in the afternoon.
+
+    Attributes:
+        window (int): Maximum number of samples kept
+        max_age (float): Maximum age of a sample in seconds
+        samples (Deque[ProviderSample]): The retained samples, oldest first
+    """
+
+    window: int = 50
+    max_age: float = 3600.0
+    samples: Deque[ProviderSample] = field(default_factory=deque)
+
+    def record(self, sample: ProviderSample) -> None:
+        self.samples.append(sample)
+        while len(self.samples) > self.window:
+            self.samples.popleft()
+
+    def prune(self, now: float) -> None:
+        while self.samples and now - self.samples[0].at > self.max_age:
+            self.samples.popleft()
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    @property
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for s in self.samples if not s.ok) / len(self.samples)
+
+    def percentile(self, metric: str, q: float) -> Optional[float]:
+        """
+        Get a percentile of a metric over the successful samples.
+
+        A censored sample only says the request would have taken longer than it
+        was waited on, so it counts as no faster than the percentile of the
+        completed samples: it can raise a latency percentile, never lower it.
+        Censored samples say nothing about throughput.
+
+        Args:
+            metric (str): Sample attribute name, "ttft", "latency" or "tokens_per_s"
+            q (float): Percentile between 0 and 1
+
+        Returns:
+            Optional[float]: The percentile, or None if there are no usable samples
+
+        Example:
+            >>> stats = ProviderStats()
+            >>> for ttft in (1.0, 2.0, 3.0, 4.0, 5.0):
+            ...     stats.record(ProviderSample(0.0, ttft, ttft, 0.0, ok=True))
+            >>> stats.percentile("ttft", 0.5), stats.percentile("ttft", 0.9)
+            (3.0, 5.0)
+            >>> # Hedges lost after 0.5s, the provider never answered them
+            >>> for _ in range(5):
+            ...     stats.record(ProviderSample(0.0, 0.5, 0.5, 0.0, ok=True, censored=True))
+            >>> stats.percentile("ttft", 0.5), stats.percentile("ttft", 0.9)
+            (3.0, 5.0)
+            >>> # Hedges lost after 6s raise it
+            >>> for _ in range(5):
+            ...     stats.record(ProviderSample(0.0, 6.0, 6.0, 0.0, ok=True, censored=True))
+            >>> stats.percentile("ttft", 0.5), stats.percentile("ttft", 0.9)
+            (3.0, 6.0)
+        """
+
+        def at(values: List[float]) -> float:
+            return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+        values = sorted(
+            getattr(s, metric)
+            for s in self.samples
+            if s.ok and not s.censored and getattr(s, metric) > 0
+        )
+        bounds = (
+            [getattr(s, metric) for s in self.samples if s.censored]
+            if metric != "tokens_per_s"
+            else []
+        )
+        if not values:
+            # Nothing completed, the longest wait is the best estimate there is
+            return max(bounds) if bounds else None
+        if bounds:
+            floor = at(values)
+            values = sorted(values + [max(bound, floor) for bound in bounds])
+        return at(values)
+
+
+class ProviderRouter:
+    """
+    Orders OpenRouter providers by their observed performance.
+
+    Every completed or failed request is recorded against the (provider, model)
+    pair that served it. `order` then sorts the configured providers by an
+    expected-latency score, keeping providers that do not have enough samples
+    yet ahead of the measured ones so they get explored.
+    """
+
+    def __init__(
+        self,
+        providers: List[str],
+        window: int = 50,
+        max_age: float = 3600.0,
+        min_samples: int = 3,
+        reference_tokens: int = 1000,
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            providers (List[str]): Providers in their static preference order
+            window (int): Samples kept per provider and model
+            max_age (float): Seconds after which a sample no longer counts
+            min_samples (int): Samples needed before a provider is ranked by score
+            reference_tokens (int): Output length used to weigh throughput against TTFT
+        """
+        self.providers = providers
+        self.window = window
+        self.max_age = max_age
+        self.min_samples = min_samples
+        self.reference_tokens = reference_tokens
+
+        self._stats: Dict[Tuple[str, str], ProviderStats] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, provider: str, model: str) -> ProviderStats:
+        key = (provider, model)
+        if key not in self._stats:
+            self._stats[key] = ProviderStats(window=self.window, max_age=self.max_age)
+        return self._stats[key]
+
+    def record(
+        self,
+        provider: str,
+        model: str,
+        ttft: float,
+        latency: float,
+        output_tokens: int = 0,
+        ok: bool = True,
+        censored: bool = False,
+    ) -> None:
+        """
+        Record the outcome of a request.
+
+        Args:
+            provider (str): Provider that served (or failed) the request
+            model (str): Model that was requested
+            ttft (float): Seconds until the first token
+            latency (float): Total seconds the request took
+            output_tokens (int): Number of generated tokens, 0 if unknown
+            ok (bool): Whether the request succeeded
+            censored (bool): Whether the request was abandoned before it answered,
+                see `ProviderSample`
+        """
+        generation_time = latency - ttft
+        tokens_per_s = (
+            output_tokens / generation_time
+            if output_tokens and generation_time > 0
+            else 0.0
+        )
+        sample = ProviderSample(
+            at=time.monotonic(),
+            ttft=ttft,
+            latency=latency,
+            tokens_per_s=tokens_per_s,
+            ok=ok,
+            censored=censored,
+        )
+        with self._lock:
+            self._get(provider, model).record(sample)
+
+    def score(self, provider: str, model: str) -> Optional[float]:
+        """
+        Get the expected seconds for a reference-sized completion on a provider.
+
+        Args:
+            provider (str): Provider name
+            model (str): Model name
+
+        Returns:
+            Optional[float]: Lower is better, None when there are too few samples
+        """
+        with self._lock:
+            stats = self._get(provider, model)
+            stats.prune(time.monotonic())
+            if len(stats) < self.min_samples:
+                return None
+
+            error_rate = stats.error_rate
+            ttft = stats.percentile("ttft", 0.5)
+            tokens_per_s = stats.percentile("tokens_per_s", 0.5)
+
+        if ttft is None:
+            # Only failures in the window
+            return float("inf")
+
+        expected = ttft
+        if tokens_per_s:
+            expected += self.reference_tokens / tokens_per_s
+
+        return expected / max(1.0 - error_rate, 0.05)
+
+    def order(self, model: str, providers: Optional[List[str]] = None) -> List[str]:
+        """
+        Get providers ordered from most to least preferred for a model.
+
+        Args:
+            model (str): Model name
+            providers (Optional[List[str]]): Providers to order, defaults to the configured ones
+
+        Returns:
+            List[str]: Reordered providers
+        """
+        providers = providers or self.providers
+        scored = [(self.score(p, model), i, p) for i, p in enumerate(providers)]
+
+        unmeasured = [p for s, _, p in scored if s is None]
+        measured = [p for _, _, p in sorted(s for s in scored if s[0] is not None)]
+
+        return unmeasured + measured
+
+    def hedge_delay(
+        self, provider: str, model: str, stream: bool, percentile: float = 0.95
+    ) -> Optional[float]:
+        """
+        Get how long to wait on a provider before issuing a hedged request.
+
+        Streaming requests are hedged on time to first token, non-streaming ones on
+        total latency.
+
+        Args:
+            provider (str): Provider the primary request is sent to
+            model (str): Model name
+            stream (bool): Whether the request is streaming
+            percentile (float): Percentile of the observed distribution to wait for
+
+        Returns:
+            Optional[float]: Delay in seconds, None if there are too few samples to hedge
+        """
+        with self._lock:
+            stats = self._get(provider, model)
+            stats.prune(time.monotonic())
+            if len(stats) < self.min_samples:
+                return None
+            return stats.percentile("ttft" if stream else "latency", percentile)
+
+    def snapshot(self) -> Dict[str, Dict[str, float | int | None]]:
+        """
+        Get a summary of the current statistics, keyed by "provider/model".
+
+        Returns:
+            Dict[str, Dict[str, float | int | None]]: Sample count, error rate and
+                median/p95 TTFT and throughput per provider and model
+        """
+        with self._lock:
+            now = time.monotonic()
+            summary: Dict[str, Dict[str, float | int | None]] = {}
+            for (provider, model), stats in self._stats.items():
+                stats.prune(now)
+                summary[f"{provider}/{model}"] = {
+                    "samples": len(stats),
+                    "error_rate": stats.error_rate,
+                    "ttft_p50": stats.percentile("ttft", 0.5),
+                    "ttft_p95": stats.percentile("ttft", 0.95),
+                    "tokens_per_s_p50": stats.percentile("tokens_per_s", 0.5),
+                }
+            return summary
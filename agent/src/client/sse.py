@@ -0,0 +1,171 @@
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+try:
+    import orjson
+
+    _loads: Callable[[bytes], Any] = orjson.loads
+except ImportError:  # orjson is optional
+    _decoder = json.JSONDecoder()
+
+    def _loads(data: bytes) -> Any:
+        # Skips json.loads' per-call encoding detection, the payload is always UTF-8
+        return _decoder.decode(data.decode("utf-8"))
+
+
+def loads(data: bytes) -> Any:
+    """
+    Parse a JSON event payload without decoding it to `str` first.
+
+    Uses orjson when it is installed and falls back to the standard library.
+    Both raise a `ValueError` subclass on invalid input.
+
+    Args:
+        data (bytes): UTF-8 encoded JSON
+
+    Returns:
+        Any: The parsed object
+
+    Raises:
+        ValueError: If the payload is not valid JSON
+    """
+    return _loads(data)
+
+
+@dataclass(slots=True)
+class SSEEvent:
+    """
+    A dispatched server-sent event.
+
+    Attributes:
+        data (bytes): The event data, multiple `data:` lines joined with a newline
+        event (str): The event type, "message" unless the server set one
+        id (Optional[str]): The last event id seen on the stream, if any
+    """
+
+    data: bytes
+    event: str = "message"
+    id: Optional[str] = None
+
+
+class SSEDecoder:
+    """
+    Incremental decoder for `text/event-stream` bodies that works on raw bytes.
+
+    Chunks are appended to a single reusable buffer and only the bytes that
+    arrived since the last call are scanned for line endings, so decoding is
+    linear in the stream length no matter how the network splits it. All
+    complete lines of a chunk are split out in a single pass and dropped from
+    the front of the buffer at once, which leaves at most one partial line behind.
+
+    Follows the dispatch rules of the SSE spec: `data:` lines accumulate until a
+    blank line, lines starting with `:` are comments (e.g. OpenRouter's
+    `: OPENROUTER PROCESSING` keep-alives), and `\\r\\n` line endings are accepted.
+
+    Example:
+        >>> decoder = SSEDecoder()
+        >>> decoder.feed(b'data: {"a": 1}\\n\\nda')
+        [SSEEvent(data=b'{"a": 1}', event='message', id=None)]
+        >>> decoder.feed(b'ta: [DONE]\\n\\n')
+        [SSEEvent(data=b'[DONE]', event='message', id=None)]
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._scan_from = 0
+        self._data: List[bytes] = []
+        self._event = "message"
+        self._last_id: Optional[str] = None
+
+    def feed(self, chunk: bytes) -> List[SSEEvent]:
+        """
+        Add a chunk of the response body and return the events it completes.
+
+        Args:
+            chunk (bytes): Raw bytes as received from the network
+
+        Returns:
+            List[SSEEvent]: Events dispatched by this chunk, possibly empty
+        """
+        buffer = self._buffer
+        buffer += chunk
+
+        last_newline = buffer.rfind(b"\n", self._scan_from)
+        if last_newline == -1:
+            self._scan_from = len(buffer)
+            return []
+
+        # Split every complete line in one pass and keep only the partial tail
+        lines = bytes(buffer[:last_newline]).split(b"\n")
+        del buffer[: last_newline + 1]
+        self._scan_from = 0
+
+        events: List[SSEEvent] = []
+        for line in lines:
+            if line.endswith(b"\r"):
+                line = line[:-1]
+            if line.startswith(b"data: "):
+                self._data.append(line[6:])
+            elif line:
+                self._process_line(line, events)
+            else:
+                # A blank line ends the event, and resets its type even without data
+                self._dispatch(events)
+
+        return events
+
+    def iter_events(self, chunks: Iterable[bytes]) -> Iterator[SSEEvent]:
+        """
+        Decode a whole response body, flushing the last event when the chunks run out.
+
+        Args:
+            chunks (Iterable[bytes]): Raw bytes as received from the network
+
+        Yields:
+            SSEEvent: Every event of the body, in order
+        """
+        for chunk in chunks:
+            yield from self.feed(chunk)
+        yield from self.flush()
+
+    def flush(self) -> List[SSEEvent]:
+        """
+        Finish the stream, dispatching an event left without a trailing blank line.
+
+        Returns:
+            List[SSEEvent]: The pending event, if there was one
+        """
+        events: List[SSEEvent] = []
+        if self._buffer:
+            self._process_line(bytes(self._buffer).rstrip(b"\r"), events)
+            self._buffer.clear()
+            self._scan_from = 0
+        self._dispatch(events)
+        return events
+
+    def _process_line(self, line: bytes, events: List[SSEEvent]) -> None:
+        if not line:
+            self._dispatch(events)
+            return
+        if line[0] == 0x3A:  # ":" starts a comment
+            return
+
+        name, sep, value = line.partition(b":")
+        if sep and value[:1] == b" ":
+            value = value[1:]
+
+        if name == b"data":
+            self._data.append(value)
+        elif name == b"event":
+            self._event = value.decode("utf-8", errors="replace")
+        elif name == b"id":
+            self._last_id = value.decode("utf-8", errors="replace")
+        # "retry" and unknown fields are ignored
+
+    def _dispatch(self, events: List[SSEEvent]) -> None:
+        if self._data:
+            data = self._data[0] if len(self._data) == 1 else b"\n".join(self._data)
+            events.append(SSEEvent(data=data, event=self._event, id=self._last_id))
+        self._data = []
+        self._event = "message"
@@ -1,6 +1,6 @@
 from abc import ABC
-from typing import Dict, NamedTuple
-from dataclasses import dataclass
+from typing import Dict, List, NamedTuple
+from dataclasses import dataclass, field, replace
 
 
 @dataclass
@@ -15,6 +15,46 @@ class BaseLLMConfig(ABC):
     pass
 
 
+@dataclass
+class ReasoningConfig:
+    """
+    Controls for the hidden reasoning a model does before answering.
+
+    Each genner maps these to its provider's parameters. Providers that cannot
+    honour a setting ignore it, e.g. DeepSeek R1 always reasons, so turning
+    reasoning off there only stops the reasoning from being sent back.
+
+    Attributes:
+        enabled (bool): Whether the model should reason before answering
+        max_tokens (int | None): Maximum reasoning tokens, None for the provider default
+        effort (str | None): "low", "medium" or "high", None for the provider default.
+            Ignored when `max_tokens` is set
+        max_output_tokens (int | None): Cap on the whole completion, overriding the
+            config's `max_tokens`, None to keep it
+    """
+
+    enabled: bool = True
+    max_tokens: int | None = None
+    effort: str | None = None
+    max_output_tokens: int | None = None
+
+
+def default_stage_reasoning() -> Dict[str, ReasoningConfig]:
+    """
+    Get the reasoning overrides used for flow stages that do not need deep reasoning.
+
+    Stages are set on a genner with `Genner.set_stage`, any stage not listed here
+    uses the config's `reasoning`.
+
+    Returns:
+        Dict[str, ReasoningConfig]: Reasoning controls keyed by stage name
+    """
+    return {
+        "summarizer": ReasoningConfig(enabled=False, max_output_tokens=1024),
+        "address_research": ReasoningConfig(effort="low", max_tokens=2048),
+    }
+
+
 @dataclass
 class OllamaConfig(BaseLLMConfig):
     """
@@ -27,11 +67,24 @@ class OllamaConfig(BaseLLMConfig):
         name (str | None): The display name of the model
         model (str | None): The model identifier used by Ollama
         endpoint (str): The URL of the Ollama API endpoint
+        keep_alive (str | int): How long Ollama keeps the model loaded after a request,
+            replaced by the session interval plus `keep_alive_margin` once a session starts
+        keep_alive_margin (int): Seconds added to the session interval so the model
+            outlives the wait between two cycles
+        preload (bool): Whether to load the model when the agent starts
+        ready_timeout (float): Seconds to wait for the model to be loaded at startup
+        structured_output (bool): Whether code and lists are generated as JSON constrained
+            by the output tool schemas instead of extracted from markdown fences
     """
 
     name: str | None = None
     model: str | None = None
     endpoint: str = "http://localhost:11434/api/chat"
+    keep_alive: str | int = "30m"
+    keep_alive_margin: int = 300
+    preload: bool = True
+    ready_timeout: float = 300.0
+    structured_output: bool = False
 
 
 @dataclass
@@ -46,6 +99,10 @@ class DeepseekConfig(BaseLLMConfig):
         name (str): The display name of the model
         model (str): The model identifier for Deepseek
         max_tokens (int): The maximum number of tokens for model input/output
+        reasoning (ReasoningConfig): Reasoning controls used outside of overridden stages
+        stage_reasoning (Dict[str, ReasoningConfig]): Reasoning controls per flow stage
+        structured_output (bool): Whether code and lists are returned through tool calls
+            instead of extracted from markdown fences, off for R1 which has no tool calling
     """
 
     name: str = "Deepseek"
@@ -54,10 +111,15 @@ class DeepseekConfig(BaseLLMConfig):
     model: str = "deepseek/deepseek-r1"
     max_tokens: int = 8192
     temperature: float = 1.0
+    reasoning: ReasoningConfig = field(default_factory=ReasoningConfig)
+    stage_reasoning: Dict[str, ReasoningConfig] = field(
+        default_factory=default_stage_reasoning
+    )
+    structured_output: bool = False
 
 
 @dataclass
-class QwenConfig(BaseLLMConfig):
+class QwenConfig(OllamaConfig):
     """
     Configuration for Qwen language models via Ollama.
 
@@ -69,8 +131,8 @@ class QwenConfig(BaseLLMConfig):
         model (str): The model identifier used by Ollama
     """
 
-    name: str = "Ollama Qwen"
-    model: str = "qwen2.5-coder:latest"
+    name: str | None = "Ollama Qwen"
+    model: str | None = "qwen2.5-coder:latest"
 
 
 @dataclass
@@ -85,11 +147,26 @@ class ClaudeConfig(BaseLLMConfig):
         name (str): The display name of the model
         model (str): The model identifier for Claude
         max_tokens (int): The maximum number of tokens for model output
+        reasoning (ReasoningConfig): Extended thinking controls used outside of
+            overridden stages, off by default as not every Claude model supports it
+        stage_reasoning (Dict[str, ReasoningConfig]): Extended thinking controls per flow stage
+        structured_output (bool): Whether code and lists are returned through tool use
+            instead of extracted from markdown fences
     """
 
     name: str = "Claude"
     model: str = "claude-3-5-sonnet-latest"
     max_tokens = 8192
+    reasoning: ReasoningConfig = field(
+        default_factory=lambda: ReasoningConfig(enabled=False)
+    )
+    stage_reasoning: Dict[str, ReasoningConfig] = field(
+        default_factory=lambda: {
+            stage: replace(reasoning, enabled=False)
+            for stage, reasoning in default_stage_reasoning().items()
+        }
+    )
+    structured_output: bool = True
 
 
 @dataclass
@@ -104,9 +181,61 @@ class OpenRouterConfig(BaseLLMConfig):
         name (str): The display name of the model
         model (str): The model identifier for Claude
         max_tokens (int): The maximum number of tokens for model output
+        reasoning (ReasoningConfig): Reasoning controls used outside of overridden stages
+        stage_reasoning (Dict[str, ReasoningConfig]): Reasoning controls per flow stage
+        structured_output (bool): Whether code and lists are returned through tool calls
+            instead of extracted from markdown fences
     """
 
     name: str = "openai/o3-mini"
     model: str = "openai/o3-mini"
     max_tokens = 8192
     temperature: float | None = None
+    reasoning: ReasoningConfig = field(default_factory=ReasoningConfig)
+    stage_reasoning: Dict[str, ReasoningConfig] = field(
+        default_factory=default_stage_reasoning
+    )
+    structured_output: bool = True
+
+
+@dataclass
+class CascadeStageConfig:
+    """
+    Configuration for one stage of a model cascade.
+
+    Attributes:
+        backend (str): The `get_genner` backend serving this stage
+        escalate_on (List[str]): Failure kinds that count towards escalating to the
+            next stage, any of "completion", "extraction", "preflight" and "execution"
+        max_failures (int): Failures of those kinds tolerated before escalating
+    """
+
+    backend: str
+    escalate_on: List[str] = field(
+        default_factory=lambda: ["completion", "extraction", "preflight", "execution"]
+    )
+    max_failures: int = 1
+
+
+@dataclass
+class CascadeConfig(BaseLLMConfig):
+    """
+    Configuration for a cascade of language models, cheapest first.
+
+    Every step of a flow starts on the first stage and moves to the next one
+    when the current stage keeps failing, so reasoning models are only paid for
+    when the fast ones cannot do the job.
+
+    Attributes:
+        name (str): The display name of the cascade
+        stages (List[CascadeStageConfig]): Stages from cheapest to most capable
+    """
+
+    name: str = "Cascade"
+    stages: List[CascadeStageConfig] = field(
+        default_factory=lambda: [
+            CascadeStageConfig(backend="gemini"),
+            CascadeStageConfig(backend="deepseek_v3_or", max_failures=2),
+            CascadeStageConfig(backend="deepseek_or", escalate_on=[]),
+        ]
+    )
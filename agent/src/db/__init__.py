@@ -1,12 +1,14 @@
 from dataclasses import dataclass
 import random
+import threading
+import time
 from typing import Dict, Any, Optional, List, TypeVar, cast, Generic
 
-import requests
-import json
+import httpx
 from enum import Enum
 from datetime import datetime, timedelta
 
+from src import codec
 from src.datatypes import StrategyData, StrategyInsertData
 from src.types import ChatHistory
 from src.helper import get_latest_notifications_by_source
@@ -41,23 +43,159 @@ class ApiResponse(Generic[T]):
     error: Optional[str]
 
 
+@dataclass
+class EndpointStats:
+    """
+    Calls made to one REST API endpoint.
+
+    Attributes:
+        calls (int): Requests made, retries not counted
+        errors (int): Requests that failed after their retries
+        retries (int): Requests repeated after a gateway error
+        total_s (float): Seconds spent in the requests, retries included
+        max_s (float): Slowest request
+    """
+    calls: int = 0
+    errors: int = 0
+    retries: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+
+
+# The API refuses requests with a 503 and a Retry-After header when its DB queue
+# is full, before doing any DB work, so only those are safe to send again. Gateway
+# errors (502, 504) may come after the API committed a write and are not retried.
+RETRY_STATUSES = {503}
+
+
+def is_retryable(response: httpx.Response) -> bool:
+    """Whether the API refused the request without running it."""
+    return response.status_code in RETRY_STATUSES and "retry-after" in response.headers
+
+
 class APIDB:
     """
     Client for interacting with the API database.
     
     This class provides methods to interact with the API database, including
     fetching and storing strategies, chat histories, notifications, and session data.
+
+    Requests go through one pooled keep-alive `httpx.Client`, so a cycle reuses
+    its connections instead of opening one per call. Calls and latency are
+    counted per endpoint, see `pop_stats`.
     """
-    def __init__(self, base_url: str, api_key: str):
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        payload_format: codec.PayloadFormat = "json",
+        timeout: float = 30.0,
+        max_retries: int = 2,
+        pool_size: int = 10,
+        http2: bool = False,
+    ):
         """
         Initialize the API database client.
         
         Args:
             base_url (str): The base URL of the API
             api_key (str): API key for authentication
+            payload_format (codec.PayloadFormat): Format strategy parameters are written in,
+                "json" for plain JSON or "orjson"/"msgpack" for a headed payload (see `src.codec`)
+            timeout (float): Seconds before a request is abandoned, connecting is capped at 5
+            max_retries (int): Times a request is repeated when connecting fails or the API is busy
+            pool_size (int): Connections kept open to the API
+            http2 (bool): Whether to negotiate HTTP/2, needs the h2 package and an HTTP/2 capable
+                proxy in front of the API
+
+        Raises:
+            ValueError: If the payload format is unknown or its library is missing
         """
+        codec.check_format(payload_format)
+        self.payload_format = payload_format
         self.base_url = base_url
         self.headers = {"x-api-key": api_key, "Content-Type": "application/json"}
+        self.max_retries = max_retries
+
+        limits = httpx.Limits(
+            max_connections=pool_size, max_keepalive_connections=pool_size
+        )
+        try:
+            # The transport only retries failed connections, the request was never sent
+            transport = httpx.HTTPTransport(
+                retries=max_retries, limits=limits, http2=http2
+            )
+        except ImportError as e:
+            print(f"Warning: HTTP/2 unavailable, using HTTP/1.1: {e}")
+            transport = httpx.HTTPTransport(retries=max_retries, limits=limits)
+
+        self.client = httpx.Client(
+            headers=self.headers,
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 5.0)),
+            transport=transport,
+        )
+
+        self.stats: Dict[str, EndpointStats] = {}
+        self._stats_lock = threading.Lock()
+
+    def _record_stats(
+        self, endpoint: str, elapsed: float, retries: int, ok: bool
+    ) -> None:
+        with self._stats_lock:
+            stats = self.stats.setdefault(endpoint, EndpointStats())
+            stats.calls += 1
+            stats.retries += retries
+            stats.errors += 0 if ok else 1
+            stats.total_s += elapsed
+            stats.max_s = max(stats.max_s, elapsed)
+
+    def pop_stats(self) -> Dict[str, EndpointStats]:
+        """
+        Get the calls made per endpoint since the last call, and start counting afresh.
+
+        Returns:
+            Dict[str, EndpointStats]: Endpoint to its calls
+        """
+        with self._stats_lock:
+            stats, self.stats = self.stats, {}
+        return stats
+
+    @staticmethod
+    def format_stats(*stats: Dict[str, EndpointStats]) -> str:
+        """
+        Summarize the calls of one or more clients, slowest endpoints first.
+
+        Args:
+            *stats (Dict[str, EndpointStats]): Results of `pop_stats`
+
+        Returns:
+            str: One line per endpoint after a total
+        """
+        merged: Dict[str, EndpointStats] = {}
+        for client_stats in stats:
+            for endpoint, s in client_stats.items():
+                m = merged.setdefault(endpoint, EndpointStats())
+                m.calls += s.calls
+                m.errors += s.errors
+                m.retries += s.retries
+                m.total_s += s.total_s
+                m.max_s = max(m.max_s, s.max_s)
+
+        total = EndpointStats(
+            calls=sum(s.calls for s in merged.values()),
+            total_s=sum(s.total_s for s in merged.values()),
+        )
+        lines = [f"{total.calls} DB calls in {total.total_s * 1e3:.0f} ms"]
+        for endpoint, s in sorted(merged.items(), key=lambda kv: -kv[1].total_s):
+            lines.append(
+                f"  {endpoint}: {s.calls} calls, avg {s.total_s / s.calls * 1e3:.1f} ms, "
+                f"max {s.max_s * 1e3:.1f} ms, {s.errors} errors, {s.retries} retries"
+            )
+        return "\n".join(lines)
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        self.client.close()
 
     def _make_request(
         self, endpoint: str, data: Dict[str, Any], response_type: type[T]
@@ -76,14 +214,23 @@ class APIDB:
         Returns:
             ApiResponse[T]: Response object containing success status, data, and error info
         """
+        started = time.monotonic()
+        retries = 0
         try:
-            response = requests.post(
-                f"{self.base_url}/{endpoint}", headers=self.headers, json=data
-            )
+            while True:
+                response = self.client.post(f"{self.base_url}/{endpoint}", json=data)
+                if not is_retryable(response) or retries >= self.max_retries:
+                    break
+                retries += 1
+                time.sleep(0.2 * 2**retries)
+
             response.raise_for_status()
-            return ApiResponse(success=True, data=cast(T, response.json()), error=None)
-        except requests.exceptions.RequestException as e:
-            return ApiResponse(success=False, data=None, error=str(e))
+            result = ApiResponse(success=True, data=cast(T, response.json()), error=None)
+        except (httpx.HTTPError, ValueError) as e:
+            result = ApiResponse(success=False, data=None, error=str(e))
+
+        self._record_stats(endpoint, time.monotonic() - started, retries, result.success)
+        return result
 
     def fetch_params_using_agent_id(self, agent_id: str) -> Dict[str, Dict[str, Any]]:
         """
@@ -121,11 +268,11 @@ class APIDB:
             try:
                 strategy_id = str(strategy["id"])
                 params[strategy_id] = {
-                    "parameters": json.loads(strategy["parameters"]),
+                    "parameters": codec.decode(strategy["parameters"]),
                     "summarized_desc": str(strategy["summarized_desc"]),
                     "full_desc": str(strategy["full_desc"]),
                 }
-            except (KeyError, json.JSONDecodeError, ValueError) as e:
+            except (KeyError, ValueError) as e:
                 raise ApiError(
                     f"Error processing strategy {strategy.get('id')}: {str(e)}"
                 )
@@ -165,7 +312,9 @@ class APIDB:
                 "agent_id": agent_id,
                 "summarized_desc": strategy_result.summarized_desc,
                 "full_desc": strategy_result.full_desc,
-                "parameters": json.dumps(strategy_result.parameters),
+                "parameters": codec.encode(
+                    strategy_result.parameters, self.payload_format
+                ),
             }
             
             response = self._make_request(
@@ -180,11 +329,23 @@ class APIDB:
             print(f"Warning: Error inserting strategy: {e}")
             return True  # Return True to continue execution
 
+    def _strategy_from_row(self, row: Dict[str, Any]) -> StrategyData:
+        return StrategyData(
+            strategy_id=str(row["strategy_id"]),
+            agent_id=str(row["agent_id"]),
+            parameters=codec.decode(row["parameters"]),
+            summarized_desc=str(row["summarized_desc"]),
+            full_desc=str(row["full_desc"]),
+            strategy_result=str(row["strategy_result"]),
+        )
+
     def fetch_latest_strategy(self, agent_id: str) -> Optional[StrategyData]:
         """
         Fetch the most recent strategy for a specific agent.
         
         This method retrieves the latest strategy associated with the given agent ID.
+        The API filters and orders on its (agent_id, created_at) index, so only that
+        strategy is sent back.
         
         Args:
             agent_id (str): The ID of the agent
@@ -196,73 +357,52 @@ class APIDB:
             ApiError: If the strategy fetching fails
         """
         try:
-            strategies_response = self._make_request(
-                "strategies/get_2",
-                {},
-                Dict[str, List[Dict[str, Any]]],  # Changed from List[Dict[str, Any]]
+            strategy_response = self._make_request(
+                "strategies/latest",
+                {"agent_id": agent_id},
+                Dict[str, Optional[Dict[str, Any]]],
             )
-            if not strategies_response.success or not strategies_response.data:
-                print(f"Warning: Failed to fetch strategies: {strategies_response.error}")
+            if not strategy_response.success or not strategy_response.data:
+                print(f"Warning: Failed to fetch latest strategy: {strategy_response.error}")
                 return None
 
-            strategies = strategies_response.data["data"]
-
-            agent_strategies = [s for s in strategies if s.get("agent_id") == agent_id]
-
-            if not agent_strategies:
+            latest = strategy_response.data["data"]
+            if not latest:
                 return None
 
-            latest = max(agent_strategies, key=lambda s: s.get("strategy_id", ""))
-
-            return StrategyData(
-                strategy_id=str(latest["strategy_id"]),
-                agent_id=agent_id,
-                parameters=json.loads(latest["parameters"]),
-                summarized_desc=str(latest["summarized_desc"]),
-                full_desc=str(latest["full_desc"]),
-            )
+            return self._strategy_from_row(latest)
         except Exception as e:
             print(f"Warning: Error fetching latest strategy: {e}")
             return None
 
-    def fetch_all_strategies(self, agent_id: str) -> List[StrategyData]:
+    def fetch_all_strategies(self, agent_id: str, limit: int = 800) -> List[StrategyData]:
         """
         Fetch all strategies for a specific agent.
         
         Args:
             agent_id (str): The ID of the agent to fetch strategies for
+            limit (int): Maximum number of strategies, the API caps it at 800
             
         Returns:
-            List[StrategyData]: List of all strategies for the agent
+            List[StrategyData]: List of all strategies for the agent, newest first
             
         Raises:
             ApiError: If the strategy fetching fails
         """
         try:
             strategies_response = self._make_request(
-                "strategies/get",
-                {},
-                Dict[str, List[Dict[str, Any]]],  # Changed from List[Dict[str, Any]]
+                "strategies/get_by_agent",
+                {"agent_id": agent_id, "limit": limit},
+                Dict[str, List[Dict[str, Any]]],
             )
             if not strategies_response.success or not strategies_response.data:
                 print(f"Warning: Failed to fetch strategies: {strategies_response.error}")
                 return []
 
-            strategies = strategies_response.data["data"]
-
-            agent_strategies = [
-                StrategyData(
-                    strategy_id=str(strat["strategy_id"]),
-                    agent_id=agent_id,
-                    parameters=json.loads(strat["parameters"]),
-                    summarized_desc=str(strat["summarized_desc"]),
-                    full_desc=str(strat["full_desc"]),
-                )
-                for strat in strategies
-                if strat["agent_id"] == agent_id
+            return [
+                self._strategy_from_row(strat)
+                for strat in strategies_response.data["data"]
             ]
-
-            return agent_strategies
         except Exception as e:
             print(f"Warning: Error fetching strategies: {e}")
             return []
@@ -277,8 +417,8 @@ class APIDB:
         Insert chat history messages into the database.
         
         This method stores a sequence of chat messages in the database, associating
-        them with a specific session. It can use a provided base timestamp or
-        generate timestamps automatically.
+        them with a specific session, in a single request. It can use a provided
+        base timestamp or generate timestamps automatically.
         
         Args:
             session_id (str): The ID of the session
@@ -302,33 +442,58 @@ class APIDB:
                     print(f"Warning: Invalid timestamp format: {base_timestamp}")
                     # Continue with current time
 
-            # Process each message in the chat history
-            for i, message in enumerate(chat_history.messages):
-                # Create a timestamp for this message
-                message_time = current_time + timedelta(seconds=i)
-                timestamp = message_time.strftime("%Y-%m-%d %H:%M:%S")
-                
-                # Create message data
-                message_data = {
-                    "session_id": session_id,
-                    "role": message.role,
+            # Timestamps are spaced a second apart to keep the messages in order
+            messages = [
+                {
+                    "message_type": message.role,
                     "content": message.content,
-                    "timestamp": timestamp,
+                    "timestamp": (current_time + timedelta(seconds=i)).strftime(
+                        "%Y-%m-%d %H:%M:%S"
+                    ),
                 }
-                
-                # Send message to API
-                response = self._make_request(
-                    "chat_history/create", message_data, Dict[str, Any]
-                )
-                if not response.success:
-                    print(f"Warning: Failed to insert chat message: {response.error}")
-                    # Continue with next message
-            
+                for i, message in enumerate(chat_history.messages)
+            ]
+            if not messages:
+                return True
+
+            # Send the whole history in one request, stored in one transaction
+            response = self._make_request(
+                "chat_history/create_batch",
+                {"session_id": session_id, "messages": messages},
+                Dict[str, Any],
+            )
+            if not response.success:
+                print(f"Warning: Failed to insert chat history: {response.error}")
+                # Continue execution
+
             return True
         except Exception as e:
             print(f"Warning: Error inserting chat history: {e}")
             return True  # Return True to continue execution
 
+    def insert_llm_calls(self, records: List[Dict[str, Any]]) -> bool:
+        """
+        Insert a batch of LLM call telemetry records.
+
+        Args:
+            records (List[Dict[str, Any]]): Records as produced by `Telemetry`
+
+        Returns:
+            bool: True if the batch was stored, False otherwise
+        """
+        try:
+            response = self._make_request(
+                "llm_calls/create_batch", {"records": records}, Dict[str, Any]
+            )
+            if not response.success:
+                print(f"Warning: Failed to insert llm calls: {response.error}")
+                return False
+
+            return True
+        except Exception as e:
+            print(f"Warning: Error inserting llm calls: {e}")
+            return False
+
     def fetch_latest_notification_str(self, sources: List[str]) -> str:
         """
         Fetch the latest notifications as a formatted string.
@@ -429,7 +594,7 @@ class APIDB:
         """
         try:
             session_response = self._make_request(
-                "session/get",
+                "agent_sessions/get",
                 {"session_id": session_id, "agent_id": agent_id},
                 Dict[str, Dict[str, Any]],
             )
@@ -483,40 +648,31 @@ class APIDB:
             print(f"Warning: Error updating agent session: {e}")
             return True  # Return True to continue execution
 
-    def add_cycle_count(self, session_id: str, agent_id: str) -> bool:
+    def add_cycle_count(
+        self, session_id: str, agent_id: str, trades_count: int = 0
+    ) -> bool:
         """
         Increment the cycle count for an agent session.
         
-        This method increases the cycle count for a specific agent session by 1.
+        This method increases the cycle count for a specific agent session by 1,
+        and its trade count by `trades_count`, in one atomic update on the API.
         
         Args:
             session_id (str): The ID of the session
             agent_id (str): The ID of the agent
+            trades_count (int): Trades made during the cycle
             
         Returns:
             bool: True if the cycle count was incremented successfully, False otherwise
         """
         try:
             response = self._make_request(
-                "agent_sessions/get_v2",
-                {"session_id": session_id, "agent_id": agent_id},
-                Dict[str, Any],
-            )
-            if not response.success or not response.data:
-                print(f"Warning: Failed to get agent session for cycle count: {response.error}")
-                return True  # Return True to continue execution
-                
-            session = response.data["data"][0]
-
-            if not session["cycle_count"]:
-                session["cycle_count"] = 0
-
-            response = self._make_request(
-                "agent_sessions/update",
+                "agent_sessions/increment",
                 {
                     "session_id": session_id,
                     "agent_id": agent_id,
-                    "cycle_count": str(session["cycle_count"] + 1),
+                    "cycle_count": 1,
+                    "trades_count": trades_count,
                 },
                 Dict[str, Any],
             )
@@ -82,6 +82,8 @@ def unassisted_flow(
     research_code_success = False
     err_acc = ""
     regen = False
+    agent.genner.set_stage("research")
+    agent.genner.reset_escalation()
     for i in range(3):
         try:
             if regen:
@@ -124,6 +126,8 @@ def unassisted_flow(
             code_execution_result = agent.container_manager.run_code_in_con(
                 cleaned_research_code, "trader_research_code"
             )
+            if code_execution_result.is_err():
+                agent.genner.report_failure("execution")
             research_code_output, _ = code_execution_result.unwrap()
 
             research_code_success = True
@@ -149,6 +153,8 @@ def unassisted_flow(
     strategy_success = False
     err_acc = ""
     regen = False
+    agent.genner.set_stage("strategy")
+    agent.genner.reset_escalation()
     for i in range(3):
         try:
             if regen:
@@ -192,6 +198,8 @@ def unassisted_flow(
     marketing_code_success = False
     err_acc = ""
     regen = False
+    agent.genner.set_stage("marketing")
+    agent.genner.reset_escalation()
     for i in range(3):
         try:
             if regen:
@@ -227,6 +235,8 @@ def unassisted_flow(
             code_execution_result = agent.container_manager.run_code_in_con(
                 cleaned_marketing_code, "marketing_market_on_daily"
             )
+            if code_execution_result.is_err():
+                agent.genner.report_failure("execution")
             marketing_code_output, reflected_code = code_execution_result.unwrap()
 
             marketing_code_success = True
@@ -92,7 +92,29 @@ def assisted_flow(
     err_acc = ""
     regen = False
     success = False
+    agent.genner.set_stage("research")
+    agent.genner.reset_escalation()
+    if agent.tools is not None:
+        logger.info("Researching by calling tools...")
+        tools_result = agent.gen_research_with_tools(
+            notifications_str=notif_str if notif_str else "Fresh",
+            prev_strategy=prev_strat.summarized_desc if prev_strat else "None yet",
+            rag_summary=rag_summary,
+            before_metric_state=rag_before_metric_state,
+            after_metric_state=rag_after_metric_state,
+            network=network,
+        )
+        if tools_result.is_ok():
+            research_code_output, new_ch = tools_result.unwrap()
+            agent.db.insert_chat_history(session_id, new_ch)
+            success = True
+        else:
+            logger.warning(
+                f"Research with tools failed, falling back to research code..., err: \n{tools_result.unwrap_err()}"
+            )
     for i in range(3):
+        if success:
+            break
         try:
             if regen:
                 research_code, new_ch = agent.gen_better_code(
@@ -122,6 +144,8 @@ def assisted_flow(
             code_execution_result = agent.container_manager.run_code_in_con(
                 research_code, "trader_research_code"
             )
+            if code_execution_result.is_err():
+                agent.genner.report_failure("execution")
             research_code_output, _ = code_execution_result.unwrap()
 
             success = True
@@ -147,6 +171,8 @@ def assisted_flow(
     err_acc = ""
     regen = False
     success = False
+    agent.genner.set_stage("strategy")
+    agent.genner.reset_escalation()
     for i in range(3):
         try:
             if regen:
@@ -188,7 +214,24 @@ def assisted_flow(
     err_acc = ""
     regen = False
     success = False
+    agent.genner.set_stage("address_research")
+    agent.genner.reset_escalation()
+    if agent.tools is not None:
+        logger.info("Researching addresses by calling tools...")
+        tools_result = agent.gen_address_research_with_tools(
+            strategy_output=strategy_output, network=network
+        )
+        if tools_result.is_ok():
+            address_research_output, new_ch = tools_result.unwrap()
+            agent.db.insert_chat_history(session_id, new_ch)
+            success = True
+        else:
+            logger.warning(
+                f"Address research with tools failed, falling back to address research code..., err: \n{tools_result.unwrap_err()}"
+            )
     for i in range(10):
+        if success:
+            break
         try:
             if regen:
                 logger.info("Regenning on address research")
@@ -209,6 +252,8 @@ def assisted_flow(
             code_execution_result = agent.container_manager.run_code_in_con(
                 address_research_code, "trader_address_research"
             )
+            if code_execution_result.is_err():
+                agent.genner.report_failure("execution")
             address_research_output, _ = code_execution_result.unwrap()
 
             success = True
@@ -238,6 +283,8 @@ def assisted_flow(
     code_output = ""
     success = False
     regen = False
+    agent.genner.set_stage("trading")
+    agent.genner.reset_escalation()
     for i in range(3):
         try:
             if regen:
@@ -265,6 +312,8 @@ def assisted_flow(
             code_execution_result = agent.container_manager.run_code_in_con(
                 trading_code, "trader_trading_code"
             )
+            if code_execution_result.is_err():
+                agent.genner.report_failure("execution")
             trading_code_output, reflected_code = code_execution_result.unwrap()
 
             success = True
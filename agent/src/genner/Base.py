@@ -1,14 +1,30 @@
+import json
+import time
 from abc import ABC, abstractmethod
-from typing import Callable, List, Tuple
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from ollama import ChatResponse, chat
+from loguru import logger
+from ollama import ChatResponse, Client
 from result import Err, Ok, Result
 
 from src.config import (
     OllamaConfig,
+    ReasoningConfig,
 )
+from src.telemetry import LLMCall, Telemetry, estimate_cost, usage_counts
+from src.tool_decorator import ToolRegistry
 from src.types import ChatHistory
 
+from .Structured import (
+    CODE_TOOL,
+    LIST_TOOL,
+    code_from_arguments,
+    list_from_arguments,
+    output_tools,
+)
+from .Tools import ToolCallRecord, openai_tool_loop
+
 
 class Genner(ABC):
     def __init__(self, identifier: str, do_stream: bool):
@@ -24,6 +40,9 @@ class Genner(ABC):
         """
         self.identifier = identifier
         self.do_stream = do_stream
+        self.stage: str | None = None
+        self.stage_calls = 0
+        self.telemetry: Telemetry | None = None
 
     @abstractmethod
     def ch_completion(self, messages: ChatHistory) -> Result[str, str]:
@@ -54,6 +73,258 @@ class Genner(ABC):
         """
         self.do_stream = final_state
 
+    def set_stage(self, stage: str | None):
+        """
+        Set the flow stage the next completions are for.
+
+        Genners that support reasoning controls look the stage up in their
+        config's `stage_reasoning`, so cheap stages like summarizing do not pay
+        for long hidden reasoning.
+
+        Args:
+            stage (str | None): Stage name, e.g. "address_research", or None for the default
+        """
+        self.stage = stage
+        self.stage_calls = 0
+
+    def set_telemetry(self, telemetry: Telemetry | None):
+        """
+        Set where the records of this generator's LLM calls go.
+
+        Args:
+            telemetry (Telemetry | None): The session's collector, or None to stop recording
+        """
+        self.telemetry = telemetry
+
+    def record_call(
+        self,
+        model: str,
+        started: float,
+        first_token_at: Optional[float] = None,
+        usage: Optional[Dict[str, Any]] = None,
+        provider: Optional[str] = None,
+        ok: bool = True,
+        error: Optional[str] = None,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        reasoning_tokens: int = 0,
+    ):
+        """
+        Record an LLM call made for the current stage.
+
+        Every call after `set_stage` counts as the next attempt of that stage.
+        The cost is taken from the usage when the provider reports it and
+        estimated from the model's list price otherwise. Without a usage or
+        token counts the cost is unknown and recorded as None.
+
+        Args:
+            model (str): Model requested
+            started (float): Monotonic time the call started
+            first_token_at (Optional[float]): Monotonic time of the first token, None if not streamed
+            usage (Optional[Dict[str, Any]]): OpenAI-style usage, overrides the token counts below
+            provider (Optional[str]): Provider that served the call
+            ok (bool): Whether the call succeeded
+            error (Optional[str]): Error message of a failed call
+            input_tokens (int): Prompt tokens
+            output_tokens (int): Completion tokens, reasoning included
+            reasoning_tokens (int): Hidden reasoning tokens
+        """
+        self.stage_calls += 1
+        if self.telemetry is None:
+            return
+
+        cost = None
+        if usage:
+            input_tokens, output_tokens, reasoning_tokens, cost = usage_counts(usage)
+        if cost is None and (usage or input_tokens or output_tokens):
+            cost = estimate_cost(model, input_tokens, output_tokens)
+
+        latency = time.monotonic() - started
+        self.telemetry.record(
+            LLMCall(
+                genner=self.identifier,
+                model=model,
+                stage=self.stage,
+                attempt=self.stage_calls,
+                provider=provider,
+                ttft_s=first_token_at - started if first_token_at else None,
+                latency_s=latency,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                reasoning_tokens=reasoning_tokens,
+                cost_usd=cost,
+                ok=ok,
+                error=error,
+                started_at=(
+                    datetime.now(timezone.utc) - timedelta(seconds=latency)
+                ).strftime("%Y-%m-%d %H:%M:%S"),
+            )
+        )
+
+    def get_reasoning(self, config) -> ReasoningConfig:
+        """
+        Get the reasoning controls for the current stage.
+
+        Args:
+            config: LLM config with `reasoning` and `stage_reasoning` attributes
+
+        Returns:
+            ReasoningConfig: The stage's override if there is one, else the config's default
+        """
+        if self.stage is not None and self.stage in config.stage_reasoning:
+            return config.stage_reasoning[self.stage]
+        return config.reasoning
+
+    def prepare(self, session_interval: int):
+        """
+        Get the generator ready for a session that runs a cycle every `session_interval` seconds.
+
+        Remote generators have nothing to prepare. Local ones, like `OllamaGenner`,
+        load their model and keep it loaded between cycles.
+
+        Args:
+            session_interval (int): Seconds the session waits between two cycles
+        """
+        pass
+
+    def report_failure(self, kind: str):
+        """
+        Report that the last generated output failed further down the flow.
+
+        Single-model generators ignore this. Generators that can switch models,
+        like `CascadeGenner`, use it to decide when to escalate.
+
+        Args:
+            kind (str): What failed, e.g. "execution" when generated code errored in the container
+        """
+        pass
+
+    def reset_escalation(self):
+        """
+        Go back to the cheapest model at the start of a new flow step.
+
+        Single-model generators ignore this.
+        """
+        pass
+
+    def structured_completion(
+        self, messages: ChatHistory, tool: str
+    ) -> Result[Tuple[Dict[str, Any] | None, str], str]:
+        """
+        Generate a completion that answers by calling one of the `output_tools`.
+
+        Generators whose provider supports tool or JSON-schema calling override
+        this; `generate_code_structured` and `generate_list_structured` build on it.
+
+        Args:
+            messages (ChatHistory): Chat history containing the conversation context
+            tool (str): Short name of the output tool to call, e.g. `CODE_TOOL`
+
+        Returns:
+            Result[Tuple[Dict[str, Any] | None, str], str]:
+                Ok(Tuple[Dict[str, Any] | None, str]): The tool call's arguments, None
+                    if the model answered in text instead, and the text content
+                Err(str): Error message if the API call fails
+        """
+        return Err(
+            f"{type(self).__name__}.structured_completion: structured output is not supported"
+        )
+
+    def run_tools(
+        self,
+        messages: ChatHistory,
+        registry: ToolRegistry,
+        instance: Any,
+        max_rounds: int = 6,
+    ) -> Result[Tuple[str, List[ToolCallRecord]], str]:
+        """
+        Offer the registry's tools to the model and execute its calls in-process until it answers.
+
+        Generators whose provider supports tool calling override this. Each
+        round is one completion; the tools it calls are run right away and their
+        outputs sent back with the next round.
+
+        Args:
+            messages (ChatHistory): Chat history containing the conversation context
+            registry (ToolRegistry): Tools offered to the model
+            instance (Any): Object the tools are bound to
+            max_rounds (int): Maximum number of completions
+
+        Returns:
+            Result[Tuple[str, List[ToolCallRecord]], str]:
+                Ok(Tuple[str, List[ToolCallRecord]]): The final answer and the tools called
+                Err(str): Error message if tool calling is unsupported or failed
+        """
+        return Err(f"{type(self).__name__}.run_tools: tool calling is not supported")
+
+    def generate_code_structured(
+        self, messages: ChatHistory
+    ) -> Result[Tuple[List[str], str], str]:
+        """
+        Generate code as the typed argument of a `submit_code` tool call.
+
+        If the model answers in text anyway, the code is extracted from the text
+        as in `generate_code`, without a second generation.
+
+        Args:
+            messages (ChatHistory): Chat history containing the conversation context
+
+        Returns:
+            Result[Tuple[List[str], str], str]:
+                Ok(Tuple[List[str], str]): Tuple containing:
+                    - List[str]: The code, as a single block
+                    - str: Raw response, with the code in a fenced block
+                Err(str): Error message if generation failed
+        """
+        completion_result = self.structured_completion(messages, CODE_TOOL)
+        if err := completion_result.err():
+            return Err(
+                f"{type(self).__name__}.generate_code_structured: completion_result.is_err(): \n{err}"
+            )
+
+        arguments, content = completion_result.unwrap()
+        if arguments is None:
+            return self.extract_code(content).map(lambda codes: (codes, content))
+
+        result = code_from_arguments(arguments, content)
+        if result.is_ok() and self.do_stream and getattr(self, "stream_fn", None):
+            self.stream_fn(result.unwrap()[1])  # type: ignore
+        return result
+
+    def generate_list_structured(
+        self, messages: ChatHistory
+    ) -> Result[Tuple[List[List[str]], str], str]:
+        """
+        Generate a list as the typed argument of a `submit_list` tool call.
+
+        If the model answers in text anyway, the list is extracted from the text
+        as in `generate_list`, without a second generation.
+
+        Args:
+            messages (ChatHistory): Chat history containing the conversation context
+
+        Returns:
+            Result[Tuple[List[List[str]], str], str]:
+                Ok(Tuple[List[List[str]], str]): Tuple containing:
+                    - List[List[str]]: The items, as a single list
+                    - str: Raw response, with the items in a fenced YAML block
+                Err(str): Error message if generation failed
+        """
+        completion_result = self.structured_completion(messages, LIST_TOOL)
+        if err := completion_result.err():
+            return Err(
+                f"{type(self).__name__}.generate_list_structured: completion_result.is_err(): \n{err}"
+            )
+
+        arguments, content = completion_result.unwrap()
+        if arguments is None:
+            return self.extract_list(content).map(lambda lists: (lists, content))
+
+        result = list_from_arguments(arguments, content)
+        if result.is_ok() and self.do_stream and getattr(self, "stream_fn", None):
+            self.stream_fn(result.unwrap()[1])  # type: ignore
+        return result
+
     @abstractmethod
     def generate_code(
         self, messages: ChatHistory, blocks: List[str] = [""]
@@ -170,13 +441,146 @@ class OllamaGenner(Genner):
 
         self.config = config
         self.stream_fn = stream_fn
+        self.keep_alive = config.keep_alive
+        self.client = Client(host=config.endpoint.split("/api/")[0])
+        self.last_timings: Dict[str, float] = {}
+
+    def prepare(self, session_interval: int):
+        """
+        Keep the model loaded across the session's cycles and load it now.
+
+        The keep-alive sent with every request becomes the session interval plus
+        `keep_alive_margin`, so Ollama does not evict the model while the session
+        sleeps between cycles.
+
+        Args:
+            session_interval (int): Seconds the session waits between two cycles
+        """
+        self.keep_alive = f"{session_interval + self.config.keep_alive_margin}s"
+
+        if not self.config.preload:
+            return
+
+        preload_result = self.preload()
+        if err := preload_result.err():
+            logger.warning(f"OllamaGenner.prepare: {err}")
+            return
+
+        if not self.wait_until_ready(self.config.ready_timeout):
+            logger.warning(
+                f"OllamaGenner.prepare: {self.config.model} is not loaded after {self.config.ready_timeout}s"
+            )
+
+    def preload(self) -> Result[float, str]:
+        """
+        Load the model into memory without generating anything.
+
+        Returns:
+            Result[float, str]:
+                Ok(float): Seconds Ollama spent loading the model, 0 if it was already loaded
+                Err(str): Error message if the model could not be loaded
+        """
+        try:
+            assert self.config.model is not None, "Model name is not provided"
+
+            # A generate request with no prompt only loads the model
+            response = self.client.generate(
+                model=self.config.model, keep_alive=self.keep_alive
+            )
+            load_s = (response.load_duration or 0) / 1e9
+        except AssertionError as e:
+            return Err(f"OllamaGenner.preload: {e}")
+        except Exception as e:
+            return Err(
+                f"OllamaGenner.preload: failed to load {self.config.model}: \n{e}"
+            )
+
+        logger.info(f"OllamaGenner: preloaded {self.config.model} in {load_s:.2f}s")
+        return Ok(load_s)
+
+    def is_ready(self) -> bool:
+        """
+        Check whether the model is currently loaded by Ollama.
+
+        Returns:
+            bool: True if the model is loaded, False if not or if Ollama is unreachable
+        """
+        try:
+            loaded = self.client.ps().models
+        except Exception:
+            return False
+
+        return any(
+            model.model == self.config.model or model.name == self.config.model
+            for model in loaded
+        )
+
+    def wait_until_ready(self, timeout: float, interval: float = 1.0) -> bool:
+        """
+        Poll Ollama until the model is loaded.
+
+        Args:
+            timeout (float): Maximum seconds to wait
+            interval (float): Seconds between two probes
+
+        Returns:
+            bool: True if the model was loaded before the timeout
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.is_ready():
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(interval)
+
+    def _record_timings(
+        self, response: ChatResponse, started: float, first_token_at: float | None
+    ):
+        """
+        Split the latency of a completion into model load, time to first token and generation.
+
+        Ollama reports the load time in the final response, so it is taken out of
+        the measured time to first token.
+
+        Args:
+            response (ChatResponse): The final (done) response
+            started (float): Monotonic time the request was sent
+            first_token_at (float | None): Monotonic time of the first token, None when not streaming
+        """
+        finished = time.monotonic()
+        load_s = (response.load_duration or 0) / 1e9
+        first_token_at = first_token_at or finished
+
+        self.last_timings = {
+            "load_s": load_s,
+            "ttft_s": max(first_token_at - started - load_s, 0.0),
+            "generation_s": (response.eval_duration or 0) / 1e9,
+            "total_s": finished - started,
+            "output_tokens": response.eval_count or 0,
+        }
+        logger.info(
+            f"OllamaGenner: {self.config.model} load {load_s:.2f}s, "
+            f"ttft {self.last_timings['ttft_s']:.2f}s, "
+            f"generation {self.last_timings['generation_s']:.2f}s "
+            f"for {self.last_timings['output_tokens']} tokens"
+        )
+        self.record_call(
+            self.config.model or "",
+            started,
+            first_token_at,
+            provider="ollama",
+            input_tokens=response.prompt_eval_count or 0,
+            output_tokens=response.eval_count or 0,
+        )
 
     def ch_completion(self, messages: ChatHistory) -> Result[str, str]:
         """
         Generate a completion using the Ollama API.
         
         This method sends the chat history to the Ollama API and retrieves
-        a completion response, with optional streaming support.
+        a completion response, with optional streaming support. Load time
+        and time to first token are recorded separately in `last_timings`.
         
         Args:
             messages (ChatHistory): Chat history containing the conversation context
@@ -187,35 +591,151 @@ class OllamaGenner(Genner):
                 Err(str): Error message if the API call fails
         """
         final_response = ""
+        response = None
+        started = time.monotonic()
+        first_token_at = None
         try:
             assert self.config.model is not None, "Model name is not provided"
 
             if self.do_stream:
                 assert self.stream_fn is not None
 
-                for chunk in chat(self.config.model, messages.as_native(), stream=True):
+                for chunk in self.client.chat(
+                    self.config.model,
+                    messages.as_native(),
+                    stream=True,
+                    keep_alive=self.keep_alive,
+                ):
                     if chunk["message"] and chunk["message"]["content"]:
+                        if first_token_at is None:
+                            first_token_at = time.monotonic()
                         token = chunk["message"]["content"]
                         self.stream_fn(token)
                         final_response += token
+                    if chunk.done:
+                        self._record_timings(chunk, started, first_token_at)
             else:
-                response: ChatResponse = chat(self.config.model, messages.as_native())
+                response: ChatResponse = self.client.chat(
+                    self.config.model, messages.as_native(), keep_alive=self.keep_alive
+                )
                 assert (
                     response.message.content is not None
                 ), "No content in the response"
 
                 final_response = response.message.content
+                self._record_timings(response, started, None)
         except AssertionError as e:
+            self.record_call(
+                self.config.model or "", started, first_token_at, ok=False, error=str(e)
+            )
             return Err(
                 f"OllamaGenner.ch_completion: response.message.content is None: {e}"
             )
         except Exception as e:
+            self.record_call(
+                self.config.model or "", started, first_token_at, ok=False, error=str(e)
+            )
             return Err(
                 f"An unexpected Ollama error while generating code with {self.config.name}, raw response: {response} occured: \n{e}"
             )
 
         return Ok(final_response)
 
+    def run_tools(
+        self,
+        messages: ChatHistory,
+        registry: ToolRegistry,
+        instance: Any,
+        max_rounds: int = 6,
+    ) -> Result[Tuple[str, List[ToolCallRecord]], str]:
+        """
+        Let the model call the registry's tools through Ollama's tool support until it answers.
+
+        Args:
+            messages (ChatHistory): Chat history containing the conversation context
+            registry (ToolRegistry): Tools offered to the model
+            instance (Any): Object the tools are bound to
+            max_rounds (int): Maximum number of completions
+
+        Returns:
+            Result[Tuple[str, List[ToolCallRecord]], str]:
+                Ok(Tuple[str, List[ToolCallRecord]]): The final answer and the tools called
+                Err(str): Error message if a completion failed
+        """
+        assert self.config.model is not None, "Model name is not provided"
+        model = self.config.model
+        tools = registry.openai_tools()
+
+        def send(transcript: List[Dict[str, Any]]) -> Dict[str, Any]:
+            started = time.monotonic()
+            try:
+                response: ChatResponse = self.client.chat(
+                    model, transcript, tools=tools, keep_alive=self.keep_alive
+                )
+            except Exception as e:
+                self.record_call(model, started, ok=False, error=str(e))
+                raise
+            self._record_timings(response, started, None)
+            return response.message.model_dump(exclude_none=True)
+
+        try:
+            return openai_tool_loop(
+                send, messages.as_native(), registry, instance, max_rounds
+            )
+        except Exception as e:
+            return Err(
+                f"OllamaGenner.run_tools: An unexpected Ollama error while calling tools with {self.config.name} occured: \n{e}"
+            )
+
+    def structured_completion(
+        self, messages: ChatHistory, tool: str
+    ) -> Result[Tuple[Dict[str, Any] | None, str], str]:
+        """
+        Generate a completion constrained to the JSON schema of an output tool's arguments.
+
+        Ollama's structured outputs (`format`) make the model emit the arguments
+        as JSON directly, which works for models without tool-calling support.
+
+        Args:
+            messages (ChatHistory): Chat history containing the conversation context
+            tool (str): Short name of the output tool, e.g. `CODE_TOOL`
+
+        Returns:
+            Result[Tuple[Dict[str, Any] | None, str], str]:
+                Ok(Tuple[Dict[str, Any] | None, str]): The arguments, None if the
+                    output was not a JSON object, and the raw output in that case
+                Err(str): Error message if the API call fails
+        """
+        started = time.monotonic()
+        try:
+            assert self.config.model is not None, "Model name is not provided"
+
+            response: ChatResponse = self.client.chat(
+                self.config.model,
+                messages.as_native(),
+                format=output_tools.parameters(tool),
+                keep_alive=self.keep_alive,
+            )
+            content = response.message.content or ""
+            self._record_timings(response, started, None)
+        except Exception as e:
+            self.record_call(
+                self.config.model or "", started, ok=False, error=str(e)
+            )
+            return Err(
+                f"OllamaGenner.structured_completion: An unexpected Ollama error while generating {tool} with {self.config.name} occured: \n{e}"
+            )
+
+        try:
+            arguments = json.loads(content)
+        except json.JSONDecodeError:
+            return Ok((None, content))
+
+        if not isinstance(arguments, dict):
+            return Ok((None, content))
+        # The output is the arguments themselves, there is no text next to them
+        return Ok((arguments, ""))
+
     def generate_code(
         self, messages: ChatHistory, blocks: List[str] = [""]
     ) -> Result[Tuple[List[str], str], str]:
@@ -225,6 +745,9 @@ class OllamaGenner(Genner):
         This method handles the complete process of generating code:
         1. Getting a completion from the model
         2. Extracting code blocks from the response
+
+        With `structured_output` on, the code comes back as a typed tool call
+        instead, see `generate_code_structured`.
         
         Args:
             messages (ChatHistory): Chat history containing the conversation context
@@ -237,6 +760,9 @@ class OllamaGenner(Genner):
                     - str: Raw response from the model
                 Err(str): Error message if generation failed
         """
+        if self.config.structured_output and len(blocks) == 1:
+            return self.generate_code_structured(messages)
+
         try:
             completion_result = self.ch_completion(messages)
 
@@ -271,6 +797,9 @@ class OllamaGenner(Genner):
         This method handles the complete process of generating structured lists:
         1. Getting a completion from the model
         2. Extracting lists from the response
+
+        With `structured_output` on, the list comes back as a typed tool call
+        instead, see `generate_list_structured`.
         
         Args:
             messages (ChatHistory): Chat history containing the conversation context
@@ -283,6 +812,9 @@ class OllamaGenner(Genner):
                     - str: Raw response from the model
                 Err(str): Error message if generation failed
         """
+        if self.config.structured_output and len(blocks) == 1:
+            return self.generate_list_structured(messages)
+
         try:
             completion_result = self.ch_completion(messages)
 
@@ -0,0 +1,347 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Tuple
+
+from loguru import logger
+from result import Err, Ok, Result
+
+from src.tool_decorator import ToolRegistry
+from src.types import ChatHistory
+
+from .Base import Genner
+from .Tools import ToolCallRecord
+
+
+@dataclass
+class CascadeStage:
+    """
+    A generator taking part in a cascade, with its escalation rules.
+
+    Attributes:
+        genner (Genner): The generator serving this stage
+        escalate_on (List[str]): Failure kinds that count towards escalating,
+            any of "completion", "extraction", "preflight" and "execution"
+        max_failures (int): Failures of those kinds tolerated before escalating
+    """
+
+    genner: Genner
+    escalate_on: List[str] = field(
+        default_factory=lambda: ["completion", "extraction", "preflight", "execution"]
+    )
+    max_failures: int = 1
+
+
+def preflight_code(codes: List[str]) -> Result[None, str]:
+    """
+    Check extracted code before it is sent to the container.
+
+    Only compiles the code, so syntax errors and truncated outputs are caught
+    without paying for a container round trip.
+
+    Args:
+        codes (List[str]): Extracted code blocks
+
+    Returns:
+        Result[None, str]:
+            Ok(None): All blocks compile
+            Err(str): The first compilation error
+    """
+    for code in codes:
+        try:
+            compile(code, "<generated>", "exec")
+        except (SyntaxError, ValueError) as e:
+            return Err(f"preflight_code: generated code does not compile: \n{e}")
+
+    return Ok(None)
+
+
+def uses_structured_output(genner: Genner, blocks: List[str]) -> bool:
+    """
+    Check whether a generator returns code and lists through tool calls for these blocks.
+
+    Args:
+        genner (Genner): A cascade stage's generator
+        blocks (List[str]): XML tag names requested by the caller
+
+    Returns:
+        bool: True if its config enables `structured_output` and a single block is requested
+    """
+    config = getattr(genner, "config", None)
+    return bool(getattr(config, "structured_output", False)) and len(blocks) == 1
+
+
+class CascadeGenner(Genner):
+    def __init__(
+        self,
+        stages: List[CascadeStage],
+        stream_fn: Callable[[str], None] | None,
+    ):
+        """
+        Initialize a generator that escalates through several generators.
+
+        Requests go to the current stage, starting with the first (cheapest) one.
+        Failures of a kind listed in the stage's `escalate_on` are counted, and once
+        `max_failures` is reached the cascade moves to the next stage. Failures
+        that happen inside a call (completion, extraction, preflight) are retried
+        on the next stage right away; execution failures are reported by the flow
+        through `report_failure` and take effect on the next call.
+
+        Args:
+            stages (List[CascadeStage]): Stages ordered from cheapest to most capable
+            stream_fn (Callable[[str], None] | None): Function to call with streamed tokens,
+                or None to disable streaming
+        """
+        assert stages, "A cascade needs at least one stage"
+
+        super().__init__(
+            "cascade-" + "-".join(stage.genner.identifier for stage in stages),
+            True if stream_fn else False,
+        )
+        self.stages = stages
+        self.stream_fn = stream_fn
+        self.level = 0
+        self.failures = 0
+
+    @property
+    def current(self) -> CascadeStage:
+        return self.stages[self.level]
+
+    def set_do_stream(self, final_state: bool):
+        super().set_do_stream(final_state)
+        for stage in self.stages:
+            stage.genner.set_do_stream(final_state)
+
+    def set_stage(self, stage: str | None):
+        super().set_stage(stage)
+        for stage_ in self.stages:
+            stage_.genner.set_stage(stage)
+
+    def set_telemetry(self, telemetry):
+        super().set_telemetry(telemetry)
+        for stage in self.stages:
+            stage.genner.set_telemetry(telemetry)
+
+    def prepare(self, session_interval: int):
+        for stage in self.stages:
+            stage.genner.prepare(session_interval)
+
+    def report_failure(self, kind: str):
+        """
+        Count a failure against the current stage, escalating if it has too many.
+
+        Args:
+            kind (str): What failed, e.g. "execution"
+        """
+        self._escalate(kind)
+
+    def reset_escalation(self):
+        """Go back to the first stage."""
+        self.level = 0
+        self.failures = 0
+
+    def _escalate(self, kind: str) -> bool:
+        """
+        Count a failure and move to the next stage if the current one's rules say so.
+
+        Args:
+            kind (str): What failed
+
+        Returns:
+            bool: True if the cascade moved to a new stage
+        """
+        stage = self.current
+        if kind not in stage.escalate_on:
+            return False
+
+        self.failures += 1
+        if self.failures < stage.max_failures or self.level + 1 >= len(self.stages):
+            return False
+
+        self.level += 1
+        self.failures = 0
+        logger.info(
+            f"CascadeGenner: {kind} failure on {stage.genner.identifier}, "
+            f"escalating to {self.current.genner.identifier}"
+        )
+        return True
+
+    def ch_completion(self, messages: ChatHistory) -> Result[str, str]:
+        """
+        Generate a completion on the current stage, escalating on API failures.
+
+        Args:
+            messages (ChatHistory): Chat history containing the conversation context
+
+        Returns:
+            Result[str, str]:
+                Ok(str): The generated text if successful
+                Err(str): Error message from the last stage tried
+        """
+        while True:
+            result = self.current.genner.ch_completion(messages)
+            if result.is_ok() or not self._escalate("completion"):
+                return result
+
+    def run_tools(
+        self,
+        messages: ChatHistory,
+        registry: ToolRegistry,
+        instance: Any,
+        max_rounds: int = 6,
+    ) -> Result[Tuple[str, List[ToolCallRecord]], str]:
+        """
+        Run a tool loop on the current stage, escalating when it fails.
+
+        Args:
+            messages (ChatHistory): Chat history containing the conversation context
+            registry (ToolRegistry): Tools offered to the model
+            instance (Any): Object the tools are bound to
+            max_rounds (int): Maximum number of completions
+
+        Returns:
+            Result[Tuple[str, List[ToolCallRecord]], str]:
+                Ok(Tuple[str, List[ToolCallRecord]]): The final answer and the tools called
+                Err(str): Error message from the last stage tried
+        """
+        while True:
+            result = self.current.genner.run_tools(messages, registry, instance, max_rounds)
+            if result.is_ok() or not self._escalate("completion"):
+                return result
+
+    def generate_code(
+        self, messages: ChatHistory, blocks: List[str] = [""]
+    ) -> Result[Tuple[List[str], str], str]:
+        """
+        Generate code, escalating on completion, extraction and preflight failures.
+
+        Args:
+            messages (ChatHistory): Chat history containing the conversation context
+            blocks (List[str]): XML tag names to extract content from before processing into code
+
+        Returns:
+            Result[Tuple[List[str], str], str]:
+                Ok(Tuple[List[str], str]): Tuple containing:
+                    - List[str]: Processed code blocks
+                    - str: Raw response from the model
+                Err(str): Error message if generation failed
+        """
+        while True:
+            stage = self.current
+
+            if uses_structured_output(stage.genner, blocks):
+                structured_result = stage.genner.generate_code_structured(messages)
+                if err := structured_result.err():
+                    if self._escalate("completion"):
+                        continue
+                    return Err(f"CascadeGenner.generate_code: \n{err}")
+
+                processed_code, raw_response = structured_result.unwrap()
+            else:
+                completion_result = stage.genner.ch_completion(messages)
+                if err := completion_result.err():
+                    if self._escalate("completion"):
+                        continue
+                    return Err(
+                        f"CascadeGenner.generate_code: completion_result.is_err(): \n{err}"
+                    )
+
+                raw_response = completion_result.unwrap()
+
+                extract_code_result = stage.genner.extract_code(raw_response, blocks)
+                if err := extract_code_result.err():
+                    if self._escalate("extraction"):
+                        continue
+                    return Err(
+                        f"CascadeGenner.generate_code: extract_code_result.is_err(): \n{err}"
+                    )
+
+                processed_code = extract_code_result.unwrap()
+
+            preflight_result = preflight_code(processed_code)
+            if err := preflight_result.err():
+                if self._escalate("preflight"):
+                    continue
+                return Err(f"CascadeGenner.generate_code: \n{err}")
+
+            return Ok((processed_code, raw_response))
+
+    def generate_list(
+        self, messages: ChatHistory, blocks: List[str] = [""]
+    ) -> Result[Tuple[List[List[str]], str], str]:
+        """
+        Generate lists, escalating on completion and extraction failures.
+
+        Args:
+            messages (ChatHistory): Chat history containing the conversation context
+            blocks (List[str]): XML tag names to extract content from before processing into lists
+
+        Returns:
+            Result[Tuple[List[List[str]], str], str]:
+                Ok(Tuple[List[List[str]], str]): Tuple containing:
+                    - List[List[str]]: Processed lists of items
+                    - str: Raw response from the model
+                Err(str): Error message if generation failed
+        """
+        while True:
+            stage = self.current
+
+            if uses_structured_output(stage.genner, blocks):
+                structured_result = stage.genner.generate_list_structured(messages)
+                if err := structured_result.err():
+                    if self._escalate("completion"):
+                        continue
+                    return Err(f"CascadeGenner.generate_list: \n{err}")
+                return structured_result
+
+            completion_result = stage.genner.ch_completion(messages)
+            if err := completion_result.err():
+                if self._escalate("completion"):
+                    continue
+                return Err(
+                    f"CascadeGenner.generate_list: completion_result.is_err(): \n{err}"
+                )
+
+            raw_response = completion_result.unwrap()
+
+            extract_list_result = stage.genner.extract_list(raw_response, blocks)
+            if err := extract_list_result.err():
+                if self._escalate("extraction"):
+                    continue
+                return Err(
+                    f"CascadeGenner.generate_list: extract_list_result.is_err(): \n{err}"
+                )
+
+            return Ok((extract_list_result.unwrap(), raw_response))
+
+    def extract_code(
+        self, response: str, blocks: List[str] = [""]
+    ) -> Result[List[str], str]:
+        """
+        Extract code blocks with the current stage's extractor.
+
+        Args:
+            response (str): The raw response from the model
+            blocks (List[str]): XML tag names to extract content from before processing into code
+
+        Returns:
+            Result[List[str], str]:
+                Ok(List[str]): List of extracted code blocks
+                Err(str): Error message if extraction failed
+        """
+        return self.current.genner.extract_code(response, blocks)
+
+    def extract_list(
+        self, response: str, blocks: List[str] = [""]
+    ) -> Result[List[List[str]], str]:
+        """
+        Extract lists with the current stage's extractor.
+
+        Args:
+            response (str): The raw response from the model
+            blocks (List[str]): XML tag names to extract content from before processing into lists
+
+        Returns:
+            Result[List[List[str]], str]:
+                Ok(List[List[str]]): List of extracted lists
+                Err(str): Error message if extraction failed
+        """
+        return self.current.genner.extract_list(response, blocks)
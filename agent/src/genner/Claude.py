@@ -1,15 +1,51 @@
 import re
-from typing import Callable, List, Tuple
+import time
+from typing import Any, Callable, Dict, List, Tuple
 
 import yaml
 from anthropic import Anthropic, TextEvent
+from loguru import logger
 from result import Err, Ok, Result
 
-from src.config import ClaudeConfig
+from src.config import ClaudeConfig, ReasoningConfig
 from src.helper import extract_content
+from src.tool_decorator import ToolRegistry
 from src.types import ChatHistory
 
 from .Base import Genner
+from .Structured import output_tools
+from .Tools import ToolCallRecord, anthropic_tool_loop
+
+
+# Share of the output budget spent on thinking for each effort level
+THINKING_EFFORT_RATIO = {"low": 0.2, "medium": 0.5, "high": 0.8}
+MIN_THINKING_BUDGET = 1024
+
+
+def thinking_params(reasoning: ReasoningConfig, max_tokens: int) -> Dict[str, Any]:
+    """
+    Map reasoning controls to the keyword arguments for Claude's extended thinking.
+
+    Args:
+        reasoning (ReasoningConfig): Reasoning controls for the current stage
+        max_tokens (int): The request's `max_tokens`, which the thinking budget must stay under
+
+    Returns:
+        Dict[str, Any]: `{"thinking": {...}}` when thinking is on and fits, else an empty dict
+    """
+    if not reasoning.enabled:
+        return {}
+
+    if reasoning.max_tokens is not None:
+        budget = reasoning.max_tokens
+    else:
+        budget = int(max_tokens * THINKING_EFFORT_RATIO.get(reasoning.effort or "medium", 0.5))
+
+    budget = min(max(budget, MIN_THINKING_BUDGET), max_tokens - 1)
+    if budget < MIN_THINKING_BUDGET:
+        return {}
+
+    return {"thinking": {"type": "enabled", "budget_tokens": budget}}
 
 
 class ClaudeGenner(Genner):
@@ -42,7 +78,8 @@ class ClaudeGenner(Genner):
         
         This method sends the chat history to the Claude API and retrieves
         a completion response, with optional streaming support. It separates
-        the system message from the rest of the chat history.
+        the system message from the rest of the chat history. Extended thinking
+        is enabled when the current stage's reasoning controls ask for it.
         
         Args:
             messages (ChatHistory): Chat history containing the conversation context
@@ -58,42 +95,222 @@ class ClaudeGenner(Genner):
         ch = ChatHistory(messages.messages[1:])
 
         final_response = ""
+        reasoning = self.get_reasoning(self.config)
+        max_tokens = reasoning.max_output_tokens or self.config.max_tokens
+        thinking = thinking_params(reasoning, max_tokens)
+
+        started = time.monotonic()
+        first_token_at = None
 
         try:
             if self.do_stream:
                 assert self.stream_fn is not None
 
                 with self.client.messages.stream(
-                    model="claude-3-opus-20240229",
-                    max_tokens=1024,
+                    model=self.config.model,
+                    max_tokens=max_tokens,
                     messages=ch.as_native(),  # type: ignore
                     system=system,
+                    **thinking,
                 ) as stream:
                     for chunk in stream:
+                        if first_token_at is None and chunk.type in ("text", "thinking"):
+                            first_token_at = time.monotonic()
                         if isinstance(chunk, TextEvent):
                             token = chunk.text
                             final_response += token
                             self.stream_fn(token)
+                    response = stream.get_final_message()
             else:
                 response = self.client.messages.create(
                     model=self.config.model,  # e.g. "claude-3-opus-20240229"
                     messages=ch.as_native(),  # type: ignore
-                    max_tokens=self.config.max_tokens,
+                    max_tokens=max_tokens,
                     system=system,
+                    **thinking,
+                )
+
+                # Thinking blocks come before the answer when extended thinking is on
+                final_response = "".join(
+                    block.text for block in response.content if block.type == "text"
                 )
 
-                final_response = response.content[0].text  # type: ignore
+            self._log_usage(response.usage, thinking)
 
             assert isinstance(final_response, str)
         except AssertionError as e:
+            self.record_call(
+                self.config.model, started, first_token_at, ok=False, error=str(e)
+            )
             return Err(f"ClaudeGenner.ch_completion: {e}")
         except Exception as e:
+            self.record_call(
+                self.config.model, started, first_token_at, ok=False, error=str(e)
+            )
             return Err(
                 f"An unexpected Claude API error while generating code with {self.config.name}, occurred: \n{e}"
             )
 
+        self.record_call(
+            self.config.model,
+            started,
+            first_token_at,
+            provider="anthropic",
+            input_tokens=response.usage.input_tokens,
+            output_tokens=response.usage.output_tokens,
+        )
         return Ok(final_response)
 
+    def structured_completion(
+        self, messages: ChatHistory, tool: str
+    ) -> Result[Tuple[Dict[str, Any] | None, str], str]:
+        """
+        Generate a completion that answers with a call of an output tool.
+
+        The tool call is forced, except with extended thinking on, which the API
+        only allows with automatic tool choice.
+
+        Args:
+            messages (ChatHistory): Chat history containing the conversation context
+            tool (str): Short name of the output tool to call, e.g. `CODE_TOOL`
+
+        Returns:
+            Result[Tuple[Dict[str, Any] | None, str], str]:
+                Ok(Tuple[Dict[str, Any] | None, str]): The tool call's arguments, None
+                    if the model answered in text instead, and the text content
+                Err(str): Error message if the API call fails
+        """
+        system_message = messages.messages[0]
+        assert system_message.role == "system"
+        ch = ChatHistory(messages.messages[1:])
+
+        reasoning = self.get_reasoning(self.config)
+        max_tokens = reasoning.max_output_tokens or self.config.max_tokens
+        thinking = thinking_params(reasoning, max_tokens)
+        tools = output_tools.anthropic_tools([tool])
+        tool_choice = (
+            {"type": "auto"} if thinking else {"type": "tool", "name": tools[0]["name"]}
+        )
+
+        started = time.monotonic()
+        try:
+            response = self.client.messages.create(
+                model=self.config.model,
+                messages=ch.as_native(),  # type: ignore
+                max_tokens=max_tokens,
+                system=system_message.content,
+                tools=tools,  # type: ignore
+                tool_choice=tool_choice,  # type: ignore
+                **thinking,
+            )
+            self._log_usage(response.usage, thinking)
+
+            content = "".join(
+                block.text for block in response.content if block.type == "text"
+            )
+            arguments = next(
+                (
+                    block.input
+                    for block in response.content
+                    if block.type == "tool_use"
+                ),
+                None,
+            )
+        except Exception as e:
+            self.record_call(self.config.model, started, ok=False, error=str(e))
+            return Err(
+                f"ClaudeGenner.structured_completion: An unexpected Claude API error while calling {tool} with {self.config.name}, occurred: \n{e}"
+            )
+
+        self.record_call(
+            self.config.model,
+            started,
+            provider="anthropic",
+            input_tokens=response.usage.input_tokens,
+            output_tokens=response.usage.output_tokens,
+        )
+        return Ok((arguments, content))  # type: ignore
+
+    def run_tools(
+        self,
+        messages: ChatHistory,
+        registry: ToolRegistry,
+        instance: Any,
+        max_rounds: int = 6,
+    ) -> Result[Tuple[str, List[ToolCallRecord]], str]:
+        """
+        Let the model call the registry's tools through tool use until it answers in text.
+
+        Args:
+            messages (ChatHistory): Chat history containing the conversation context
+            registry (ToolRegistry): Tools offered to the model
+            instance (Any): Object the tools are bound to
+            max_rounds (int): Maximum number of completions
+
+        Returns:
+            Result[Tuple[str, List[ToolCallRecord]], str]:
+                Ok(Tuple[str, List[ToolCallRecord]]): The final answer and the tools called
+                Err(str): Error message if a completion failed
+        """
+        system_message = messages.messages[0]
+        assert system_message.role == "system"
+        ch = ChatHistory(messages.messages[1:])
+
+        reasoning = self.get_reasoning(self.config)
+        max_tokens = reasoning.max_output_tokens or self.config.max_tokens
+        thinking = thinking_params(reasoning, max_tokens)
+        tools = registry.anthropic_tools()
+
+        def send(transcript: List[Dict[str, Any]]):
+            started = time.monotonic()
+            try:
+                response = self.client.messages.create(
+                    model=self.config.model,
+                    messages=transcript,  # type: ignore
+                    max_tokens=max_tokens,
+                    system=system_message.content,
+                    tools=tools,  # type: ignore
+                    **thinking,
+                )
+            except Exception as e:
+                self.record_call(self.config.model, started, ok=False, error=str(e))
+                raise
+
+            self._log_usage(response.usage, thinking)
+            self.record_call(
+                self.config.model,
+                started,
+                provider="anthropic",
+                input_tokens=response.usage.input_tokens,
+                output_tokens=response.usage.output_tokens,
+            )
+            return response
+
+        try:
+            return anthropic_tool_loop(send, ch.as_native(), registry, instance, max_rounds)
+        except Exception as e:
+            return Err(
+                f"ClaudeGenner.run_tools: An unexpected Claude API error while calling tools with {self.config.name}, occurred: \n{e}"
+            )
+
+    def _log_usage(self, usage, thinking: Dict[str, Any]) -> None:
+        """
+        Log the output tokens of a completion against its thinking budget.
+
+        The Messages API counts thinking as output without a separate figure, so
+        the budget is logged next to the total.
+
+        Args:
+            usage: The `usage` of the response
+            thinking (Dict[str, Any]): The thinking parameters the request was sent with
+        """
+        budget = thinking["thinking"]["budget_tokens"] if thinking else 0
+        logger.info(
+            f"ClaudeGenner usage for {self.config.model} (stage {self.stage}): "
+            f"{usage.output_tokens} output tokens including thinking "
+            f"(budget {budget}), {usage.input_tokens} input tokens"
+        )
+
     def generate_code(
         self, messages: ChatHistory, blocks: List[str] = [""]
     ) -> Result[Tuple[List[str], str], str]:
@@ -103,6 +320,9 @@ class ClaudeGenner(Genner):
         This method handles the complete process of generating code:
         1. Getting a completion from the model
         2. Extracting code blocks from the response
+
+        With `structured_output` on, the code comes back as a typed tool call
+        instead, see `generate_code_structured`.
         
         Args:
             messages (ChatHistory): Chat history containing the conversation context
@@ -115,6 +335,9 @@ class ClaudeGenner(Genner):
                     - str: Raw response from the model
                 Err(str): Error message if generation failed
         """
+        if self.config.structured_output and len(blocks) == 1:
+            return self.generate_code_structured(messages)
+
         try:
             completion_result = self.ch_completion(messages)
 
@@ -149,6 +372,9 @@ class ClaudeGenner(Genner):
         This method handles the complete process of generating structured lists:
         1. Getting a completion from the model
         2. Extracting lists from the response
+
+        With `structured_output` on, the list comes back as a typed tool call
+        instead, see `generate_list_structured`.
         
         Args:
             messages (ChatHistory): Chat history containing the conversation context
@@ -161,6 +387,9 @@ class ClaudeGenner(Genner):
                     - str: Raw response from the model
                 Err(str): Error message if generation failed
         """
+        if self.config.structured_output and len(blocks) == 1:
+            return self.generate_list_structured(messages)
+
         try:
             completion_result = self.ch_completion(messages)
 
@@ -1,5 +1,7 @@
 import re
-from typing import Callable, Generator, List, Tuple
+import time
+from functools import partial
+from typing import Any, Callable, Dict, Generator, List, Tuple
 
 import yaml
 from loguru import logger
@@ -9,16 +11,20 @@ from result import Err, Ok, Result
 
 from src.config import DeepseekConfig
 from src.helper import extract_content
-from src.client.openrouter import OpenRouter
+from src.client.batching import PRIORITY_HEADER, LocalBatchQueue, stage_priority
+from src.client.openrouter import OpenRouter, reasoning_params
+from src.tool_decorator import ToolRegistry
 from src.types import ChatHistory
 
 from .Base import Genner
+from .Structured import openai_tool_choice, output_tools, parse_openai_message
+from .Tools import ToolCallRecord, openai_tool_loop
 
 
 class DeepseekGenner(Genner):
     def __init__(
         self,
-        client: OpenAI | OpenRouter,
+        client: OpenAI | OpenRouter | LocalBatchQueue,
         config: DeepseekConfig,
         stream_fn: Callable[[str], None] | None,
     ):
@@ -26,10 +32,12 @@ class DeepseekGenner(Genner):
         Initialize the Deepseek-based generator.
 
         This constructor sets up the generator with Deepseek configuration
-        and streaming function. It supports both OpenAI and OpenRouter clients.
+        and streaming function. It supports OpenAI and OpenRouter clients, and a
+        `LocalBatchQueue` in front of a local server.
 
         Args:
-            client (OpenAI | OpenRouter): OpenAI or OpenRouter API client
+            client (OpenAI | OpenRouter | LocalBatchQueue): OpenAI or OpenRouter API client,
+                or a batching queue wrapping an OpenAI client
             config (DeepseekConfig): Configuration for the Deepseek model
             stream_fn (Callable[[str], None] | None): Function to call with streamed tokens,
                 or None to disable streaming
@@ -46,6 +54,10 @@ class DeepseekGenner(Genner):
         This method sends the chat history to either the OpenAI API or OpenRouter API
         (depending on the client type) and retrieves a completion response, with
         optional streaming support. It handles the differences between the two APIs.
+        Reasoning controls for the current stage are sent to OpenRouter; the
+        DeepSeek API has no reasoning parameters, so there only the stage's
+        `max_output_tokens` applies. Requests to OpenAI-compatible servers carry
+        the stage's priority for `LocalBatchQueue` and the local batching proxy.
 
         Args:
             messages (ChatHistory): Chat history containing the conversation context
@@ -56,41 +68,63 @@ class DeepseekGenner(Genner):
                 Err(str): Error message if the API call fails
         """
         final_response = ""
+        response = None
+        reasoning = self.get_reasoning(self.config)
+        max_tokens = reasoning.max_output_tokens or self.config.max_tokens
+
+        started = time.monotonic()
+        first_token_at = None
+        usage = None
+        provider = None
 
         try:
-            if isinstance(self.client, OpenAI):
+            if isinstance(self.client, (OpenAI, LocalBatchQueue)):
+                create = self._openai_create()
+
                 if self.do_stream:
                     assert self.stream_fn is not None
 
                     stream: Generator[ChatCompletionChunk, None, None] = (
-                        self.client.chat.completions.create(
+                        create(
                             model=self.config.model,
                             messages=messages.as_native(),  # type: ignore
-                            max_tokens=self.config.max_tokens,
+                            max_tokens=max_tokens,
                             temperature=self.config.temperature,
                             stream=True,
+                            # The usage comes in a last chunk with no choices
+                            stream_options={"include_usage": True},
                         )
                     )
 
                     for chunk in stream:
+                        if chunk.usage is not None:
+                            self._log_usage(chunk.usage)
+                            usage = chunk.usage.model_dump()
+                        if not chunk.choices:
+                            continue
                         if chunk.choices[0].delta.content is not None:
                             token = chunk.choices[0].delta.content
 
                             if not isinstance(token, str):
                                 continue
 
+                            if first_token_at is None:
+                                first_token_at = time.monotonic()
                             final_response += token
                             self.stream_fn(token)
                 else:
-                    response = self.client.chat.completions.create(
+                    response = create(
                         model=self.config.model,
                         messages=messages.as_native(),  # type: ignore
-                        max_tokens=self.config.max_tokens,
+                        max_tokens=max_tokens,
                         temperature=self.config.temperature,
                         stream=False,
                     )
 
                     final_response = response.choices[0].message.content
+                    self._log_usage(response.usage)
+                    if response.usage is not None:
+                        usage = response.usage.model_dump()
 
                 assert isinstance(final_response, str)
             else:
@@ -100,14 +134,17 @@ class DeepseekGenner(Genner):
                     stream_ = self.client.create_chat_completion_stream(
                         messages=messages.as_native(),
                         model=self.config.model,
-                        max_tokens=self.config.max_tokens,
+                        max_tokens=max_tokens,
                         temperature=self.config.temperature,
+                        reasoning=reasoning_params(reasoning),
                     )
 
                     reasoning_entered = False
                     main_entered = False
 
                     for token, token_type in stream_:
+                        if first_token_at is None:
+                            first_token_at = time.monotonic()
                         if not reasoning_entered and token_type == "reasoning":
                             reasoning_entered = True
                             self.stream_fn("<think>\n")
@@ -127,19 +164,197 @@ class DeepseekGenner(Genner):
                     final_response = self.client.create_chat_completion(
                         messages=messages.as_native(),
                         model=self.config.model,
-                        max_tokens=self.config.max_tokens,
+                        max_tokens=max_tokens,
                         temperature=self.config.temperature,
+                        reasoning=reasoning_params(reasoning),
                     )
+                provider = self.client.last_usage.get("provider")
+                usage = self.client.last_usage.get("usage")
                 assert isinstance(final_response, str)
         except AssertionError as e:
+            self.record_call(
+                self.config.model, started, first_token_at, ok=False, error=str(e)
+            )
             return Err(f"DeepseekGenner.ch_completion: {e}")
         except Exception as e:
+            self.record_call(
+                self.config.model, started, first_token_at, ok=False, error=str(e)
+            )
             return Err(
                 f"DeepseekGenner.ch_completion: An unexpected error while generating code with {self.config}, response: {response} occured: \n{e}"
             )
 
+        self.record_call(
+            self.config.model, started, first_token_at, usage=usage, provider=provider
+        )
         return Ok(final_response)
 
+    def _openai_create(self) -> Callable[..., Any]:
+        """
+        Get the `chat.completions.create` of an OpenAI-compatible client, tagged with the stage's priority.
+
+        Returns:
+            Callable[..., Any]: The create function
+        """
+        priority = stage_priority(self.stage)
+        if isinstance(self.client, LocalBatchQueue):
+            return partial(self.client.create, priority=priority)
+        assert isinstance(self.client, OpenAI)
+        return partial(
+            self.client.chat.completions.create,
+            extra_headers={PRIORITY_HEADER: str(priority)},
+        )
+
+    def structured_completion(
+        self, messages: ChatHistory, tool: str
+    ) -> Result[Tuple[Dict[str, Any] | None, str], str]:
+        """
+        Generate a completion that answers with a forced call of an output tool.
+
+        Args:
+            messages (ChatHistory): Chat history containing the conversation context
+            tool (str): Short name of the output tool to call, e.g. `CODE_TOOL`
+
+        Returns:
+            Result[Tuple[Dict[str, Any] | None, str], str]:
+                Ok(Tuple[Dict[str, Any] | None, str]): The tool call's arguments, None
+                    if the model answered in text instead, and the text content
+                Err(str): Error message if the API call fails
+        """
+        reasoning = self.get_reasoning(self.config)
+        max_tokens = reasoning.max_output_tokens or self.config.max_tokens
+        tools = output_tools.openai_tools([tool])
+
+        started = time.monotonic()
+        usage = None
+        provider = None
+
+        try:
+            if isinstance(self.client, (OpenAI, LocalBatchQueue)):
+                response = self._openai_create()(
+                    model=self.config.model,
+                    messages=messages.as_native(),  # type: ignore
+                    max_tokens=max_tokens,
+                    temperature=self.config.temperature,
+                    tools=tools,
+                    tool_choice=openai_tool_choice(tool),
+                    stream=False,
+                )
+                message = response.choices[0].message.model_dump()
+                self._log_usage(response.usage)
+                if response.usage is not None:
+                    usage = response.usage.model_dump()
+            else:
+                message = self.client.create_tool_completion(
+                    messages=messages.as_native(),
+                    tools=tools,
+                    tool_choice=openai_tool_choice(tool),
+                    model=self.config.model,
+                    max_tokens=max_tokens,
+                    temperature=self.config.temperature,
+                    reasoning=reasoning_params(reasoning),
+                )
+                provider = self.client.last_usage.get("provider")
+                usage = self.client.last_usage.get("usage")
+
+            arguments, content = parse_openai_message(message)
+        except Exception as e:
+            self.record_call(self.config.model, started, ok=False, error=str(e))
+            return Err(
+                f"DeepseekGenner.structured_completion: An unexpected error while calling {tool} with {self.config.model} occured: \n{e}"
+            )
+
+        self.record_call(self.config.model, started, usage=usage, provider=provider)
+        return Ok((arguments, content))
+
+    def run_tools(
+        self,
+        messages: ChatHistory,
+        registry: ToolRegistry,
+        instance: Any,
+        max_rounds: int = 6,
+    ) -> Result[Tuple[str, List[ToolCallRecord]], str]:
+        """
+        Let the model call the registry's tools until it answers in text.
+
+        Args:
+            messages (ChatHistory): Chat history containing the conversation context
+            registry (ToolRegistry): Tools offered to the model
+            instance (Any): Object the tools are bound to
+            max_rounds (int): Maximum number of completions
+
+        Returns:
+            Result[Tuple[str, List[ToolCallRecord]], str]:
+                Ok(Tuple[str, List[ToolCallRecord]]): The final answer and the tools called
+                Err(str): Error message if a completion failed
+        """
+        reasoning = self.get_reasoning(self.config)
+        max_tokens = reasoning.max_output_tokens or self.config.max_tokens
+        tools = registry.openai_tools()
+
+        def send(transcript: List[Dict[str, Any]]) -> Dict[str, Any]:
+            started = time.monotonic()
+            usage = None
+            provider = None
+            try:
+                if isinstance(self.client, (OpenAI, LocalBatchQueue)):
+                    response = self._openai_create()(
+                        model=self.config.model,
+                        messages=transcript,  # type: ignore
+                        max_tokens=max_tokens,
+                        temperature=self.config.temperature,
+                        tools=tools,
+                        tool_choice="auto",
+                        stream=False,
+                    )
+                    message = response.choices[0].message.model_dump(exclude_none=True)
+                    self._log_usage(response.usage)
+                    if response.usage is not None:
+                        usage = response.usage.model_dump()
+                else:
+                    message = self.client.create_tool_completion(
+                        messages=transcript,
+                        tools=tools,
+                        model=self.config.model,
+                        max_tokens=max_tokens,
+                        temperature=self.config.temperature,
+                        reasoning=reasoning_params(reasoning),
+                    )
+                    provider = self.client.last_usage.get("provider")
+                    usage = self.client.last_usage.get("usage")
+            except Exception as e:
+                self.record_call(self.config.model, started, ok=False, error=str(e))
+                raise
+
+            self.record_call(self.config.model, started, usage=usage, provider=provider)
+            return message
+
+        try:
+            return openai_tool_loop(
+                send, messages.as_native(), registry, instance, max_rounds
+            )
+        except Exception as e:
+            return Err(
+                f"DeepseekGenner.run_tools: An unexpected error while calling tools with {self.config.model} occured: \n{e}"
+            )
+
+    def _log_usage(self, usage) -> None:
+        """
+        Log the reasoning/output split of a completion from an OpenAI-compatible API.
+
+        Args:
+            usage: The `usage` of the response, None if the server did not report it
+        """
+        if usage is None or not usage.completion_tokens:
+            return
+
+        details = getattr(usage, "completion_tokens_details", None)
+        reasoning_tokens = getattr(details, "reasoning_tokens", None) or 0
+        logger.info(
+            f"DeepseekGenner usage for {self.config.model} (stage {self.stage}): "
+            f"{reasoning_tokens} reasoning + {usage.completion_tokens - reasoning_tokens} output tokens"
+        )
+
     def generate_code(
         self, messages: ChatHistory, blocks: List[str] = [""]
     ) -> Result[Tuple[List[str], str], str]:
@@ -150,6 +365,9 @@ class DeepseekGenner(Genner):
         1. Getting a completion from the model
         2. Extracting code blocks from the response
 
+        With `structured_output` on, the code comes back as a typed tool call
+        instead, see `generate_code_structured`.
+
         Args:
             messages (ChatHistory): Chat history containing the conversation context
             blocks (List[str]): XML tag names to extract content from before processing into code
@@ -161,6 +379,9 @@ class DeepseekGenner(Genner):
                     - str: Raw response from the model
                 Err(str): Error message if generation failed
         """
+        if self.config.structured_output and len(blocks) == 1:
+            return self.generate_code_structured(messages)
+
         try:
             completion_result = self.ch_completion(messages)
 
@@ -196,6 +417,9 @@ class DeepseekGenner(Genner):
         1. Getting a completion from the model
         2. Extracting lists from the response
 
+        With `structured_output` on, the list comes back as a typed tool call
+        instead, see `generate_list_structured`.
+
         Args:
             messages (ChatHistory): Chat history containing the conversation context
             blocks (List[str]): XML tag names to extract content from before processing into lists
@@ -207,6 +431,9 @@ class DeepseekGenner(Genner):
                     - str: Raw response from the model
                 Err(str): Error message if generation failed
         """
+        if self.config.structured_output and len(blocks) == 1:
+            return self.generate_list_structured(messages)
+
         try:
             completion_result = self.ch_completion(messages)
 
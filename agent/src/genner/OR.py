@@ -1,16 +1,20 @@
 import re
-from typing import Callable, List, Tuple
+import time
+from typing import Any, Callable, Dict, List, Tuple
 
 import yaml
 from result import Err, Ok, Result
 from openai import OpenAI
 
-from src.client.openrouter import OpenRouter
+from src.client.openrouter import OpenRouter, reasoning_params
 from src.config import ClaudeConfig, OpenRouterConfig
 from src.helper import extract_content
+from src.tool_decorator import ToolRegistry
 from src.types import ChatHistory
 
 from .Base import Genner
+from .Structured import openai_tool_choice, output_tools, parse_openai_message
+from .Tools import ToolCallRecord, openai_tool_loop
 
 
 class OpenRouterGenner(Genner):
@@ -54,6 +58,11 @@ class OpenRouterGenner(Genner):
                 Err(str): Error message if the API call fails
         """
         final_response = ""
+        reasoning = self.get_reasoning(self.config)
+        max_tokens = reasoning.max_output_tokens or self.config.max_tokens
+
+        started = time.monotonic()
+        first_token_at = None
 
         try:
             if self.do_stream:
@@ -62,14 +71,17 @@ class OpenRouterGenner(Genner):
                 stream_ = self.client.create_chat_completion_stream(
                     messages=messages.as_native(),
                     model=self.config.model,
-                    max_tokens=self.config.max_tokens,
+                    max_tokens=max_tokens,
                     temperature=self.config.temperature,
+                    reasoning=reasoning_params(reasoning),
                 )
 
                 reasoning_entered = False
                 main_entered = False
 
                 for token, token_type in stream_:
+                    if first_token_at is None:
+                        first_token_at = time.monotonic()
                     if not reasoning_entered and token_type == "reasoning":
                         reasoning_entered = True
                         self.stream_fn("<think>\n")
@@ -85,20 +97,136 @@ class OpenRouterGenner(Genner):
                 final_response = self.client.create_chat_completion(
                     messages=messages.as_native(),
                     model=self.config.model,
-                    max_tokens=self.config.max_tokens,
+                    max_tokens=max_tokens,
                     temperature=self.config.temperature,
+                    reasoning=reasoning_params(reasoning),
                 )
             assert isinstance(final_response, str)
 
         except AssertionError as e:
+            self.record_call(
+                self.config.model, started, first_token_at, ok=False, error=str(e)
+            )
             return Err(f"ClaudeGenner.ch_completion: {e}")
         except Exception as e:
+            self.record_call(
+                self.config.model, started, first_token_at, ok=False, error=str(e)
+            )
             return Err(
                 f"An unexpected Claude API error while generating code with {self.config.name}, occurred: \n{e}"
             )
 
+        self.record_call(
+            self.config.model,
+            started,
+            first_token_at,
+            usage=self.client.last_usage.get("usage"),
+            provider=self.client.last_usage.get("provider"),
+        )
         return Ok(final_response)
 
+    def structured_completion(
+        self, messages: ChatHistory, tool: str
+    ) -> Result[Tuple[Dict[str, Any] | None, str], str]:
+        """
+        Generate a completion that answers with a forced call of an output tool.
+
+        Args:
+            messages (ChatHistory): Chat history containing the conversation context
+            tool (str): Short name of the output tool to call, e.g. `CODE_TOOL`
+
+        Returns:
+            Result[Tuple[Dict[str, Any] | None, str], str]:
+                Ok(Tuple[Dict[str, Any] | None, str]): The tool call's arguments, None
+                    if the model answered in text instead, and the text content
+                Err(str): Error message if the API call fails
+        """
+        reasoning = self.get_reasoning(self.config)
+        max_tokens = reasoning.max_output_tokens or self.config.max_tokens
+
+        started = time.monotonic()
+        try:
+            message = self.client.create_tool_completion(
+                messages=messages.as_native(),
+                tools=output_tools.openai_tools([tool]),
+                tool_choice=openai_tool_choice(tool),
+                model=self.config.model,
+                max_tokens=max_tokens,
+                temperature=self.config.temperature,
+                reasoning=reasoning_params(reasoning),
+            )
+            arguments, content = parse_openai_message(message)
+        except Exception as e:
+            self.record_call(self.config.model, started, ok=False, error=str(e))
+            return Err(
+                f"OpenRouterGenner.structured_completion: An unexpected error while calling {tool} with {self.config.model}, occurred: \n{e}"
+            )
+
+        self.record_call(
+            self.config.model,
+            started,
+            usage=self.client.last_usage.get("usage"),
+            provider=self.client.last_usage.get("provider"),
+        )
+        return Ok((arguments, content))
+
+    def run_tools(
+        self,
+        messages: ChatHistory,
+        registry: ToolRegistry,
+        instance: Any,
+        max_rounds: int = 6,
+    ) -> Result[Tuple[str, List[ToolCallRecord]], str]:
+        """
+        Let the model call the registry's tools until it answers in text.
+
+        Args:
+            messages (ChatHistory): Chat history containing the conversation context
+            registry (ToolRegistry): Tools offered to the model
+            instance (Any): Object the tools are bound to
+            max_rounds (int): Maximum number of completions
+
+        Returns:
+            Result[Tuple[str, List[ToolCallRecord]], str]:
+                Ok(Tuple[str, List[ToolCallRecord]]): The final answer and the tools called
+                Err(str): Error message if a completion failed
+        """
+        reasoning = self.get_reasoning(self.config)
+        max_tokens = reasoning.max_output_tokens or self.config.max_tokens
+        tools = registry.openai_tools()
+
+        def send(transcript: List[Dict[str, Any]]) -> Dict[str, Any]:
+            started = time.monotonic()
+            try:
+                message = self.client.create_tool_completion(
+                    messages=transcript,
+                    tools=tools,
+                    model=self.config.model,
+                    max_tokens=max_tokens,
+                    temperature=self.config.temperature,
+                    reasoning=reasoning_params(reasoning),
+                )
+            except Exception as e:
+                self.record_call(self.config.model, started, ok=False, error=str(e))
+                raise
+
+            self.record_call(
+                self.config.model,
+                started,
+                usage=self.client.last_usage.get("usage"),
+                provider=self.client.last_usage.get("provider"),
+            )
+            return message
+
+        try:
+            return openai_tool_loop(
+                send, messages.as_native(), registry, instance, max_rounds
+            )
+        except Exception as e:
+            return Err(
+                f"OpenRouterGenner.run_tools: An unexpected error while calling tools with {self.config.model}, occurred: \n{e}"
+            )
+
     def generate_code(
         self, messages: ChatHistory, blocks: List[str] = [""]
     ) -> Result[Tuple[List[str], str], str]:
@@ -109,6 +237,9 @@ class OpenRouterGenner(Genner):
         1. Getting a completion from the model
         2. Extracting code blocks from the response
 
+        With `structured_output` on, the code comes back as a typed tool call
+        instead, see `generate_code_structured`.
+
         Args:
             messages (ChatHistory): Chat history containing the conversation context
             blocks (List[str]): XML tag names to extract content from before processing into code
@@ -120,6 +251,9 @@ class OpenRouterGenner(Genner):
                     - str: Raw response from the model
                 Err(str): Error message if generation failed
         """
+        if self.config.structured_output and len(blocks) == 1:
+            return self.generate_code_structured(messages)
+
         try:
             completion_result = self.ch_completion(messages)
 
@@ -155,6 +289,9 @@ class OpenRouterGenner(Genner):
         1. Getting a completion from the model
         2. Extracting lists from the response
 
+        With `structured_output` on, the list comes back as a typed tool call
+        instead, see `generate_list_structured`.
+
         Args:
             messages (ChatHistory): Chat history containing the conversation context
             blocks (List[str]): XML tag names to extract content from before processing into lists
@@ -166,6 +303,9 @@ class OpenRouterGenner(Genner):
                     - str: Raw response from the model
                 Err(str): Error message if generation failed
         """
+        if self.config.structured_output and len(blocks) == 1:
+            return self.generate_list_structured(messages)
+
         try:
             completion_result = self.ch_completion(messages)
 
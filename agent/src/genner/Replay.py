@@ -0,0 +1,198 @@
+from typing import Any, Callable, List, Tuple
+
+from result import Ok, Result
+
+from src.replay import Cassette, digest, timed
+from src.tool_decorator import ToolRegistry
+from src.types import ChatHistory
+
+from .Base import Genner
+from .Tools import ToolCallRecord, records_from_native, records_to_native
+
+# Methods whose Ok value is a tuple, which JSON turns into a list
+TUPLE_METHODS = {"generate_code", "generate_list"}
+
+
+class RecordingGenner(Genner):
+    def __init__(self, genner: Genner, cassette: Cassette, channel: str):
+        """
+        Initialize a generator that records every call of another one into a cassette.
+
+        Completions, code and list generation, tool loops and extractions are recorded with
+        their results and latencies. Everything else (stage, streaming, telemetry,
+        escalation) is forwarded to the wrapped generator.
+
+        Args:
+            genner (Genner): The real generator
+            cassette (Cassette): Recording cassette
+            channel (str): Channel the calls are recorded on, e.g. "genner:main"
+        """
+        super().__init__(genner.identifier, genner.do_stream)
+        self.genner = genner
+        self.cassette = cassette
+        self.channel = channel
+
+    def _record(
+        self, method: str, input_value: Any, call: Callable[[], Result[Any, Any]]
+    ) -> Result[Any, Any]:
+        result, latency = timed(call)
+        self.cassette.record(self.channel, method, digest(input_value), result, latency)
+        return result
+
+    def set_do_stream(self, final_state: bool):
+        super().set_do_stream(final_state)
+        self.genner.set_do_stream(final_state)
+
+    def set_stage(self, stage: str | None):
+        super().set_stage(stage)
+        self.genner.set_stage(stage)
+
+    def set_telemetry(self, telemetry):
+        super().set_telemetry(telemetry)
+        self.genner.set_telemetry(telemetry)
+
+    def prepare(self, session_interval: int):
+        self.genner.prepare(session_interval)
+
+    def report_failure(self, kind: str):
+        self.genner.report_failure(kind)
+
+    def reset_escalation(self):
+        self.genner.reset_escalation()
+
+    def ch_completion(self, messages: ChatHistory) -> Result[str, str]:
+        return self._record(
+            "ch_completion",
+            messages.as_native(),
+            lambda: self.genner.ch_completion(messages),
+        )
+
+    def generate_code(
+        self, messages: ChatHistory, blocks: List[str] = [""]
+    ) -> Result[Tuple[List[str], str], str]:
+        return self._record(
+            "generate_code",
+            [messages.as_native(), blocks],
+            lambda: self.genner.generate_code(messages, blocks),
+        )
+
+    def generate_list(
+        self, messages: ChatHistory, blocks: List[str] = [""]
+    ) -> Result[Tuple[List[List[str]], str], str]:
+        return self._record(
+            "generate_list",
+            [messages.as_native(), blocks],
+            lambda: self.genner.generate_list(messages, blocks),
+        )
+
+    def run_tools(
+        self,
+        messages: ChatHistory,
+        registry: ToolRegistry,
+        instance: Any,
+        max_rounds: int = 6,
+    ) -> Result[Tuple[str, List[ToolCallRecord]], str]:
+        # The tools run for real while recording, their calls are kept with the answer
+        def call():
+            result = self.genner.run_tools(messages, registry, instance, max_rounds)
+            if result.is_err():
+                return result
+            text, records = result.unwrap()
+            return Ok((text, records_to_native(records)))
+
+        result = self._record("run_tools", messages.as_native(), call)
+        if result.is_err():
+            return result
+        text, records = result.unwrap()
+        return Ok((text, records_from_native(records)))
+
+    def extract_code(
+        self, response: str, blocks: List[str] = [""]
+    ) -> Result[List[str], str]:
+        return self._record(
+            "extract_code",
+            [response, blocks],
+            lambda: self.genner.extract_code(response, blocks),
+        )
+
+    def extract_list(
+        self, response: str, blocks: List[str] = [""]
+    ) -> Result[List[List[str]], str]:
+        return self._record(
+            "extract_list",
+            [response, blocks],
+            lambda: self.genner.extract_list(response, blocks),
+        )
+
+
+class ReplayGenner(Genner):
+    def __init__(
+        self,
+        cassette: Cassette,
+        channel: str,
+        stream_fn: Callable[[str], None] | None = None,
+    ):
+        """
+        Initialize a generator that serves the calls recorded on a cassette channel.
+
+        Calls are answered in the order they were recorded, after the recorded
+        latency or none at all depending on the cassette's latency mode. No LLM
+        provider is contacted, so flows can be benchmarked offline.
+
+        Args:
+            cassette (Cassette): Replaying cassette
+            channel (str): Channel the calls were recorded on, e.g. "genner:main"
+            stream_fn (Callable[[str], None] | None): Function to call with each replayed response,
+                or None to disable streaming
+        """
+        super().__init__(f"replay-{channel}", True if stream_fn else False)
+        self.cassette = cassette
+        self.channel = channel
+        self.stream_fn = stream_fn
+
+    def _replay(self, method: str, input_value: Any) -> Result[Any, str]:
+        result = self.cassette.replay(
+            self.channel, method, digest(input_value), as_tuple=method in TUPLE_METHODS
+        )
+        streamed = method == "ch_completion" or method in TUPLE_METHODS
+        if streamed and self.do_stream and self.stream_fn is not None and result.is_ok():
+            value = result.unwrap()
+            self.stream_fn(value[1] if method in TUPLE_METHODS else value)
+        return result
+
+    def ch_completion(self, messages: ChatHistory) -> Result[str, str]:
+        return self._replay("ch_completion", messages.as_native())
+
+    def generate_code(
+        self, messages: ChatHistory, blocks: List[str] = [""]
+    ) -> Result[Tuple[List[str], str], str]:
+        return self._replay("generate_code", [messages.as_native(), blocks])
+
+    def generate_list(
+        self, messages: ChatHistory, blocks: List[str] = [""]
+    ) -> Result[Tuple[List[List[str]], str], str]:
+        return self._replay("generate_list", [messages.as_native(), blocks])
+
+    def run_tools(
+        self,
+        messages: ChatHistory,
+        registry: ToolRegistry,
+        instance: Any,
+        max_rounds: int = 6,
+    ) -> Result[Tuple[str, List[ToolCallRecord]], str]:
+        # Tools are not called on replay, the recorded calls are served as they were
+        result = self._replay("run_tools", messages.as_native())
+        if result.is_err():
+            return result
+        text, records = result.unwrap()
+        return Ok((text, records_from_native(records)))
+
+    def extract_code(
+        self, response: str, blocks: List[str] = [""]
+    ) -> Result[List[str], str]:
+        return self._replay("extract_code", [response, blocks])
+
+    def extract_list(
+        self, response: str, blocks: List[str] = [""]
+    ) -> Result[List[List[str]], str]:
+        return self._replay("extract_list", [response, blocks])
@@ -0,0 +1,129 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+from result import Err, Ok, Result
+
+from src.tool_decorator import ToolRegistry
+
+output_tools = ToolRegistry("output")
+
+CODE_TOOL = "submit_code"
+LIST_TOOL = "submit_list"
+
+
+class StructuredOutput:
+    """
+    Tools the model calls to hand back its answer as typed fields.
+
+    The model is forced to call one of these instead of writing markdown, so
+    the code or list arrives as a JSON argument and no regex extraction is needed.
+    """
+
+    @output_tools
+    def submit_code(self, code: str) -> str:
+        """
+        Submit the complete Python script that fulfils the request.
+
+        Args:
+            code: The full Python source code, without markdown fences
+
+        Returns:
+            The submitted code
+        """
+        return code
+
+    @output_tools
+    def submit_list(self, items: List[str]) -> List[str]:
+        """
+        Submit the list of items that fulfils the request.
+
+        Args:
+            items: The items, one string each
+
+        Returns:
+            The submitted items
+        """
+        return items
+
+
+def openai_tool_choice(tool: str) -> Dict[str, Any]:
+    """
+    Force an OpenAI-compatible model to call the given output tool.
+
+    Args:
+        tool (str): Short name of the tool, e.g. `CODE_TOOL`
+
+    Returns:
+        Dict[str, Any]: The `tool_choice` parameter
+    """
+    return {"type": "function", "function": {"name": output_tools.get(tool)["function"]["name"]}}
+
+
+def parse_openai_message(message: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], str]:
+    """
+    Read the output tool call from an OpenAI-format assistant message.
+
+    Args:
+        message (Dict[str, Any]): The `choices[0].message` of a chat completion
+
+    Returns:
+        Tuple[Optional[Dict[str, Any]], str]: The tool call's arguments, None if the
+            model answered in text, and the text content
+    """
+    content = message.get("content") or ""
+    tool_calls = message.get("tool_calls") or []
+    if not tool_calls:
+        return None, content
+
+    arguments = tool_calls[0]["function"]["arguments"]
+    if isinstance(arguments, str):
+        arguments = json.loads(arguments) if arguments.strip() else {}
+    return arguments, content
+
+
+def code_from_arguments(arguments: Dict[str, Any], content: str) -> Result[Tuple[List[str], str], str]:
+    """
+    Turn `submit_code` arguments into `generate_code` output.
+
+    The raw response is rebuilt as a fenced code block so chat histories and
+    regeneration prompts look the same as in text mode.
+
+    Args:
+        arguments (Dict[str, Any]): The tool call's arguments
+        content (str): Text the model wrote next to the tool call
+
+    Returns:
+        Result[Tuple[List[str], str], str]:
+            Ok(Tuple[List[str], str]): The code as a single block, and the raw response
+            Err(str): If the arguments do not hold a code string
+    """
+    code = arguments.get("code")
+    if not isinstance(code, str) or not code.strip():
+        return Err(f"code_from_arguments: no code in the tool call arguments: {arguments}")
+
+    raw_response = f"{content}\n```python\n{code}\n```".lstrip()
+    return Ok(([code], raw_response))
+
+
+def list_from_arguments(
+    arguments: Dict[str, Any], content: str
+) -> Result[Tuple[List[List[str]], str], str]:
+    """
+    Turn `submit_list` arguments into `generate_list` output.
+
+    Args:
+        arguments (Dict[str, Any]): The tool call's arguments
+        content (str): Text the model wrote next to the tool call
+
+    Returns:
+        Result[Tuple[List[List[str]], str], str]:
+            Ok(Tuple[List[List[str]], str]): The items as a single list, and the raw response
+            Err(str): If the arguments do not hold a list of strings
+    """
+    items = arguments.get("items")
+    if not isinstance(items, list) or not all(isinstance(item, str) for item in items):
+        return Err(f"list_from_arguments: no list of strings in the tool call arguments: {arguments}")
+
+    raw_response = f"{content}\n```yaml\n{yaml.safe_dump(items, allow_unicode=True)}```".lstrip()
+    return Ok(([items], raw_response))
@@ -0,0 +1,206 @@
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+from result import Err, Ok, Result
+
+from src.tool_decorator import ToolRegistry
+
+# Tool outputs are sent back to the model, keep them from flooding the context
+MAX_TOOL_OUTPUT_CHARS = 6000
+
+
+@dataclass
+class ToolCallRecord:
+    """
+    A tool the model called during a tool loop.
+
+    Attributes:
+        name (str): Short name of the tool
+        arguments (Dict[str, Any]): Arguments the model passed
+        output (str): What was sent back to the model, the JSON of the return value or the error
+        ok (bool): Whether the tool returned without raising
+        latency_s (float): Seconds the tool took
+    """
+
+    name: str
+    arguments: Dict[str, Any]
+    output: str
+    ok: bool
+    latency_s: float
+
+
+def run_tool(
+    registry: ToolRegistry, instance: Any, name: str, arguments: str | Dict[str, Any]
+) -> ToolCallRecord:
+    """
+    Execute a tool call in-process, turning any failure into an output the model can read.
+
+    Args:
+        registry (ToolRegistry): Registry the tool belongs to
+        instance (Any): Object the tool's method is bound to
+        name (str): Tool name as the model sent it
+        arguments (str | Dict[str, Any]): Arguments as the model sent them
+
+    Returns:
+        ToolCallRecord: The call and its output
+    """
+    started = time.monotonic()
+    short_name = registry.short_name(name)
+    try:
+        if isinstance(arguments, str):
+            arguments = json.loads(arguments) if arguments.strip() else {}
+        output = json.dumps(
+            registry.execute_call(instance, short_name, arguments), default=str
+        )
+        ok = True
+    except Exception as e:
+        output = f"Error: {type(e).__name__}: {e}"
+        ok = False
+
+    if len(output) > MAX_TOOL_OUTPUT_CHARS:
+        output = output[:MAX_TOOL_OUTPUT_CHARS] + "... (truncated)"
+
+    record = ToolCallRecord(
+        name=short_name,
+        arguments=arguments if isinstance(arguments, dict) else {},
+        output=output,
+        ok=ok,
+        latency_s=time.monotonic() - started,
+    )
+    logger.info(
+        f"Tool {short_name}({record.arguments}) {'ok' if ok else 'failed'} in {record.latency_s:.2f}s"
+    )
+    return record
+
+
+def openai_tool_loop(
+    send: Callable[[List[Dict[str, Any]]], Dict[str, Any]],
+    messages: List[Dict[str, Any]],
+    registry: ToolRegistry,
+    instance: Any,
+    max_rounds: int,
+) -> Result[Tuple[str, List[ToolCallRecord]], str]:
+    """
+    Let an OpenAI-format model call tools until it answers in text.
+
+    Works with the OpenAI chat completions, OpenRouter and Ollama message
+    formats: the assistant message is sent back with its `tool_calls`, followed
+    by one `tool` message per call.
+
+    Args:
+        send (Callable[[List[Dict[str, Any]]], Dict[str, Any]]): Sends the transcript
+            with the tools and returns the assistant message as a dict
+        messages (List[Dict[str, Any]]): Native chat history to start from
+        registry (ToolRegistry): Tools offered to the model
+        instance (Any): Object the tools are bound to
+        max_rounds (int): Maximum number of model calls
+
+    Returns:
+        Result[Tuple[str, List[ToolCallRecord]], str]:
+            Ok(Tuple[str, List[ToolCallRecord]]): The final answer and the tools called
+            Err(str): If the model was still calling tools after `max_rounds`
+    """
+    transcript = list(messages)
+    records: List[ToolCallRecord] = []
+
+    for _ in range(max_rounds):
+        message = send(transcript)
+        tool_calls = message.get("tool_calls") or []
+        if not tool_calls:
+            return Ok((message.get("content") or "", records))
+
+        transcript.append(
+            {
+                "role": "assistant",
+                "content": message.get("content") or "",
+                "tool_calls": tool_calls,
+            }
+        )
+        for tool_call in tool_calls:
+            record = run_tool(
+                registry,
+                instance,
+                tool_call["function"]["name"],
+                tool_call["function"]["arguments"],
+            )
+            records.append(record)
+
+            tool_message = {"role": "tool", "content": record.output}
+            if tool_call.get("id"):
+                tool_message["tool_call_id"] = tool_call["id"]
+            transcript.append(tool_message)
+
+    return Err(f"openai_tool_loop: still calling tools after {max_rounds} rounds")
+
+
+def anthropic_tool_loop(
+    send: Callable[[List[Dict[str, Any]]], Any],
+    messages: List[Dict[str, Any]],
+    registry: ToolRegistry,
+    instance: Any,
+    max_rounds: int,
+) -> Result[Tuple[str, List[ToolCallRecord]], str]:
+    """
+    Let a Claude model call tools until it answers in text.
+
+    Args:
+        send (Callable[[List[Dict[str, Any]]], Any]): Sends the transcript with the
+            tools and returns the `Message` response
+        messages (List[Dict[str, Any]]): Native chat history to start from, without the system message
+        registry (ToolRegistry): Tools offered to the model
+        instance (Any): Object the tools are bound to
+        max_rounds (int): Maximum number of model calls
+
+    Returns:
+        Result[Tuple[str, List[ToolCallRecord]], str]:
+            Ok(Tuple[str, List[ToolCallRecord]]): The final answer and the tools called
+            Err(str): If the model was still calling tools after `max_rounds`
+    """
+    transcript = list(messages)
+    records: List[ToolCallRecord] = []
+
+    for _ in range(max_rounds):
+        response = send(transcript)
+        tool_uses = [block for block in response.content if block.type == "tool_use"]
+        if not tool_uses:
+            return Ok(
+                (
+                    "".join(
+                        block.text for block in response.content if block.type == "text"
+                    ),
+                    records,
+                )
+            )
+
+        transcript.append(
+            {
+                "role": "assistant",
+                "content": [block.model_dump() for block in response.content],
+            }
+        )
+        results: List[Dict[str, Any]] = []
+        for block in tool_uses:
+            record = run_tool(registry, instance, block.name, block.input)
+            records.append(record)
+            results.append(
+                {
+                    "type": "tool_result",
+                    "tool_use_id": block.id,
+                    "content": record.output,
+                    "is_error": not record.ok,
+                }
+            )
+        transcript.append({"role": "user", "content": results})
+
+    return Err(f"anthropic_tool_loop: still calling tools after {max_rounds} rounds")
+
+
+def records_to_native(records: List[ToolCallRecord]) -> List[Dict[str, Any]]:
+    return [record.__dict__.copy() for record in records]
+
+
+def records_from_native(native: Optional[List[Dict[str, Any]]]) -> List[ToolCallRecord]:
+    return [ToolCallRecord(**record) for record in native or []]
@@ -1,19 +1,24 @@
+from dataclasses import replace
 from typing import Callable
 
 from anthropic import Anthropic
 from openai import OpenAI
 
+from src.client.batching import LocalBatchQueue
 from src.client.openrouter import OpenRouter
 from src.config import (
+    CascadeConfig,
     ClaudeConfig,
     DeepseekConfig,
     OllamaConfig,
     OpenRouterConfig,
+    QwenConfig,
 )
 from src.genner.Claude import ClaudeGenner
 from src.genner.OR import OpenRouterGenner
 
 from .Base import Genner
+from .Cascade import CascadeGenner, CascadeStage
 from .Deepseek import DeepseekGenner
 from .Qwen import QwenGenner
 
@@ -40,6 +45,8 @@ available_backends = [
     "openai",
     "qwen",
     "claude",
+    "gemini",
+    "cascade",
 ]
 
 
@@ -47,13 +54,15 @@ def get_genner(
     backend: str,
     stream_fn: Callable[[str], None] | None,
     deepseek_deepseek_client: OpenAI | None = None,
-    deepseek_local_client: OpenAI | None = None,
+    deepseek_local_client: OpenAI | LocalBatchQueue | None = None,
     anthropic_client: Anthropic | None = None,
     or_client: OpenRouter | None = None,
     deepseek_config: DeepseekConfig = DeepseekConfig(),
     claude_config: ClaudeConfig = ClaudeConfig(),
     openai_config: OpenRouterConfig = OpenRouterConfig(),
     gemini_config: OpenRouterConfig = OpenRouterConfig(),
+    qwen_config: QwenConfig = QwenConfig(),
+    cascade_config: CascadeConfig = CascadeConfig(),
 ) -> Genner:
     """
     Get a genner instance based on the backend.
@@ -62,9 +71,10 @@ def get_genner(
         backend (str): The backend to use.
         deepseek_deepseek_client (OpenAI): OpenAI client but endpoint are pointed towards deepseek endpoint for deepseek-r1.
         deepseek_or_client (OpenAI): OpenAI client but endpoint are pointed towards openrouter endpoint for deepseek-r1.
-        deepseek_local_client (OpenAI): OpenAI client but endpoint are pointed towards local endpoint for deepseek-r1.
+        deepseek_local_client (OpenAI | LocalBatchQueue): OpenAI client but endpoint are pointed towards local endpoint for deepseek-r1, optionally wrapped in a LocalBatchQueue.
         deepseek_config (DeepseekConfig, optional): The configuration for the Deepseek backend. Defaults to DeepseekConfig().
         qwen_config (QwenConfig, optional): The configuration for the Qwen backend. Defaults to QwenConfig().
+        cascade_config (CascadeConfig, optional): The stages used by the 'cascade' backend. Defaults to CascadeConfig().
 
     Raises:
         BackendException: If the backend is not supported.
@@ -77,6 +87,7 @@ def get_genner(
 
     if backend == "deepseek":
         deepseek_config.model = "deepseek-reasoner"
+        deepseek_config.structured_output = False
         if not deepseek_deepseek_client:
             raise DeepseekBackendException(
                 "Using backend 'deepseek', DeepSeek (openai) client is not provided."
@@ -86,6 +97,7 @@ def get_genner(
     elif backend == "deepseek_or":
         deepseek_config.model = "deepseek/deepseek-r1"
         deepseek_config.max_tokens = 32768
+        deepseek_config.structured_output = False
         if not or_client:
             raise DeepseekBackendException(
                 "Using backend 'deepseek_or', OpenRouter client is not provided."
@@ -95,6 +107,7 @@ def get_genner(
     elif backend == "deepseek_v3":
         deepseek_config.model = "deepseek/deepseek-chat"
         deepseek_config.max_tokens = 32768
+        deepseek_config.structured_output = True
 
         if not or_client:
             raise DeepseekBackendException(
@@ -104,6 +117,7 @@ def get_genner(
         return DeepseekGenner(or_client, deepseek_config, stream_fn)
     elif backend == "deepseek_local":
         deepseek_config.model = "../DeepSeek-R1-Q4_K_M/DeepSeek-R1-Q4_K_M/DeepSeek-R1-Q4_K_M-00001-of-00011.gguf"
+        deepseek_config.structured_output = False
 
         if not deepseek_local_client:
             raise DeepseekBackendException(
@@ -131,6 +145,7 @@ def get_genner(
     elif backend == "deepseek_v3_or":
         deepseek_config.model = "deepseek/deepseek-chat"
         deepseek_config.max_tokens = 32768
+        deepseek_config.structured_output = True
         deepseek_config.temperature = 0
 
         if not or_client:
@@ -149,6 +164,37 @@ def get_genner(
             )
 
         return OpenRouterGenner(or_client, gemini_config, stream_fn)
+    elif backend == "qwen":
+        return QwenGenner(qwen_config, stream_fn)
+    elif backend == "cascade":
+        stages = []
+        for stage_config in cascade_config.stages:
+            if stage_config.backend == "cascade":
+                raise BackendException("A cascade stage cannot be another cascade.")
+
+            # Each stage gets its own copy of the configs, the branches above mutate them
+            stage_genner = get_genner(
+                stage_config.backend,
+                stream_fn=stream_fn,
+                deepseek_deepseek_client=deepseek_deepseek_client,
+                deepseek_local_client=deepseek_local_client,
+                anthropic_client=anthropic_client,
+                or_client=or_client,
+                deepseek_config=replace(deepseek_config),
+                claude_config=replace(claude_config),
+                openai_config=replace(openai_config),
+                gemini_config=replace(gemini_config),
+                qwen_config=replace(qwen_config),
+            )
+            stages.append(
+                CascadeStage(
+                    genner=stage_genner,
+                    escalate_on=stage_config.escalate_on,
+                    max_failures=stage_config.max_failures,
+                )
+            )
+
+        return CascadeGenner(stages, stream_fn)
     raise BackendException(
         f"Unsupported backend: {backend}, available backends: {', '.join(available_backends)}"
     )
@@ -0,0 +1,415 @@
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Literal, Optional, Tuple
+
+from loguru import logger
+from result import Err, Ok, Result
+
+from src.datatypes import StrategyData
+
+CASSETTE_VERSION = 1
+LatencyMode = Literal["original", "zero"]
+
+
+def digest(value: Any) -> str:
+    """
+    Hash the input of a recorded call, so replays can tell when the flow diverged.
+
+    Args:
+        value (Any): JSON-serializable input, e.g. `ChatHistory.as_native()` or a code string
+
+    Returns:
+        str: Short sha256 hex digest
+    """
+    return hashlib.sha256(
+        json.dumps(value, sort_keys=True, default=str).encode()
+    ).hexdigest()[:16]
+
+
+def result_to_native(result: Result[Any, Any]) -> Dict[str, Any]:
+    if result.is_ok():
+        return {"ok": True, "value": result.unwrap()}
+    return {"ok": False, "value": result.unwrap_err()}
+
+
+def result_from_native(native: Dict[str, Any], as_tuple: bool = False) -> Result[Any, Any]:
+    if not native["ok"]:
+        return Err(native["value"])
+    value = native["value"]
+    return Ok(tuple(value) if as_tuple else value)
+
+
+class Cassette:
+    """
+    A fixture file of the LLM and container calls made during real flow cycles.
+
+    The file is JSON lines: a header with the format version, then one entry per
+    call with its channel (e.g. "genner:main", "container"), method, input
+    digest, result and latency. Entries are written as they are recorded, so a
+    cycle that crashes halfway still leaves a usable fixture.
+
+    On replay, each channel serves its entries in the order they were recorded,
+    sleeping for the recorded latency (`latency="original"`) or not at all
+    (`latency="zero"`). Time spent sleeping is tracked so the orchestration
+    overhead of a flow is its wall time minus `replayed_latency_s`.
+    """
+
+    def __init__(self, path: Path | str, latency: LatencyMode = "original"):
+        """
+        Initialize an empty cassette. Use `create` to record and `load` to replay.
+
+        Args:
+            path (Path | str): Path of the fixture file
+            latency (LatencyMode): "original" to replay with the recorded latencies, "zero" to replay instantly
+        """
+        self.path = Path(path)
+        self.latency = latency
+        self.meta: Dict[str, Any] = {}
+        self.cycles: List[Dict[str, Any]] = []
+
+        self._entries: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._file = None
+
+        self.served = 0
+        self.mismatches = 0
+        self.replayed_latency_s = 0.0
+
+    @classmethod
+    def create(cls, path: Path | str) -> "Cassette":
+        """
+        Start recording into a new fixture file, overwriting any existing one.
+
+        Args:
+            path (Path | str): Path of the fixture file
+
+        Returns:
+            Cassette: The recording cassette
+        """
+        cassette = cls(path)
+        cassette.path.parent.mkdir(parents=True, exist_ok=True)
+        cassette._file = cassette.path.open("w", encoding="utf-8")
+        cassette._write({"version": CASSETTE_VERSION})
+        logger.info(f"Cassette: recording into {cassette.path}")
+        return cassette
+
+    @classmethod
+    def load(cls, path: Path | str, latency: LatencyMode = "original") -> "Cassette":
+        """
+        Load a recorded fixture file for replay.
+
+        Args:
+            path (Path | str): Path of the fixture file
+            latency (LatencyMode): "original" to replay with the recorded latencies, "zero" to replay instantly
+
+        Raises:
+            ValueError: If the file was written by an unsupported format version
+
+        Returns:
+            Cassette: The replaying cassette
+        """
+        cassette = cls(path, latency)
+        with cassette.path.open(encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            if header.get("version") != CASSETTE_VERSION:
+                raise ValueError(
+                    f"Unsupported cassette version {header.get('version')}, expected {CASSETTE_VERSION}"
+                )
+
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry["channel"] == "meta":
+                    cassette.meta.update(entry["value"])
+                elif entry["channel"] == "cycle":
+                    cassette.cycles.append(entry["value"])
+                else:
+                    cassette._entries.setdefault(entry["channel"], deque()).append(entry)
+
+        return cassette
+
+    def _write(self, entry: Dict[str, Any]):
+        assert self._file is not None, "Cassette is not recording"
+        with self._lock:
+            self._file.write(json.dumps(entry, default=str) + "\n")
+            self._file.flush()
+
+    def record_meta(self, **meta: Any):
+        """
+        Record information needed to rebuild the flow on replay, e.g. the agent type and FE data.
+
+        Args:
+            **meta: JSON-serializable values
+        """
+        self._write({"channel": "meta", "value": meta})
+
+    def record_cycle(self, prev_strat: StrategyData | None, notif_str: str | None):
+        """
+        Record the arguments a flow cycle was started with.
+
+        Args:
+            prev_strat (StrategyData | None): Previous strategy passed to the flow
+            notif_str (str | None): Notifications passed to the flow
+        """
+        self._write(
+            {
+                "channel": "cycle",
+                "value": {
+                    "prev_strat": asdict(prev_strat) if prev_strat else None,
+                    "notif_str": notif_str,
+                },
+            }
+        )
+
+    def record(
+        self,
+        channel: str,
+        method: str,
+        input_digest: str,
+        result: Result[Any, Any],
+        latency_s: float,
+    ):
+        """
+        Record one call.
+
+        Args:
+            channel (str): Which component made the call, e.g. "genner:main"
+            method (str): Method called, e.g. "generate_code"
+            input_digest (str): `digest` of the call's input
+            result (Result[Any, Any]): What the call returned
+            latency_s (float): Seconds the call took
+        """
+        self._write(
+            {
+                "channel": channel,
+                "method": method,
+                "input": input_digest,
+                "result": result_to_native(result),
+                "latency_s": latency_s,
+            }
+        )
+
+    def replay(
+        self, channel: str, method: str, input_digest: str, as_tuple: bool = False
+    ) -> Result[Any, str]:
+        """
+        Serve the next recorded call of a channel.
+
+        Args:
+            channel (str): Which component is calling, e.g. "genner:main"
+            method (str): Method called, e.g. "generate_code"
+            input_digest (str): `digest` of the call's input, compared with the recorded one
+            as_tuple (bool): Whether the recorded Ok value was a tuple
+
+        Returns:
+            Result[Any, str]:
+                Ok(Any): The recorded value
+                Err(str): The recorded error, or an error if the channel is exhausted
+                    or the flow called a different method than was recorded
+        """
+        with self._lock:
+            entries = self._entries.get(channel)
+            if not entries:
+                return Err(f"Cassette.replay: no more recorded calls on {channel}")
+            entry = entries.popleft()
+
+            if entry["method"] != method:
+                return Err(
+                    f"Cassette.replay: flow diverged on {channel}, called {method} "
+                    f"but {entry['method']} was recorded"
+                )
+            if entry["input"] != input_digest:
+                self.mismatches += 1
+
+            self.served += 1
+            latency = entry["latency_s"] if self.latency == "original" else 0.0
+            self.replayed_latency_s += latency
+
+        if latency:
+            time.sleep(latency)
+
+        return result_from_native(entry["result"], as_tuple)
+
+    def remaining(self) -> Dict[str, int]:
+        """
+        Get the number of recorded calls not served yet, per channel.
+
+        Returns:
+            Dict[str, int]: Channel to remaining calls
+        """
+        with self._lock:
+            return {channel: len(entries) for channel, entries in self._entries.items()}
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def timed(fn: Callable[[], Result[Any, Any]]) -> Tuple[Result[Any, Any], float]:
+    started = time.monotonic()
+    result = fn()
+    return result, time.monotonic() - started
+
+
+class RecordingContainerManager:
+    """
+    Wraps a `ContainerManager`, recording every code execution into a cassette.
+    """
+
+    def __init__(self, container_manager, cassette: Cassette, channel: str = "container"):
+        """
+        Args:
+            container_manager (ContainerManager): The real container manager
+            cassette (Cassette): Recording cassette
+            channel (str): Channel the executions are recorded on
+        """
+        self.container_manager = container_manager
+        self.cassette = cassette
+        self.channel = channel
+
+    def run_code_in_con(self, code: str, postfix: str) -> Result[Tuple[str, str], str]:
+        result, latency = timed(
+            lambda: self.container_manager.run_code_in_con(code, postfix)
+        )
+        self.cassette.record(
+            self.channel, "run_code_in_con", digest([code, postfix]), result, latency
+        )
+        return result
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.container_manager, name)
+
+
+class ReplayContainerManager:
+    """
+    Stands in for a `ContainerManager`, serving recorded code executions without Docker.
+    """
+
+    def __init__(self, cassette: Cassette, channel: str = "container"):
+        """
+        Args:
+            cassette (Cassette): Replaying cassette
+            channel (str): Channel the executions were recorded on
+        """
+        self.cassette = cassette
+        self.channel = channel
+
+    def run_code_in_con(self, code: str, postfix: str) -> Result[Tuple[str, str], str]:
+        return self.cassette.replay(
+            self.channel, "run_code_in_con", digest([code, postfix]), as_tuple=True
+        )
+
+
+class RecordingSensor:
+    """
+    Wraps a trading or marketing sensor, recording the metric states the flow reads.
+
+    The metric state ends up in the prompts, so replaying it keeps the replayed
+    prompts identical to the recorded ones.
+    """
+
+    def __init__(self, sensor, cassette: Cassette, channel: str = "sensor"):
+        """
+        Args:
+            sensor (TradingSensor | MarketingSensor): The real sensor
+            cassette (Cassette): Recording cassette
+            channel (str): Channel the metric states are recorded on
+        """
+        self.sensor = sensor
+        self.cassette = cassette
+        self.channel = channel
+
+    def get_metric_fn(self, metric_name: str = "wallet") -> Callable[[], Any]:
+        metric_fn = self.sensor.get_metric_fn(metric_name)
+
+        def recorded():
+            started = time.monotonic()
+            value = metric_fn()
+            self.cassette.record(
+                self.channel,
+                "get_metric_fn",
+                digest(metric_name),
+                Ok(str(value)),
+                time.monotonic() - started,
+            )
+            return value
+
+        return recorded
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.sensor, name)
+
+
+class ReplaySensor:
+    """
+    Stands in for a sensor, serving the recorded metric states as strings.
+    """
+
+    def __init__(self, cassette: Cassette, channel: str = "sensor"):
+        """
+        Args:
+            cassette (Cassette): Replaying cassette
+            channel (str): Channel the metric states were recorded on
+        """
+        self.cassette = cassette
+        self.channel = channel
+
+    def get_metric_fn(self, metric_name: str = "wallet") -> Callable[[], Any]:
+        def replayed():
+            result = self.cassette.replay(self.channel, "get_metric_fn", digest(metric_name))
+            return result.unwrap_or(f"{metric_name} state unavailable in replay")
+
+        return replayed
+
+
+def record_session(
+    agent,
+    flow: Callable[[StrategyData | None, str | None], None],
+    cassette: Cassette,
+) -> Callable[[StrategyData | None, str | None], None]:
+    """
+    Record an agent's genner, container and sensor calls, and the arguments of every cycle.
+
+    Args:
+        agent (TradingAgent | MarketingAgent): Agent the flow runs with, its components are wrapped in place
+        flow (Callable[[StrategyData | None, str | None], None]): The session's flow
+        cassette (Cassette): Recording cassette
+
+    Returns:
+        Callable[[StrategyData | None, str | None], None]: The flow, recording its arguments before each cycle
+    """
+    from src.genner.Replay import RecordingGenner
+
+    agent.genner = RecordingGenner(agent.genner, cassette, "genner:main")
+    agent.container_manager = RecordingContainerManager(agent.container_manager, cassette)
+    agent.sensor = RecordingSensor(agent.sensor, cassette)
+
+    def recorded_flow(prev_strat: StrategyData | None, notif_str: str | None):
+        cassette.record_cycle(prev_strat, notif_str)
+        return flow(prev_strat, notif_str)
+
+    return recorded_flow
+
+
+def cycle_args(cycle: Dict[str, Any]) -> Tuple[Optional[StrategyData], Optional[str]]:
+    """
+    Rebuild the flow arguments of a recorded cycle.
+
+    Args:
+        cycle (Dict[str, Any]): Cycle entry of a loaded cassette
+
+    Returns:
+        Tuple[Optional[StrategyData], Optional[str]]: Previous strategy and notifications
+    """
+    prev_strat = cycle["prev_strat"]
+    return (
+        StrategyData(**prev_strat) if prev_strat else None,
+        cycle["notif_str"],
+    )
@@ -87,6 +87,7 @@ def get_summarizer(
         >>> summary = summarizer(["Point 1", "Point 2", "Point 3"])
     """
     genner.set_do_stream(False)
+    genner.set_stage("summarizer")
     
     return partial(
         summarize,
@@ -0,0 +1,177 @@
+import threading
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from src.db import APIDB
+
+# USD per million (input, output) tokens, used when the provider does not report a cost
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "deepseek-reasoner": (0.55, 2.19),
+    "deepseek-chat": (0.27, 1.10),
+    "deepseek/deepseek-r1": (0.55, 2.19),
+    "deepseek/deepseek-chat": (0.27, 1.10),
+    "openai/o3-mini": (1.10, 4.40),
+    "google/gemini-2.0-flash-lite-001": (0.075, 0.30),
+    "claude-3-5-sonnet-latest": (3.00, 15.00),
+    "claude-3-opus-20240229": (15.00, 75.00),
+}
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> Optional[float]:
+    """
+    Estimate the cost of a call from the list prices of its model.
+
+    Args:
+        model (str): Model identifier
+        input_tokens (int): Prompt tokens
+        output_tokens (int): Completion tokens, reasoning included
+
+    Returns:
+        Optional[float]: Cost in USD, None for models without a known price (e.g. local ones)
+    """
+    if model not in MODEL_PRICES:
+        return None
+
+    input_price, output_price = MODEL_PRICES[model]
+    return (input_tokens * input_price + output_tokens * output_price) / 1e6
+
+
+def usage_counts(usage: Dict) -> Tuple[int, int, int, Optional[float]]:
+    """
+    Read token counts and cost from an OpenAI-style `usage` object.
+
+    Args:
+        usage (Dict): The usage, as returned by OpenRouter or dumped from an OpenAI SDK response
+
+    Returns:
+        Tuple[int, int, int, Optional[float]]: Input, output and reasoning tokens,
+            and the cost if the provider reported one
+    """
+    details = usage.get("completion_tokens_details") or {}
+    return (
+        usage.get("prompt_tokens") or 0,
+        usage.get("completion_tokens") or 0,
+        details.get("reasoning_tokens") or 0,
+        usage.get("cost"),
+    )
+
+
+@dataclass
+class LLMCall:
+    """
+    Telemetry of a single LLM completion.
+
+    Attributes:
+        genner (str): Identifier of the genner that made the call
+        model (str): Model requested
+        stage (Optional[str]): Flow stage the call was made for
+        attempt (int): 1 for the first call of the stage, 2 for the first retry, ...
+        provider (Optional[str]): Provider that served the call, when known
+        ttft_s (Optional[float]): Seconds to the first token, None for non-streaming calls
+        latency_s (float): Seconds the whole call took
+        input_tokens (int): Prompt tokens
+        output_tokens (int): Completion tokens, reasoning included
+        reasoning_tokens (int): Hidden reasoning tokens
+        cost_usd (Optional[float]): Reported or estimated cost
+        ok (bool): Whether the call succeeded
+        error (Optional[str]): Error message of a failed call
+        session_id (Optional[str]): Session the call belongs to, set by `Telemetry`
+        call_id (str): Unique id of the record
+        started_at (str): UTC time the call started
+    """
+
+    genner: str
+    model: str
+    stage: Optional[str] = None
+    attempt: int = 1
+    provider: Optional[str] = None
+    ttft_s: Optional[float] = None
+    latency_s: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    reasoning_tokens: int = 0
+    cost_usd: Optional[float] = None
+    ok: bool = True
+    error: Optional[str] = None
+    session_id: Optional[str] = None
+    call_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    started_at: str = field(
+        default_factory=lambda: datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    )
+
+
+class Telemetry:
+    """
+    Collects LLM call records for a session and ships them to the REST API.
+
+    Records are buffered and sent in batches by `flush`, which runs when the
+    buffer is full and should be called at the end of every cycle. Records that
+    could not be sent stay buffered for the next flush, up to `max_buffer`.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        db: Optional["APIDB"] = None,
+        flush_every: int = 20,
+        max_buffer: int = 1000,
+    ):
+        """
+        Initialize the collector.
+
+        Args:
+            session_id (str): Session every record is tagged with
+            db (Optional[APIDB]): API client the records are sent to, None to only keep them in memory
+            flush_every (int): Buffered records that trigger a flush
+            max_buffer (int): Records kept while the API is unreachable, oldest are dropped first
+        """
+        self.session_id = session_id
+        self.db = db
+        self.flush_every = flush_every
+        self.max_buffer = max_buffer
+
+        self.buffer: List[LLMCall] = []
+        self._lock = threading.Lock()
+
+    def record(self, call: LLMCall) -> None:
+        """
+        Add a call record, flushing if the buffer is full.
+
+        Args:
+            call (LLMCall): The record, its session is filled in
+        """
+        call.session_id = self.session_id
+        with self._lock:
+            self.buffer.append(call)
+            if len(self.buffer) > self.max_buffer:
+                del self.buffer[: len(self.buffer) - self.max_buffer]
+            should_flush = len(self.buffer) >= self.flush_every
+
+        if should_flush:
+            self.flush()
+
+    def flush(self) -> bool:
+        """
+        Send the buffered records to the REST API.
+
+        Returns:
+            bool: True if the buffer is empty afterwards
+        """
+        if self.db is None:
+            return False
+
+        with self._lock:
+            batch, self.buffer = self.buffer, []
+
+        if not batch:
+            return True
+
+        if not self.db.insert_llm_calls([asdict(call) for call in batch]):
+            with self._lock:
+                self.buffer = (batch + self.buffer)[-self.max_buffer :]
+            return False
+
+        return True
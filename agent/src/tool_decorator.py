@@ -1,5 +1,8 @@
 import inspect
-from typing import Dict, Any, Callable, List
+import json
+import types
+import typing
+from typing import Dict, Any, Callable, List, Optional
 from functools import wraps
 
 class ToolRegistry:
@@ -14,6 +17,8 @@ class ToolRegistry:
         dict: "object",
         type(None): "null"
     }
+    # Providers only accept [a-zA-Z0-9_-] in tool names
+    SEPARATOR = "__"
 
     def __init__(self, namespace: str):
         self.namespace = namespace
@@ -22,7 +27,7 @@ class ToolRegistry:
 
     def __call__(self, func: Callable) -> Callable:
         """Decorator that registers class-level methods"""
-        full_name = f"{self.namespace}.{func.__name__}"
+        full_name = f"{self.namespace}{self.SEPARATOR}{func.__name__}"
         self._tools[full_name] = self._generate_schema(func, full_name)
         self._funcs[func.__name__] = func
 
@@ -35,9 +40,78 @@ class ToolRegistry:
     def get_all(self) -> List[Dict]:
         return list(self._tools.values())
 
+    def short_name(self, name: str) -> str:
+        """Strip the namespace from a tool name, as the model sends it back"""
+        prefix = f"{self.namespace}{self.SEPARATOR}"
+        return name[len(prefix):] if name.startswith(prefix) else name
+
+    def get(self, name: str) -> Dict[str, Any]:
+        """Get the schema of a tool by its short or full name"""
+        return self._tools[f"{self.namespace}{self.SEPARATOR}{self.short_name(name)}"]
+
+    def parameters(self, name: str) -> Dict[str, Any]:
+        """Get the JSON schema of a tool's arguments, e.g. for JSON-schema constrained output"""
+        return self.get(name)["function"]["parameters"]
+
+    def openai_tools(self, names: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Get tool schemas in the format of the OpenAI chat completions `tools` parameter.
+
+        Args:
+            names: Short names of the tools to include, all tools if None
+
+        Returns:
+            The tool schemas, without the `returns` field the API does not accept
+        """
+        schemas = self.get_all() if names is None else [self.get(n) for n in names]
+        return [
+            {
+                "type": "function",
+                "function": {
+                    k: v for k, v in schema["function"].items() if k != "returns"
+                },
+            }
+            for schema in schemas
+        ]
+
+    def anthropic_tools(self, names: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Get tool schemas in the format of the Anthropic messages `tools` parameter.
+
+        Args:
+            names: Short names of the tools to include, all tools if None
+
+        Returns:
+            The tool schemas
+        """
+        return [
+            {
+                "name": tool["function"]["name"],
+                "description": tool["function"]["description"],
+                "input_schema": tool["function"]["parameters"],
+            }
+            for tool in self.openai_tools(names)
+        ]
+
     def execute(self, instance, name: str, *args, **kwargs):
         """Execute method on a specific instance"""
-        return self._funcs[name](instance, *args, **kwargs)
+        return self._funcs[self.short_name(name)](instance, *args, **kwargs)
+
+    def execute_call(self, instance, name: str, arguments: str | Dict[str, Any]):
+        """
+        Execute a tool call as returned by the model.
+
+        Args:
+            instance: Object the tool's method is bound to
+            name: Tool name, with or without the namespace
+            arguments: Arguments as a JSON string (OpenAI) or a dict (Anthropic, Ollama)
+
+        Returns:
+            Whatever the tool returns
+        """
+        if isinstance(arguments, str):
+            arguments = json.loads(arguments) if arguments.strip() else {}
+        return self.execute(instance, name, **arguments)
 
     def _generate_schema(self, func: Callable, full_name: str) -> Dict[str, Any]:
         """Generate OpenAI-compatible function schema from a Python function"""
@@ -58,7 +132,7 @@ class ToolRegistry:
 
             param_info = {
                 "description": param_descriptions.get(name, ""),
-                "type": self._map_type(param.annotation),
+                **self._type_schema(param.annotation),
             }
 
             # Handle default values
@@ -97,6 +171,9 @@ class ToolRegistry:
             line = line.strip()
             if line.startswith("Args:"):
                 continue
+            if not line:
+                current_param = None
+                continue
             if ":" in line and line.split(":")[0].isidentifier():
                 current_param, desc = line.split(":", 1)
                 param_docs[current_param.strip()] = desc.strip()
@@ -127,4 +204,15 @@ class ToolRegistry:
 
     def _map_type(self, annotation: type) -> str:
         """Map Python type to JSON schema type string"""
-        return self.TYPE_MAP.get(annotation, "string")
+        return self.TYPE_MAP.get(typing.get_origin(annotation) or annotation, "string")
+
+    def _type_schema(self, annotation: type) -> Dict[str, Any]:
+        """Map Python type to JSON schema, including the item type of lists"""
+        origin = typing.get_origin(annotation)
+        args = [a for a in typing.get_args(annotation) if a is not type(None)]
+
+        if origin in (list, List) and args:
+            return {"type": "array", "items": self._type_schema(args[0])}
+        if origin in (typing.Union, types.UnionType) and len(args) == 1:
+            return self._type_schema(args[0])
+        return {"type": self._map_type(annotation)}
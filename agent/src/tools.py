@@ -0,0 +1,174 @@
+from typing import Any, Dict, List
+
+import httpx
+
+from src.db import APIDB
+from src.sensor.trading import TradingSensor
+from src.tool_decorator import ToolRegistry
+
+research_tools = ToolRegistry("research")
+
+COINGECKO_BASE_URL = "https://api.coingecko.com/api/v3"
+
+
+class ResearchTools:
+    """
+    Market research the trading agent can call directly as tools.
+
+    Each call runs in-process, so a research step costs one small JSON answer
+    instead of a generated script, a container run and a regeneration on every
+    error. The methods are registered on `research_tools` and offered to the
+    model through `Genner.run_tools`.
+    """
+
+    def __init__(
+        self,
+        sensor: TradingSensor,
+        db: APIDB,
+        notif_sources: List[str],
+        coingecko_api_key: str,
+        timeout: float = 15.0,
+    ):
+        """
+        Initialize the research tools.
+
+        Args:
+            sensor (TradingSensor): Sensor reading the wallet state
+            db (APIDB): Database client the notifications are fetched from
+            notif_sources (List[str]): Notification sources of the agent
+            coingecko_api_key (str): CoinGecko demo API key, may be empty
+            timeout (float): Seconds before a CoinGecko request is abandoned
+        """
+        self.sensor = sensor
+        self.db = db
+        self.notif_sources = notif_sources
+
+        headers = {"accept": "application/json"}
+        if coingecko_api_key:
+            headers["x-cg-demo-api-key"] = coingecko_api_key
+        self.client = httpx.Client(
+            base_url=COINGECKO_BASE_URL, headers=headers, timeout=timeout
+        )
+
+    def _coingecko(self, path: str, params: Dict[str, Any] | None = None) -> Any:
+        response = self.client.get(path, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    @research_tools
+    def get_wallet_status(self) -> Dict[str, Any]:
+        """
+        Get the current balances and value of the agent's wallet.
+
+        Returns:
+            The ETH balance, token balances and their USD values
+        """
+        return self.sensor.get_metric_fn("wallet")()
+
+    @research_tools
+    def get_trending_coins(self) -> List[Dict[str, Any]]:
+        """
+        Get the coins trending on CoinGecko in the last 24 hours.
+
+        Returns:
+            Trending coins with their CoinGecko id, symbol, market cap rank and price change
+        """
+        trending = self._coingecko("/search/trending")
+        coins = []
+        for entry in trending.get("coins", []):
+            item = entry.get("item", {})
+            data = item.get("data") or {}
+            coins.append(
+                {
+                    "id": item.get("id"),
+                    "name": item.get("name"),
+                    "symbol": item.get("symbol"),
+                    "market_cap_rank": item.get("market_cap_rank"),
+                    "price_usd": data.get("price"),
+                    "price_change_24h": (data.get("price_change_percentage_24h") or {}).get("usd"),
+                }
+            )
+        return coins
+
+    @research_tools
+    def search_token(self, query: str) -> List[Dict[str, Any]]:
+        """
+        Search CoinGecko for coins by name or symbol.
+
+        Args:
+            query: Name or symbol of the token, e.g. "pepe"
+
+        Returns:
+            Matching coins with their CoinGecko id, name, symbol and market cap rank
+        """
+        found = self._coingecko("/search", {"query": query})
+        return [
+            {
+                "id": coin.get("id"),
+                "name": coin.get("name"),
+                "symbol": coin.get("symbol"),
+                "market_cap_rank": coin.get("market_cap_rank"),
+            }
+            for coin in found.get("coins", [])[:10]
+        ]
+
+    @research_tools
+    def get_token_addresses(self, coin_id: str) -> Dict[str, Any]:
+        """
+        Get the contract addresses of a coin on every network it is deployed to.
+
+        Args:
+            coin_id: CoinGecko id of the coin, as returned by search_token
+
+        Returns:
+            The coin's symbol and a mapping of network to contract address
+        """
+        coin = self._coingecko(
+            f"/coins/{coin_id}",
+            {
+                "localization": "false",
+                "tickers": "false",
+                "market_data": "false",
+                "community_data": "false",
+                "developer_data": "false",
+            },
+        )
+        return {
+            "id": coin.get("id"),
+            "symbol": coin.get("symbol"),
+            "platforms": {k: v for k, v in (coin.get("platforms") or {}).items() if k},
+        }
+
+    @research_tools
+    def get_token_prices(self, coin_ids: List[str]) -> Dict[str, Any]:
+        """
+        Get the USD price, 24h change and market cap of coins.
+
+        Args:
+            coin_ids: CoinGecko ids of the coins
+
+        Returns:
+            A mapping of coin id to its price data
+        """
+        return self._coingecko(
+            "/simple/price",
+            {
+                "ids": ",".join(coin_ids),
+                "vs_currencies": "usd",
+                "include_24hr_change": "true",
+                "include_market_cap": "true",
+            },
+        )
+
+    @research_tools
+    def get_latest_notifications(self, limit: int = 5) -> str:
+        """
+        Get the latest news and social notifications the agent follows.
+
+        Args:
+            limit: Maximum number of notifications per source
+
+        Returns:
+            The notifications, one per line
+        """
+        return self.db.fetch_latest_notification_str_v2(self.notif_sources, limit=limit)
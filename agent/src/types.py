@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Callable, List, Dict, Optional, Tuple, TypeAlias
+from typing import Any, Callable, List, Dict, Optional, Sequence, Tuple, TypeAlias
 from enum import Enum, auto
 
 
@@ -17,18 +17,24 @@ class Message:
         content (str): The text content of the message
         metadata (Dict[str, Any]): Additional information about the message
     """
-    def __init__(self, role: str, content: str, metadata: Dict[str, Any] = {}):
+
+    # Histories hold many messages, slots keep each one to three references
+    __slots__ = ("role", "content", "metadata")
+
+    def __init__(
+        self, role: str, content: str, metadata: Optional[Dict[str, Any]] = None
+    ):
         """
         Initialize a Message with role, content, and optional metadata.
         
         Args:
             role (str): The role of the message sender
             content (str): The text content of the message
-            metadata (Dict[str, Any], optional): Additional information. Defaults to {}.
+            metadata (Optional[Dict[str, Any]], optional): Additional information. Defaults to a new empty dict.
         """
         self.role = role
         self.content = content
-        self.metadata: Dict[str, Any] = metadata
+        self.metadata: Dict[str, Any] = {} if metadata is None else metadata
 
     def as_native(self) -> Dict[str, str]:
         """
@@ -59,7 +65,7 @@ class Message:
         return Message(
             role=native["role"],
             content=native["content"],
-            metadata=native.get("metadata", {}),
+            metadata=dict(native.get("metadata") or {}),
         )
 
     def __repr__(self) -> str:
@@ -88,25 +94,100 @@ class Message:
 # ]
 
 
+class _Node:
+    """
+    One version of a chat history: its last message and the version before it.
+
+    Versions form a persistent linked list, so appending shares every earlier
+    message instead of copying them. The message tuple and native list of a
+    version are built on first use and cached on the node.
+    """
+
+    __slots__ = ("message", "parent", "length", "_messages", "_native")
+
+    def __init__(self, message: Message, parent: Optional["_Node"]):
+        self.message = message
+        self.parent = parent
+        self.length = 1 if parent is None else parent.length + 1
+        self._messages: Optional[Tuple[Message, ...]] = None
+        self._native: Optional[List[Dict[str, str]]] = None
+
+    def messages(self) -> Tuple[Message, ...]:
+        if self._messages is None:
+            # Walk back to the closest version that has its messages built
+            pending: List[Message] = []
+            node: Optional[_Node] = self
+            while node is not None and node._messages is None:
+                pending.append(node.message)
+                node = node.parent
+            prefix = node._messages if node is not None else ()
+            self._messages = prefix + tuple(reversed(pending))
+        return self._messages
+
+    def native(self) -> List[Dict[str, str]]:
+        if self._native is None:
+            # Reuse the closest cached native list, only the newer messages are converted
+            pending: List[Message] = []
+            node: Optional[_Node] = self
+            while node is not None and node._native is None:
+                pending.append(node.message)
+                node = node.parent
+            prefix = node._native if node is not None else []
+            self._native = prefix + [message.as_native() for message in reversed(pending)]
+        return self._native
+
+
+def _extend(tail: Optional[_Node], messages: Sequence[Message]) -> Optional[_Node]:
+    for message in messages:
+        tail = _Node(message, tail)
+    return tail
+
+
 class ChatHistory:
     """
     Represents a conversation history as a sequence of messages.
     
-    This class manages a list of Message objects and provides methods to manipulate
-    and access the conversation history. It supports operations like appending messages,
-    combining histories, and converting between native format and ChatHistory objects.
+    This class manages an immutable sequence of Message objects and provides methods
+    to manipulate and access the conversation history. It supports operations like
+    appending messages, combining histories, and converting between native format
+    and ChatHistory objects.
+
+    Histories are persistent: `append` is O(1) and `a + b` only links the messages
+    of `b` onto `a`, every history sharing the messages it was built from. The
+    result of `as_native` is cached per history, and a longer history reuses the
+    cached native messages of the one it was appended to, so a multi-stage
+    conversation converts each message once.
     """
-    def __init__(self, messages: List[Message] | Message = []):
+
+    __slots__ = ("_tail",)
+
+    def __init__(self, messages: Sequence[Message] | Message = ()):
         """
         Initialize a ChatHistory with a list of messages or a single message.
         
         Args:
-            messages (List[Message] | Message, optional): Initial messages. Defaults to [].
+            messages (Sequence[Message] | Message, optional): Initial messages. Defaults to none.
         """
-        self.messages: List[Message] = (
-            messages if isinstance(messages, list) else [messages]
+        self._tail: Optional[_Node] = _extend(
+            None, [messages] if isinstance(messages, Message) else messages
         )
 
+    @classmethod
+    def _from_tail(cls, tail: Optional[_Node]) -> "ChatHistory":
+        history = cls()
+        history._tail = tail
+        return history
+
+    @property
+    def messages(self) -> Tuple[Message, ...]:
+        """
+        Get the messages of the history, oldest first.
+
+        Returns:
+            Tuple[Message, ...]: The messages, cached per history
+        """
+        return self._tail.messages() if self._tail is not None else ()
+
     def __len__(self) -> int:
         """
         Get the number of messages in the history.
@@ -114,7 +195,7 @@ class ChatHistory:
         Returns:
             int: The number of messages
         """
-        return len(self.messages)
+        return self._tail.length if self._tail is not None else 0
 
     def __add__(self, other: "ChatHistory") -> "ChatHistory":
         """
@@ -126,10 +207,9 @@ class ChatHistory:
         Returns:
             ChatHistory: A new ChatHistory containing messages from both histories
         """
-        new_history = ChatHistory()
-        new_history.messages = self.messages.copy() + other.messages.copy()
-
-        return new_history
+        if self._tail is None:
+            return ChatHistory._from_tail(other._tail)
+        return ChatHistory._from_tail(_extend(self._tail, other.messages))
 
     def append(self, new_message: Message) -> "ChatHistory":
         """
@@ -141,18 +221,19 @@ class ChatHistory:
         Returns:
             ChatHistory: A new ChatHistory with the appended message
         """
-        new_history = ChatHistory()
-        new_history.messages = self.messages.copy() + [new_message]
-        return new_history
+        return ChatHistory._from_tail(_Node(new_message, self._tail))
 
     def as_native(self) -> List[Dict[str, str]]:
         """
         Convert the ChatHistory to a list of native dictionaries.
+
+        The list is cached and shared by every caller, do not modify it or its
+        dictionaries; copy it first, e.g. `list(history.as_native())`.
         
         Returns:
             List[Dict[str, str]]: List of message dictionaries
         """
-        return [message.as_native() for message in self.messages]
+        return self._tail.native() if self._tail is not None else []
 
     def get_latest_response(self) -> str:
         """
@@ -161,14 +242,12 @@ class ChatHistory:
         Returns:
             str: The content of the latest assistant message, or empty string if none exists
         """
-        assistant_messages = [
-            message for message in self.messages if message.role == "assistant"
-        ]
-
-        if not assistant_messages:  # Only return empty string if there are no assistant messages
-            return ""
-        return assistant_messages[-1].content
-
+        node = self._tail
+        while node is not None:
+            if node.message.role == "assistant":
+                return node.message.content
+            node = node.parent
+        return ""
 
     @staticmethod
     def from_native(native: List[Dict[str, str]]) -> "ChatHistory":
@@ -200,6 +279,8 @@ class ChatHistory:
     ) -> "ChatHistory":
         """
         Replace a message at a specific index in the history.
+
+        Only this history changes; histories sharing its messages keep the old one.
         
         Args:
             index (int): The index of the message to replace
@@ -208,7 +289,9 @@ class ChatHistory:
         Returns:
             ChatHistory: The modified ChatHistory (self)
         """
-        self.messages[index] = new_message
+        messages = list(self.messages)
+        messages[index] = new_message
+        self._tail = _extend(None, messages)
 
         return self
 
@@ -225,9 +308,10 @@ class ChatHistory:
         Returns:
             ChatHistory: The modified ChatHistory (self)
         """
-        self.messages[index].metadata = new_metadata
-
-        return self
+        message = self.messages[index]
+        return self.modify_message_at_index(
+            index, Message(message.role, message.content, new_metadata)
+        )
 
     def get_x_metadata(self, x: str) -> List[str]:
         """
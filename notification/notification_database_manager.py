@@ -55,7 +55,10 @@ class NotificationDatabaseManager:
             if result.get("status") == "success":
                 notification_id = result.get("data", {}).get("notification_id")
                 if notification_id:
-                    logger.info(f"Created notification {notification_id}")
+                    if result["data"].get("duplicate"):
+                        logger.info(f"Notification already stored as {notification_id}")
+                    else:
+                        logger.info(f"Created notification {notification_id}")
                     return notification_id
                 raise ValueError("No notification ID in response")
             else:
@@ -1,10 +1,12 @@
 import os, logging, sys, traceback
 from datetime import datetime
 from fastapi import FastAPI, Request, Response, status
-from typing import Optional
+from typing import Literal, Optional
 from pydantic import BaseModel
 from store import ingest_doc as save_result
 
+import codec
+
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -18,6 +20,8 @@ class GetRelevantDocumentParams(BaseModel):
     top_k: Optional[int] = 5
     threshold: Optional[float] = 0.7
     created_at: Optional[str] = None
+    # Re-encode strategy_data for clients without the payload codec, see codec.py
+    payload_format: Optional[Literal["json", "orjson", "msgpack"]] = None
 
 class SaveExecutionResultParams(BaseModel):
     agent_id: str
@@ -53,6 +57,9 @@ async def get_relevant_document_raw(request: Request, params: GetRelevantDocumen
         created_at = request_data['created_at']
 
         data = get_data_raw(query=query, agent_id=agent_id, session_id=session_id, top_k=top_k, threshold=threshold, created_at=created_at)
+        if params.payload_format:
+            for doc in data:
+                doc['metadata']['strategy_data'] = codec.transcode(doc['metadata']['strategy_data'], params.payload_format)
         msg = 'Relevant strategy found'
         if len(data) == 0:
             msg = 'No relevant strategy found'
@@ -0,0 +1,146 @@
+"""
+Benchmark the response path of the get endpoints on large results.
+
+Fills a scratch database with synthetic chat history, strategies and
+notifications, then times fetching `--rows` rows and serializing them the way
+FastAPI does by default (`jsonable_encoder` then `JSONResponse`) against
+`RowJSONResponse`, with every column and with a `fields` projection. Reports
+latency and the bytes that would go on the wire.
+
+Usage:
+    python bench_responses.py [--rows 10000] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+# The scratch database must be configured before config.py is imported
+os.environ["SQLITE_DB_FILE"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+
+from fastapi.encoders  import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+import db.chat_history         as db_ch
+import db.notification         as db_not
+import db.strategies           as db_st
+import interface.chat_history  as intf_ch
+import interface.notification  as intf_not
+import interface.strategies    as intf_st
+from init_db         import initialize_db
+from utils.response  import RowJSONResponse, orjson, project_columns
+from utils.utils     import close_connections, get_connection
+
+
+def synthesize_text(rng: random.Random, words: int) -> str:
+    vocabulary = ["ETH", "USDC", "swap", "price", "liquidity", "the", "volume", "24h", "trend", "buy", "sell"]
+    return " ".join(rng.choice(vocabulary) for _ in range(words))
+
+
+def fill(rows: int):
+    rng = random.Random(0)
+    connection = get_connection()
+    connection.executemany(
+        "INSERT INTO sup_chat_history (history_id, session_id, message_type, content, timestamp) VALUES (?, ?, ?, ?, ?)",
+        [
+            (f"h{i}", "bench", "assistant", synthesize_text(rng, 200), f"2024-01-01 {i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}")
+            for i in range(rows)
+        ],
+    )
+    connection.executemany(
+        "INSERT INTO sup_strategies (strategy_id, agent_id, summarized_desc, full_desc, strategy_result, parameters) VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (f"s{i}", "bench", synthesize_text(rng, 60), synthesize_text(rng, 600), "success", '{"apis": ["DuckDuckGo"]}')
+            for i in range(rows)
+        ],
+    )
+    connection.executemany(
+        "INSERT INTO sup_notifications (notification_id, source, short_desc, long_desc, notification_date) VALUES (?, ?, ?, ?, ?)",
+        [
+            (f"n{i}", "bench", synthesize_text(rng, 20), synthesize_text(rng, 100), f"2024-01-{i % 28 + 1:02d}")
+            for i in range(rows)
+        ],
+    )
+    connection.commit()
+
+
+def default_response(content) -> bytes:
+    """What FastAPI does with a route's return value when it is not a Response."""
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def fast_response(content) -> bytes:
+    return RowJSONResponse(content).body
+
+
+def measure(fetch, render, repeat: int) -> tuple:
+    """Fastest of `repeat` runs of fetch then render, in ms, and the bytes rendered."""
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = render({"status": "success", "data": fetch()})
+        best = min(best, time.perf_counter() - started)
+        size = len(body)
+    return best * 1e3, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    initialize_db()
+    fill(args.rows)
+    page = {"page_size": args.rows}
+
+    endpoints = [
+        (
+            "chat_history",
+            lambda cols: db_ch.get_all_chat_history_db.sync(cols, {"session_id": "bench"}, page)[1],
+            intf_ch.RESULT_COLS,
+            ["message_type"],
+            ("id", "timestamp"),
+        ),
+        (
+            "strategies",
+            lambda cols: db_st.get_all_strategies_db.sync(cols, {"agent_id": "bench"}, page)[1],
+            intf_st.RESULT_COLS,
+            ["strategy_id", "summarized_desc"],
+            ("id", "created_at"),
+        ),
+        (
+            "notifications",
+            lambda cols: db_not.get_all_notifications_db.sync(cols, {"source": "bench"}, page)[2],
+            intf_not.RESULT_COLS,
+            ["notification_id", "short_desc"],
+            ("id", "notification_date"),
+        ),
+    ]
+
+    print(f"{args.rows} rows per response, {'orjson' if orjson else 'json (orjson not installed)'}")
+    print(f"{'endpoint':<14} {'columns':<30} {'default ms':>11} {'fast ms':>9} {'speedup':>8} {'bytes':>11}")
+    for name, fetch, result_columns, fields, required in endpoints:
+        for label, columns in (
+            ("all", result_columns),
+            (",".join(fields), project_columns(fields, result_columns, required)),
+        ):
+            content = {"status": "success", "data": fetch(columns)}
+            assert json.loads(default_response(content)) == json.loads(fast_response(content))
+
+            default_ms, _ = measure(lambda: fetch(columns), default_response, args.repeat)
+            fast_ms, size = measure(lambda: fetch(columns), fast_response, args.repeat)
+            print(
+                f"{name:<14} {label:<30} {default_ms:>11.1f} {fast_ms:>9.1f} "
+                f"{default_ms / fast_ms:>7.1f}x {size:>11,}"
+            )
+
+    close_connections()
+
+
+if __name__ == "__main__":
+    main()
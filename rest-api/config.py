@@ -10,3 +10,15 @@ MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD")
 MYSQL_DATABASE = os.getenv("MYSQL_DATABASE")
 API_KEY        = os.getenv("API_KEY")
 
+# SQLite tuning, see utils/utils.py
+SQLITE_DB_FILE          = os.getenv("SQLITE_DB_FILE", "database.db")
+SQLITE_MMAP_SIZE        = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))  # bytes
+SQLITE_CACHE_SIZE_KB    = int(os.getenv("SQLITE_CACHE_SIZE_KB", 64 * 1024))
+SQLITE_BUSY_TIMEOUT_MS  = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+SQLITE_STATEMENT_CACHE  = int(os.getenv("SQLITE_STATEMENT_CACHE", 256))
+SQLITE_DB_WORKERS       = int(os.getenv("SQLITE_DB_WORKERS", 4))
+SQLITE_DB_QUEUE_SIZE    = int(os.getenv("SQLITE_DB_QUEUE_SIZE", 512))
+
+# Response cache of the hot read endpoints, see utils/cache.py. A TTL of 0 disables it
+RESPONSE_CACHE_TTL_S       = float(os.getenv("RESPONSE_CACHE_TTL_S", 5))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 4096))
@@ -21,6 +21,22 @@ def update_agent_sessions_db(cursor, set_dict, where_dict):
     return True
 
 
+@db_connection_decorator
+def increment_agent_sessions_db(cursor, increments: dict, where_dict):
+    """Add to the counters of an agent session in one statement, returns the new counters (SQLite >= 3.35)"""
+    set_clause = ", ".join([f"{key} = COALESCE({key}, 0) + ?" for key in increments.keys()])
+    if increments.get("cycle_count"):
+        set_clause += ", last_cycle = CURRENT_TIMESTAMP"
+    where_clause = " AND ".join([f"{key} = ?" for key in where_dict.keys()])
+    query = (
+        f"UPDATE sup_agent_sessions SET {set_clause} WHERE {where_clause} "
+        "RETURNING cycle_count, trades_count, last_cycle"
+    )
+    cursor.execute(query, list(increments.values()) + list(where_dict.values()))
+    rows = cursor.fetchall()
+    return rows[0] if rows else None
+
+
 @db_connection_decorator
 def get_all_agent_sessions_db(cursor, result_columns: list, where_conditions: dict, pagination):
     """Retrieve agent sessions with pagination"""
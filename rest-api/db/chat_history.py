@@ -1,4 +1,8 @@
-from utils.utils import db_connection_decorator, delete_none
+from utils.utils      import db_connection_decorator, delete_none
+from utils.export     import EXPORT_CHUNK_SIZE
+from utils.pagination import DEFAULT_PAGE_SIZE, fetch_keyset_page, time_range
+
+INSERT_COLS = ["history_id", "session_id", "message_type", "content", "timestamp"]
 
 
 @db_connection_decorator
@@ -11,6 +15,21 @@ def insert_chat_history_db(cursor, insert_dict):
     return True
 
 
+@db_connection_decorator
+def insert_chat_history_batch_db(cursor, insert_dicts: list):
+    """Insert a batch of chat history records in one transaction"""
+    columns = ", ".join(INSERT_COLS)
+    # A missing timestamp falls back to the column default instead of NULL
+    values = ", ".join(
+        ["COALESCE(?, CURRENT_TIMESTAMP)" if col == "timestamp" else "?" for col in INSERT_COLS]
+    )
+    query = f"INSERT INTO sup_chat_history ({columns}) VALUES ({values})"
+    cursor.executemany(
+        query, [[row.get(col) for col in INSERT_COLS] for row in insert_dicts]
+    )
+    return cursor.rowcount
+
+
 @db_connection_decorator
 def update_chat_history_db(cursor, set_dict, where_dict):
     """Update existing chat history records"""
@@ -24,40 +43,54 @@ def update_chat_history_db(cursor, set_dict, where_dict):
 
 @db_connection_decorator
 def get_all_chat_history_db(cursor, result_columns: list, where_conditions: dict, pagination):
-    """Retrieve chat history with pagination"""
+    """Retrieve chat history oldest first, one keyset page at a time on idx_session_time"""
     delete_none(where_conditions)
     select_clause = ", ".join(result_columns) if result_columns else "*"
     where_clause = " AND ".join([f"{col} = ?" for col in where_conditions.keys()])
 
-    order_by_clause = (
-        f"ORDER BY {pagination['sort_by']} ASC" if "sort_by" in pagination else ""
+    result, next_cursor = fetch_keyset_page(
+        cursor,
+        "sup_chat_history",
+        select_clause,
+        where_clause,
+        list(where_conditions.values()),
+        "timestamp",
+        False,
+        pagination.get("page_size") or DEFAULT_PAGE_SIZE,
+        pagination.get("cursor"),
+    )
+
+    # Counting scans every matching row, only done when asked for
+    count = None
+    if pagination.get("with_total"):
+        count_query = "SELECT COUNT(1) as sum FROM sup_chat_history"
+        if where_clause:
+            count_query += f" WHERE {where_clause}"
+        cursor.execute(count_query, list(where_conditions.values()))
+        count = cursor.fetchone()["sum"]
+
+    return count, result, next_cursor
+
+
+@db_connection_decorator
+def export_chat_history_db(
+    cursor, result_columns: list, where_conditions: dict, since, until, page_cursor
+):
+    """Retrieve one chunk of a chat history export, oldest first, see utils/export.py"""
+    delete_none(where_conditions)
+    select_clause = ", ".join(result_columns) if result_columns else "*"
+    range_clause, range_values = time_range("timestamp", since, until)
+    conditions = [f"{col} = ?" for col in where_conditions.keys()] + [range_clause]
+    where_clause = " AND ".join(c for c in conditions if c)
+
+    return fetch_keyset_page(
+        cursor,
+        "sup_chat_history",
+        select_clause,
+        where_clause,
+        list(where_conditions.values()) + range_values,
+        "timestamp",
+        False,
+        EXPORT_CHUNK_SIZE,
+        page_cursor,
     )
-    page = pagination.get("page", 1)
-    page_size = pagination.get("page_size", 800)
-    offset = (page - 1) * page_size
-
-    # Get total count for pagination
-    count_query = "SELECT COUNT(1) as sum FROM sup_chat_history"
-    query = f"SELECT {select_clause} FROM sup_chat_history"
-    
-    if where_clause:
-        query += f" WHERE {where_clause}"
-        count_query += f" WHERE {where_clause}"
-    
-    if order_by_clause:
-        query += f" {order_by_clause}"
-    
-    query += f" LIMIT ? OFFSET ?"
-    
-    # Debugging
-    print(query)
-
-    # Execute main query
-    cursor.execute(query, list(where_conditions.values()) + [page_size, offset])
-    result = cursor.fetchall()
-
-    # Execute count query
-    cursor.execute(count_query, list(where_conditions.values()))
-    count = cursor.fetchone()
-
-    return count["sum"], result
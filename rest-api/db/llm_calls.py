@@ -0,0 +1,96 @@
+from utils.utils import db_connection_decorator, delete_none
+
+INSERT_COLS = [
+    "call_id",
+    "session_id",
+    "stage",
+    "attempt",
+    "genner",
+    "model",
+    "provider",
+    "ttft_s",
+    "latency_s",
+    "input_tokens",
+    "output_tokens",
+    "reasoning_tokens",
+    "cost_usd",
+    "ok",
+    "error",
+    "started_at",
+]
+
+
+@db_connection_decorator
+def insert_llm_calls_db(cursor, records: list):
+    """Insert a batch of LLM call records in one statement"""
+    columns = ", ".join(INSERT_COLS)
+    values = ", ".join(["?" for _ in INSERT_COLS])
+    query = f"INSERT INTO sup_llm_calls ({columns}) VALUES ({values})"
+    cursor.executemany(
+        query, [[record.get(col) for col in INSERT_COLS] for record in records]
+    )
+    return cursor.rowcount
+
+
+@db_connection_decorator
+def get_all_llm_calls_db(cursor, result_columns: list, where_conditions: dict, pagination):
+    """Retrieve LLM call records with pagination, newest first"""
+    delete_none(where_conditions)
+    select_clause = ", ".join(result_columns) if result_columns else "*"
+    where_clause = " AND ".join([f"{col} = ?" for col in where_conditions.keys()])
+
+    page = pagination.get("page") or 1
+    page_size = pagination.get("page_size") or 100
+    offset = (page - 1) * page_size
+
+    count_query = "SELECT COUNT(1) as sum FROM sup_llm_calls"
+    query = f"SELECT {select_clause} FROM sup_llm_calls"
+
+    if where_clause:
+        query += f" WHERE {where_clause}"
+        count_query += f" WHERE {where_clause}"
+
+    query += " ORDER BY started_at DESC LIMIT ? OFFSET ?"
+
+    cursor.execute(query, list(where_conditions.values()) + [page_size, offset])
+    result = cursor.fetchall()
+
+    cursor.execute(count_query, list(where_conditions.values()))
+    count = cursor.fetchone()
+
+    return count["sum"], result
+
+
+@db_connection_decorator
+def get_llm_call_summary_db(cursor, group_by: list, where_conditions: dict, since=None):
+    """Aggregate latency, tokens and cost of LLM calls per group"""
+    delete_none(where_conditions)
+    conditions = [f"{col} = ?" for col in where_conditions.keys()]
+    params = list(where_conditions.values())
+    if since:
+        conditions.append("started_at >= ?")
+        params.append(since)
+
+    group_clause = ", ".join(group_by)
+    query = f"""
+        SELECT {group_clause},
+            COUNT(1) AS calls,
+            SUM(CASE WHEN ok THEN 0 ELSE 1 END) AS errors,
+            AVG(ttft_s) AS avg_ttft_s,
+            MAX(ttft_s) AS max_ttft_s,
+            AVG(latency_s) AS avg_latency_s,
+            MAX(latency_s) AS max_latency_s,
+            SUM(latency_s) AS total_latency_s,
+            SUM(input_tokens) AS input_tokens,
+            SUM(output_tokens) AS output_tokens,
+            SUM(reasoning_tokens) AS reasoning_tokens,
+            SUM(output_tokens) / NULLIF(SUM(latency_s - COALESCE(ttft_s, 0)), 0) AS output_tokens_per_s,
+            SUM(cost_usd) AS cost_usd
+        FROM sup_llm_calls
+    """
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += f" GROUP BY {group_clause} ORDER BY total_latency_s DESC"
+
+    cursor.execute(query, params)
+    return cursor.fetchall()
@@ -1,44 +1,90 @@
-from utils.utils import db_connection_decorator, delete_none
+import hashlib
 
+from fastapi          import HTTPException
+from utils.utils      import db_connection_decorator, delete_none
+from utils.pagination import DEFAULT_PAGE_SIZE, fetch_keyset_page
 
-@db_connection_decorator
-def insert_notifications_prevent_duplicate_db(cursor, insert_dict) -> str:
-    """Insert notification with duplicate prevention"""
-    columns = ", ".join(insert_dict.keys())
-    values = ", ".join(["?" for _ in insert_dict.values()])
 
-    try:
-        # Check if the record exists with the same relative_to_scraper_id or long_desc
-        check_query = "SELECT id FROM sup_notifications WHERE relative_to_scraper_id = ? OR long_desc = ?"
+INSERT_COLS = [
+    "notification_id",
+    "bot_username",
+    "relative_to_scraper_id",
+    "source",
+    "short_desc",
+    "long_desc",
+    "notification_date",
+    "dedup_key",
+]
+
+# Notifications kept per source in sup_latest_notifications, see migrations.py.
+# The triggers maintaining the table are built with it, changing it takes a migration.
+LATEST_PER_SOURCE = 50
+
+
+def notification_dedup_key(notification: dict):
+    """
+    Key shared by copies of the same notification: a hash of its source and
+    scraper id, or of its source and content when the scraper gave no id.
+    Notifications with neither are never treated as duplicates.
+    """
+    source = notification.get("source") or ""
+    if notification.get("relative_to_scraper_id"):
+        raw = f"{source}\x1fid\x1f{notification['relative_to_scraper_id']}"
+    elif notification.get("long_desc"):
+        raw = f"{source}\x1fcontent\x1f{notification['long_desc']}"
+    else:
+        return None
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+@db_connection_decorator
+def insert_notifications_batch_db(cursor, insert_dicts: list) -> list:
+    """
+    Insert notifications in one statement, skipping those whose dedup key is already stored.
+    Returns, for every notification, the notification_id of its stored row and whether it was inserted now.
+    A copy repeated within the batch is only sent once and gets the result of its first copy.
+    """
+    keys = [notification_dedup_key(row) for row in insert_dicts]
+    first_copies = {}
+    for row, key in zip(insert_dicts, keys):
+        first_copies.setdefault(key, row)
+    columns = ", ".join(INSERT_COLS)
+    values = ", ".join(["?" for _ in INSERT_COLS])
+    query = f"INSERT OR IGNORE INTO sup_notifications ({columns}) VALUES ({values})"
+    cursor.executemany(
+        query,
+        [
+            [row.get(col) for col in INSERT_COLS[:-1]] + [key]
+            for row, key in zip(insert_dicts, keys)
+            if key is None or first_copies[key] is row
+        ],
+    )
+
+    # A skipped duplicate of a stored row takes the stored row's id
+    stored = {}
+    unique_keys = [key for key in first_copies if key is not None]
+    for i in range(0, len(unique_keys), 500):
+        chunk = unique_keys[i : i + 500]
+        placeholders = ", ".join(["?"] * len(chunk))
         cursor.execute(
-            check_query,
-            [insert_dict.get("relative_to_scraper_id"), insert_dict.get("long_desc")],
+            f"SELECT dedup_key, notification_id FROM sup_notifications WHERE dedup_key IN ({placeholders})",
+            chunk,
         )
-        existing = cursor.fetchone()
+        stored.update((row["dedup_key"], row["notification_id"]) for row in cursor.fetchall())
 
-        if not existing:
-            # Insert new record
-            query = f"INSERT INTO sup_notifications ({columns}) VALUES ({values})"
-            cursor.execute(query, list(insert_dict.values()))
-        return "success"
-    except Exception as e:
-        return str(e)
+    results = []
+    for row, key in zip(insert_dicts, keys):
+        if key is None:
+            results.append((row["notification_id"], True))
+        else:
+            results.append((stored[key], stored[key] == first_copies[key]["notification_id"]))
+    return results
 
 
 @db_connection_decorator
-def insert_notifications_batch_prevent_duplicate_db(cursor, insert_dicts):
-    """Process batch of notifications with duplicate prevention"""
-    try:
-        if not isinstance(insert_dicts, dict) or "notifications" not in insert_dicts:
-            return "Invalid batch data format: expected dictionary with 'notifications' key"
-
-        for insert_dict in insert_dicts["notifications"]:
-            err = insert_notifications_prevent_duplicate_db(insert_dict)
-            if err != "success":
-                return err
-        return "success"
-    except Exception as e:
-        return str(e)
+def insert_notifications_prevent_duplicate_db(cursor, insert_dict) -> tuple:
+    """Insert notification with duplicate prevention on the dedup key, returns its stored id and whether it was inserted"""
+    return insert_notifications_batch_db.sync([insert_dict])[0]
 
 
 @db_connection_decorator
@@ -70,34 +116,38 @@ def update_notifications_db(cursor, set_dict, where_dict) -> str:
 
 @db_connection_decorator
 def get_all_notifications_db(cursor, result_columns: list, where_conditions: dict, pagination) -> tuple:
-    """Retrieve notifications with pagination"""
+    """Retrieve notifications newest first, one keyset page at a time"""
     try:
         delete_none(where_conditions)
         select_clause = ", ".join(result_columns) if result_columns else "*"
         where_clause = " AND ".join([f"{col} = ?" for col in where_conditions.keys()])
-        order_by_clause = "ORDER BY notification_date DESC"
-        page = pagination.get("page", 1)
-        page_size = pagination.get("page_size", 800)
-        offset = (page - 1) * page_size
-
-        # Get total count for pagination
-        count_query = "SELECT COUNT(1) as sum FROM sup_notifications"
-        query = f"SELECT {select_clause} FROM sup_notifications"
-        if where_clause:
-            query += f" WHERE {where_clause}"
-            count_query += f" WHERE {where_clause}"
-        if order_by_clause:
-            query += f" {order_by_clause}"
-            count_query += f" {order_by_clause}"
-        query += f" LIMIT ? OFFSET ?"
-
-        cursor.execute(query, list(where_conditions.values()) + [page_size, offset])
-        result = cursor.fetchall()
-        cursor.execute(count_query, list(where_conditions.values()))
-        count = cursor.fetchone()
-        return ("success", count["sum"], result)
+
+        result, next_cursor = fetch_keyset_page(
+            cursor,
+            "sup_notifications",
+            select_clause,
+            where_clause,
+            list(where_conditions.values()),
+            "notification_date",
+            True,
+            pagination.get("page_size") or DEFAULT_PAGE_SIZE,
+            pagination.get("cursor"),
+        )
+
+        # Counting scans every matching row, only done when asked for
+        count = None
+        if pagination.get("with_total"):
+            count_query = "SELECT COUNT(1) as sum FROM sup_notifications"
+            if where_clause:
+                count_query += f" WHERE {where_clause}"
+            cursor.execute(count_query, list(where_conditions.values()))
+            count = cursor.fetchone()["sum"]
+
+        return ("success", count, result, next_cursor)
+    except HTTPException:
+        raise
     except Exception as e:
-        return (str(e), 0, [])
+        return (str(e), 0, [], None)
 
 
 @db_connection_decorator
@@ -142,15 +192,22 @@ def get_all_notifications_old_db(cursor, result_columns: list, where_conditions:
 @db_connection_decorator
 def get_notifications_alfath(cursor, result_columns, sources, page_size) -> tuple:
     """Get latest notifications per source"""
+    select_clause = ", ".join(result_columns) if result_columns else "*"
     placeholders = ", ".join(["?"] * len(sources))
     where_clause = f"source IN ({placeholders})"
+    # The latest notifications of every source are kept in their own small table,
+    # only deeper reads rank the whole history
+    if page_size <= LATEST_PER_SOURCE:
+        table = "sup_latest_notifications"
+    else:
+        table = "sup_notifications"
     query = f"""
-    SELECT *
+    SELECT {select_clause}
     FROM (
         SELECT 
-            sup_notifications.*,
-            ROW_NUMBER() OVER (PARTITION BY source ORDER BY notification_date DESC) AS row_num
-        FROM sup_notifications
+            {table}.*,
+            ROW_NUMBER() OVER (PARTITION BY source ORDER BY notification_date DESC, id DESC) AS row_num
+        FROM {table}
         WHERE {where_clause}
     ) ranked
     WHERE row_num <= ?
@@ -1,4 +1,6 @@
-from utils.utils import db_connection_decorator, delete_none
+from utils.utils      import db_connection_decorator, delete_none
+from utils.export     import EXPORT_CHUNK_SIZE
+from utils.pagination import DEFAULT_PAGE_SIZE, fetch_keyset_page, time_range
 
 
 @db_connection_decorator
@@ -26,66 +28,69 @@ def update_strategies_db(cursor, set_dict, where_dict):
 def get_all_strategies_db(
     cursor, result_columns: list, where_conditions: dict, pagination
 ):
-    """Retrieve all strategies with pagination (SQLite version)"""
+    """Retrieve strategies newest first, one keyset page at a time (SQLite version)"""
     delete_none(where_conditions)
     select_clause = ", ".join(result_columns) if result_columns else "*"
     where_clause = " AND ".join([f"{col} = ?" for col in where_conditions.keys()])
-    order_by_clause = (
-        f"ORDER BY sup_strategies.{pagination['sort_by']} ASC"
-        if "sort_by" in pagination
-        else ""
+
+    result, next_cursor = fetch_keyset_page(
+        cursor,
+        "sup_strategies",
+        select_clause,
+        where_clause,
+        list(where_conditions.values()),
+        "created_at",
+        True,
+        pagination.get("page_size") or DEFAULT_PAGE_SIZE,
+        pagination.get("cursor"),
     )
-    page = pagination.get("page", 1)
-    page_size = pagination.get("page_size", 800)
-    offset = (page - 1) * page_size
-    limit_clause = f"LIMIT {page_size} OFFSET {offset}"
 
-    # Get total count for pagination
-    count_query = "SELECT COUNT(1) as sum FROM sup_strategies"
-    query = f"SELECT {select_clause} FROM sup_strategies"
-    if where_clause:
-        query += f" WHERE {where_clause}"
-        count_query += f" WHERE {where_clause}"
-    if order_by_clause:
-        query += f" {order_by_clause}"
-        count_query += f" {order_by_clause}"
-    query += f" {limit_clause}"
+    # Counting scans every matching row, only done when asked for
+    count = None
+    if pagination.get("with_total"):
+        count_query = "SELECT COUNT(1) as sum FROM sup_strategies"
+        if where_clause:
+            count_query += f" WHERE {where_clause}"
+        cursor.execute(count_query, list(where_conditions.values()))
+        count = cursor.fetchone()["sum"]
 
-    print(query)
-    cursor.execute(query, list(where_conditions.values()))
-    result = cursor.fetchall()
-    cursor.execute(count_query, list(where_conditions.values()))
-    count = cursor.fetchone()["sum"]
-    return count, result
+    return count, result, next_cursor
 
 
 @db_connection_decorator
-def get_all_strategies_db_2(
-    cursor, result_columns: list, where_conditions: dict, pagination
+def get_agent_strategies_db(cursor, result_columns: list, agent_id: str, limit: int):
+    """Retrieve the newest strategies of an agent, walking idx_agent_created backwards"""
+    select_clause = ", ".join(result_columns) if result_columns else "*"
+    # id breaks ties between strategies created in the same second, the index holds it as the rowid
+    query = f"""
+        SELECT {select_clause} FROM sup_strategies
+        WHERE agent_id = ?
+        ORDER BY created_at DESC, id DESC
+        LIMIT ?
+    """
+    cursor.execute(query, [agent_id, limit])
+    return cursor.fetchall()
+
+
+@db_connection_decorator
+def export_strategies_db(
+    cursor, result_columns: list, where_conditions: dict, since, until, page_cursor
 ):
-    """Retrieve strategies with pagination and fixed sorting (SQLite version)"""
+    """Retrieve one chunk of a strategies export, oldest first, see utils/export.py"""
     delete_none(where_conditions)
     select_clause = ", ".join(result_columns) if result_columns else "*"
-    where_clause = " AND ".join([f"{col} = ?" for col in where_conditions.keys()])
-    order_by_clause = "ORDER BY sup_strategies.created_at DESC"
-    page = pagination.get("page", 1)
-    page_size = pagination.get("page_size", 800)
-    offset = (page - 1) * page_size
-    limit_clause = f"LIMIT {page_size} OFFSET {offset}"
+    range_clause, range_values = time_range("created_at", since, until)
+    conditions = [f"{col} = ?" for col in where_conditions.keys()] + [range_clause]
+    where_clause = " AND ".join(c for c in conditions if c)
 
-    count_query = "SELECT COUNT(1) as sum FROM sup_strategies"
-    query = f"SELECT {select_clause} FROM sup_strategies"
-    if where_clause:
-        query += f" WHERE {where_clause}"
-        count_query += f" WHERE {where_clause}"
-    if order_by_clause:
-        query += f" {order_by_clause}"
-        count_query += f" {order_by_clause}"
-    query += f" {limit_clause}"
-
-    print(query)
-    cursor.execute(query, list(where_conditions.values()))
-    result = cursor.fetchall()
-    cursor.execute(count_query, list(where_conditions.values()))
-    count = cursor.fetchone()["sum"]
-    return count, result
+    return fetch_keyset_page(
+        cursor,
+        "sup_strategies",
+        select_clause,
+        where_clause,
+        list(where_conditions.values()) + range_values,
+        "created_at",
+        False,
+        EXPORT_CHUNK_SIZE,
+        page_cursor,
+    )
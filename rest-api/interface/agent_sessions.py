@@ -48,3 +48,10 @@ class AgentSessionsUpdateParams(BaseModel):
     fe_data:      Optional[str] = Field(None)
     trades_count: Optional[str] = Field(None)
     cycle_count:  Optional[str] = Field(None)
+
+
+class AgentSessionsIncrementParams(BaseModel):
+    session_id:   str
+    agent_id:     Optional[str] = Field(None)
+    cycle_count:  int = Field(0, ge=0)
+    trades_count: int = Field(0, ge=0)
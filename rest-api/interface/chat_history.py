@@ -18,9 +18,39 @@ class ChatHistoryParams(BaseModel):
     timestamp:    Optional[str] = Field(None)
 
 
+class ChatHistoryMessageParams(BaseModel):
+    message_type: str
+    content:      Optional[str] = Field(None)
+    timestamp:    Optional[str] = Field(None)
+
+
+class ChatHistoryBatchParams(BaseModel):
+    session_id: str
+    messages:   List[ChatHistoryMessageParams] = Field(default_factory=list)
+
+
 class ChatHistoryUpdateParams(BaseModel):
     history_id:   Optional[str] = Field(None)
     session_id:   Optional[str] = Field(None)
     message_type: Optional[str] = Field(None)
     content:      Optional[str] = Field(None)
     timestamp:    Optional[str] = Field(None)
+
+
+class ChatHistoryGetParams(ChatHistoryUpdateParams):
+    # Keyset pagination, pass back `next_cursor` to get the following page
+    cursor:        Optional[str]  = Field(None)
+    page_size:     Optional[int]  = Field(None, ge=1, le=800)
+    include_total: bool           = Field(False)
+    # Columns to return, `id` and `timestamp` are always included
+    fields:        Optional[List[str]] = Field(None)
+
+
+class ChatHistoryExportParams(BaseModel):
+    session_id:   Optional[str]       = Field(None)
+    message_type: Optional[str]       = Field(None)
+    # Messages with since <= timestamp < until
+    since:        Optional[str]       = Field(None)
+    until:        Optional[str]       = Field(None)
+    # Columns to return, `id` and `timestamp` are always included
+    fields:       Optional[List[str]] = Field(None)
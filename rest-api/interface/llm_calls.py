@@ -0,0 +1,68 @@
+from pydantic import BaseModel, Field
+from typing   import Any, Dict, List, Optional, Union, Literal
+
+RESULT_COLS = [
+    "id",
+    "call_id",
+    "session_id",
+    "stage",
+    "attempt",
+    "genner",
+    "model",
+    "provider",
+    "ttft_s",
+    "latency_s",
+    "input_tokens",
+    "output_tokens",
+    "reasoning_tokens",
+    "cost_usd",
+    "ok",
+    "error",
+    "started_at",
+]
+
+# Columns the summary can be grouped by
+GROUP_COLS = ["session_id", "stage", "genner", "model", "provider"]
+
+
+class LLMCallParams(BaseModel):
+    call_id:          Optional[str] = Field(None)
+    session_id:       Optional[str] = Field(None)
+    stage:            Optional[str] = Field(None)
+    attempt:          Optional[int] = Field(None)
+    genner:           Optional[str] = Field(None)
+    model:            Optional[str] = Field(None)
+    provider:         Optional[str] = Field(None)
+    ttft_s:           Optional[float] = Field(None)
+    latency_s:        Optional[float] = Field(None)
+    input_tokens:     Optional[int] = Field(None)
+    output_tokens:    Optional[int] = Field(None)
+    reasoning_tokens: Optional[int] = Field(None)
+    cost_usd:         Optional[float] = Field(None)
+    ok:               Optional[bool] = Field(None)
+    error:            Optional[str] = Field(None)
+    started_at:       Optional[str] = Field(None)
+
+
+class LLMCallBatchParams(BaseModel):
+    records: List[LLMCallParams] = Field(default_factory=list)
+
+
+class LLMCallQueryParams(BaseModel):
+    session_id: Optional[str] = Field(None)
+    stage:      Optional[str] = Field(None)
+    genner:     Optional[str] = Field(None)
+    model:      Optional[str] = Field(None)
+    provider:   Optional[str] = Field(None)
+    page:       Optional[int] = Field(None)
+    page_size:  Optional[int] = Field(None)
+
+
+class LLMCallSummaryParams(BaseModel):
+    session_id: Optional[str] = Field(None)
+    stage:      Optional[str] = Field(None)
+    model:      Optional[str] = Field(None)
+    since:      Optional[str] = Field(None)
+    group_by:   List[Literal["session_id", "stage", "genner", "model", "provider"]] = Field(
+        default_factory=lambda: ["stage", "model"]
+    )
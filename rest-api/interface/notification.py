@@ -33,6 +33,15 @@ class NotificationsUpdateParams(BaseModel):
     notification_date:      Optional[str] = Field(None)
 
 
+class NotificationsGetParams(NotificationsUpdateParams):
+    # Keyset pagination, pass back `next_cursor` to get the following page
+    cursor:                 Optional[str] = Field(None)
+    page_size:              Optional[int] = Field(None, ge=1, le=800)
+    include_total:          bool          = Field(False)
+    # Columns to return, `id` and `notification_date` are always included
+    fields:                 Optional[List[str]] = Field(None)
+
+
 class NotificationsUpdateParamsv2(BaseModel):
     bot_username:           Optional[str]       = Field(None)
     notification_id:        Optional[str]       = Field(None)
@@ -48,6 +57,8 @@ class NotificationsUpdateParamsv2(BaseModel):
 class NotificationsUpdateParamsv3(BaseModel):
     sources: Optional[List[str]] = Field(None)
     limit:   Optional[int]       = 800
+    # Columns to return, all of them and the rank `row_num` by default
+    fields:  Optional[List[str]] = Field(None)
 
 
 class NotificationsBatchParams(BaseModel):
@@ -29,3 +29,39 @@ class StrategyUpdateParams(BaseModel):
     parameters:      Optional[str] = Field(None)
     strategy_result: Optional[str] = Field(None)
 
+
+
+class StrategyGetParams(StrategyUpdateParams):
+    # Re-encode `parameters` for clients without the payload codec, see utils/codec.py
+    payload_format:  Optional[Literal["json", "orjson", "msgpack"]] = Field(None)
+    # Keyset pagination, pass back `next_cursor` to get the following page
+    cursor:          Optional[str]  = Field(None)
+    page_size:       Optional[int]  = Field(None, ge=1, le=800)
+    include_total:   bool           = Field(False)
+    # Columns to return, `id` and `created_at` are always included
+    fields:          Optional[List[str]] = Field(None)
+
+
+class StrategyExportParams(BaseModel):
+    agent_id:        Optional[str]       = Field(None)
+    strategy_result: Optional[str]       = Field(None)
+    # Strategies with since <= created_at < until
+    since:           Optional[str]       = Field(None)
+    until:           Optional[str]       = Field(None)
+    # Columns to return, `id` and `created_at` are always included
+    fields:          Optional[List[str]] = Field(None)
+    # Re-encode `parameters` for clients without the payload codec, see utils/codec.py
+    payload_format:  Optional[Literal["json", "orjson", "msgpack"]] = Field(None)
+
+
+class StrategyAgentParams(BaseModel):
+    agent_id:       str
+    limit:          int = Field(800, ge=1, le=800)
+    payload_format: Optional[Literal["json", "orjson", "msgpack"]] = Field(None)
+    # Columns to return, `id` is always included
+    fields:         Optional[List[str]] = Field(None)
+
+
+class StrategyLatestParams(BaseModel):
+    agent_id:       str
+    payload_format: Optional[Literal["json", "orjson", "msgpack"]] = Field(None)
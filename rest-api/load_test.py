@@ -0,0 +1,132 @@
+"""
+Load test the API with many concurrent agent sessions.
+
+Every simulated session loops over the calls an agent makes in one cycle:
+read its session and latest strategy, read notifications, store the stage's
+chat history and strategy, then count the cycle. Reports sustained requests
+per second and latency percentiles per endpoint.
+
+Usage:
+    python load_test.py --url http://localhost:9020/api_v1 --api-key KEY [--sessions 64] [--duration 20]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from collections import defaultdict
+
+import httpx
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+async def setup_session(client, agent_id):
+    session_id = str(uuid.uuid4())
+    response = await client.post(
+        "/agent_sessions/create",
+        json={"agent_id": agent_id, "session_id": session_id, "status": "running"},
+    )
+    response.raise_for_status()
+    return session_id
+
+
+async def run_session(client, agent_id, session_id, deadline, latencies, errors):
+    """Run agent cycles until the deadline, recording the latency of every call."""
+    cycle = 0
+    while time.monotonic() < deadline:
+        calls = [
+            ("agent_sessions/get_v2", {"session_id": session_id, "agent_id": agent_id}),
+            ("strategies/latest", {"agent_id": agent_id}),
+            ("notification/get_v3", {"sources": ["twitter_feed", "crypto_news_bitcoin_magazine"], "limit": 5}),
+            (
+                "chat_history/create_batch",
+                {
+                    "session_id": session_id,
+                    "messages": [
+                        {"message_type": role, "content": f"cycle {cycle} " + "x" * 400}
+                        for role in ("system", "user", "assistant") * 2
+                    ],
+                },
+            ),
+            (
+                "strategies/create",
+                {
+                    "agent_id": agent_id,
+                    "summarized_desc": f"cycle {cycle}",
+                    "full_desc": "x" * 1000,
+                    "parameters": json.dumps({"cycle": cycle}),
+                    "strategy_result": "success",
+                },
+            ),
+            ("agent_sessions/increment", {"session_id": session_id, "cycle_count": 1}),
+        ]
+        for endpoint, body in calls:
+            started = time.perf_counter()
+            try:
+                response = await client.post(f"/{endpoint}", json=body)
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            latencies[endpoint].append(time.perf_counter() - started)
+            if not ok:
+                errors[endpoint] += 1
+        cycle += 1
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://localhost:9020/api_v1")
+    parser.add_argument("--api-key", required=True)
+    parser.add_argument("--sessions", type=int, default=64, help="Concurrent agent sessions")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds to run for")
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=args.sessions, max_keepalive_connections=args.sessions)
+    async with httpx.AsyncClient(
+        base_url=args.url,
+        headers={"x-api-key": args.api_key},
+        limits=limits,
+        timeout=60.0,
+    ) as client:
+        response = await client.post(
+            "/agent/create", json={"user_id": "load_test", "name": "load test"}
+        )
+        response.raise_for_status()
+        agent_id = response.json()["data"]["agent_id"]
+        session_ids = [await setup_session(client, agent_id) for _ in range(args.sessions)]
+
+        latencies = defaultdict(list)
+        errors = defaultdict(int)
+        started = time.monotonic()
+        deadline = started + args.duration
+        await asyncio.gather(
+            *(
+                run_session(client, agent_id, session_id, deadline, latencies, errors)
+                for session_id in session_ids
+            )
+        )
+        elapsed = time.monotonic() - started
+
+    every = [latency for endpoint in latencies.values() for latency in endpoint]
+    print(
+        f"{args.sessions} sessions, {len(every)} requests in {elapsed:.1f}s: "
+        f"{len(every) / elapsed:.0f} req/s, p50 {percentile(every, 50) * 1e3:.1f} ms, "
+        f"p99 {percentile(every, 99) * 1e3:.1f} ms, {sum(errors.values())} errors"
+    )
+    print(f"{'endpoint':<28} {'requests':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for endpoint, values in latencies.items():
+        print(
+            f"{endpoint:<28} {len(values):>9} {percentile(values, 50) * 1e3:>8.1f} "
+            f"{percentile(values, 99) * 1e3:>8.1f} {errors[endpoint]:>7}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,470 @@
+"""
+Versioned schema migrations for the SQLite database.
+
+Each migration runs once, in order, in its own transaction, and is recorded in
+`sup_schema_migrations`. Add a migration by appending to `MIGRATIONS` with the
+next version; never change one that has shipped.
+
+Usage:
+    python migrations.py            # apply the pending migrations
+    python migrations.py --status   # list the migrations and when they were applied
+    python migrations.py --check    # migrate, then fail if a hot query scans a table
+"""
+
+import argparse
+import sqlite3
+import sys
+
+from config          import SQLITE_DB_FILE
+from db.notification import LATEST_PER_SOURCE, notification_dedup_key
+
+# Version 1, the schema from before migrations were tracked. Written to be
+# re-runnable so that databases created by the old init_db.py adopt it as is.
+BASELINE_SCHEMA = """
+-- sup_agent_sessions definition
+
+CREATE TABLE IF NOT EXISTS sup_agent_sessions (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  session_id TEXT UNIQUE,
+  agent_id TEXT NOT NULL,
+  status TEXT CHECK(status IN ('running', 'stopped', 'stopping')) NOT NULL DEFAULT 'running',
+  started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  ended_at TIMESTAMP DEFAULT NULL,
+  fe_data TEXT,
+  trades_count INTEGER DEFAULT NULL,
+  cycle_count INTEGER DEFAULT NULL,
+  session_interval INTEGER DEFAULT 900,  -- seconds
+  will_end_at TIMESTAMP DEFAULT (datetime('now', '+12 hours')),
+  last_cycle TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  status_cycle TEXT CHECK(status_cycle IN ('running', 'finished')) DEFAULT 'finished'
+);
+
+CREATE INDEX IF NOT EXISTS idx_agent_started ON sup_agent_sessions (agent_id, started_at);
+
+-- sup_agents definition
+
+CREATE TABLE IF NOT EXISTS sup_agents (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  agent_id TEXT UNIQUE,
+  user_id TEXT NOT NULL,
+  name TEXT NOT NULL,
+  configuration TEXT,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  wallet_address TEXT,
+  UNIQUE(agent_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_user_id ON sup_agents (user_id);
+
+-- sup_chat_history definition
+
+CREATE TABLE IF NOT EXISTS sup_chat_history (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  history_id TEXT,
+  session_id TEXT NOT NULL,
+  message_type TEXT NOT NULL,
+  content TEXT,
+  timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_session_time ON sup_chat_history (session_id, timestamp);
+
+-- sup_llm_calls definition
+
+CREATE TABLE IF NOT EXISTS sup_llm_calls (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  call_id TEXT,
+  session_id TEXT,
+  stage TEXT,
+  attempt INTEGER,
+  genner TEXT,
+  model TEXT,
+  provider TEXT,
+  ttft_s REAL,
+  latency_s REAL,
+  input_tokens INTEGER DEFAULT 0,
+  output_tokens INTEGER DEFAULT 0,
+  reasoning_tokens INTEGER DEFAULT 0,
+  cost_usd REAL,
+  ok INTEGER DEFAULT 1,
+  error TEXT,
+  started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_calls_session_stage ON sup_llm_calls (session_id, stage);
+CREATE INDEX IF NOT EXISTS idx_llm_calls_model ON sup_llm_calls (model, started_at);
+
+-- sup_notifications definition
+
+CREATE TABLE IF NOT EXISTS sup_notifications (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  notification_id TEXT,
+  bot_username TEXT,
+  relative_to_scraper_id TEXT,
+  source TEXT,
+  short_desc TEXT,
+  long_desc TEXT,
+  notification_date DATETIME,
+  created DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- sup_strategies definition
+
+CREATE TABLE IF NOT EXISTS sup_strategies (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  strategy_id TEXT,
+  agent_id TEXT NOT NULL,
+  summarized_desc TEXT,
+  full_desc TEXT,
+  strategy_result TEXT,
+  parameters TEXT,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_agent_created ON sup_strategies (agent_id, created_at);
+
+-- sup_users definition
+
+CREATE TABLE IF NOT EXISTS sup_users (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  user_id TEXT,
+  username TEXT NOT NULL,
+  email TEXT NOT NULL,
+  wallet_address TEXT,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- sup_wallet_snapshots definition
+
+CREATE TABLE IF NOT EXISTS sup_wallet_snapshots (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  snapshot_id TEXT,
+  agent_id TEXT NOT NULL,
+  total_value_usd DECIMAL(20,8),
+  assets TEXT,
+  snapshot_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_agent_time ON sup_wallet_snapshots (agent_id, snapshot_time);
+INSERT OR IGNORE INTO sup_agents (agent_id, user_id, name, configuration) 
+VALUES ('agent_007', 'user_123', 'Agent Alpha', '{"setting": "default"}');
+
+INSERT OR IGNORE INTO sup_agents (agent_id, user_id, name, configuration) 
+VALUES ('agent_002', 'user_456', 'Agent Beta', '{"mode": "advanced"}');
+"""
+
+
+def add_notification_dedup_key(conn):
+    """
+    Add the dedup key of notifications, see `db.notification.notification_dedup_key`.
+    The oldest copy of each duplicate keeps the key, the later copies are left without one.
+    """
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(sup_notifications)")]
+    if "dedup_key" in columns:
+        # Created by the init_db.py that added the key
+        conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_notification_dedup ON sup_notifications (dedup_key)"
+        )
+        return
+
+    conn.execute("ALTER TABLE sup_notifications ADD COLUMN dedup_key TEXT")
+    seen = set()
+    updates = []
+    rows = conn.execute(
+        "SELECT id, source, relative_to_scraper_id, long_desc FROM sup_notifications ORDER BY id"
+    )
+    for row_id, source, scraper_id, long_desc in rows:
+        key = notification_dedup_key(
+            {"source": source, "relative_to_scraper_id": scraper_id, "long_desc": long_desc}
+        )
+        if key is None or key in seen:
+            continue
+        seen.add(key)
+        updates.append((key, row_id))
+
+    conn.executemany("UPDATE sup_notifications SET dedup_key = ? WHERE id = ?", updates)
+    conn.execute("CREATE UNIQUE INDEX idx_notification_dedup ON sup_notifications (dedup_key)")
+
+
+HOT_QUERY_INDEXES = """
+-- Lookups and updates by public id
+CREATE INDEX IF NOT EXISTS idx_strategy_id ON sup_strategies (strategy_id);
+CREATE INDEX IF NOT EXISTS idx_history_id ON sup_chat_history (history_id);
+CREATE INDEX IF NOT EXISTS idx_notification_id ON sup_notifications (notification_id);
+
+-- Latest notifications per source, and notification pages with or without a source
+CREATE INDEX IF NOT EXISTS idx_notification_source_date ON sup_notifications (source, notification_date);
+CREATE INDEX IF NOT EXISTS idx_notification_date ON sup_notifications (notification_date);
+
+-- LLM call pages of a session, newest first
+CREATE INDEX IF NOT EXISTS idx_llm_calls_session_started ON sup_llm_calls (session_id, started_at);
+"""
+
+LATEST_NOTIFICATION_COLS = (
+    "id, notification_id, bot_username, relative_to_scraper_id, source, "
+    "short_desc, long_desc, notification_date, created, dedup_key"
+)
+
+
+def latest_notifications_sql(per_source: int) -> str:
+    """
+    sup_latest_notifications, a copy of the latest `per_source` notifications of
+    every source, kept up to date by triggers on sup_notifications. Inserts add
+    the row and drop the source's oldest, updates and deletes refill the sources
+    they touch from the source index, so every write costs a few index lookups.
+    """
+    new_cols = ", ".join(f"NEW.{col}" for col in LATEST_NOTIFICATION_COLS.split(", "))
+
+    def refill(source):
+        return f"""
+  DELETE FROM sup_latest_notifications WHERE source IS {source};
+  INSERT INTO sup_latest_notifications ({LATEST_NOTIFICATION_COLS})
+    SELECT {LATEST_NOTIFICATION_COLS} FROM sup_notifications WHERE source = {source}
+    ORDER BY notification_date DESC, id DESC LIMIT {per_source};"""
+
+    return f"""
+CREATE TABLE sup_latest_notifications AS SELECT {LATEST_NOTIFICATION_COLS} FROM sup_notifications WHERE 0;
+
+CREATE UNIQUE INDEX idx_latest_notification_id ON sup_latest_notifications (id);
+CREATE INDEX idx_latest_notification_source_date ON sup_latest_notifications (source, notification_date);
+
+INSERT INTO sup_latest_notifications ({LATEST_NOTIFICATION_COLS})
+  SELECT {LATEST_NOTIFICATION_COLS} FROM (
+    SELECT *, ROW_NUMBER() OVER (PARTITION BY source ORDER BY notification_date DESC, id DESC) AS row_num
+    FROM sup_notifications
+    WHERE source IS NOT NULL
+  )
+  WHERE row_num <= {per_source};
+
+CREATE TRIGGER trg_latest_notifications_insert AFTER INSERT ON sup_notifications
+WHEN NEW.source IS NOT NULL
+BEGIN
+  INSERT INTO sup_latest_notifications ({LATEST_NOTIFICATION_COLS}) VALUES ({new_cols});
+  DELETE FROM sup_latest_notifications WHERE source = NEW.source AND id NOT IN (
+    SELECT id FROM sup_latest_notifications WHERE source = NEW.source
+    ORDER BY notification_date DESC, id DESC LIMIT {per_source}
+  );
+END;
+
+CREATE TRIGGER trg_latest_notifications_update AFTER UPDATE ON sup_notifications
+BEGIN{refill("OLD.source")}{refill("NEW.source")}
+END;
+
+CREATE TRIGGER trg_latest_notifications_delete AFTER DELETE ON sup_notifications
+BEGIN{refill("OLD.source")}
+END;
+"""
+
+
+EXPORT_INDEXES = """
+-- Whole-table exports, oldest first
+CREATE INDEX IF NOT EXISTS idx_strategy_created ON sup_strategies (created_at);
+CREATE INDEX IF NOT EXISTS idx_history_time ON sup_chat_history (timestamp);
+"""
+
+SESSION_EXPIRY_INDEX = """
+-- Running sessions past their end time
+CREATE INDEX IF NOT EXISTS idx_session_status_end ON sup_agent_sessions (status, will_end_at);
+"""
+
+
+# (version, name, SQL script or function of the connection)
+MIGRATIONS = [
+    (1, "baseline schema", BASELINE_SCHEMA),
+    (2, "notification dedup key", add_notification_dedup_key),
+    (3, "indexes for hot queries", HOT_QUERY_INDEXES),
+    (4, "latest notifications per source", latest_notifications_sql(LATEST_PER_SOURCE)),
+    (5, "indexes for exports", EXPORT_INDEXES),
+    (6, "index for expired sessions", SESSION_EXPIRY_INDEX),
+]
+
+
+def connect(db_file=SQLITE_DB_FILE):
+    """Open a connection for migrating, in autocommit mode as `migrate` opens its own transactions."""
+    return sqlite3.connect(db_file, isolation_level=None)
+
+
+def applied_migrations(conn) -> dict:
+    """Versions already applied, with when they were applied."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sup_schema_migrations (
+          version INTEGER PRIMARY KEY,
+          name TEXT NOT NULL,
+          applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    return dict(conn.execute("SELECT version, applied_at FROM sup_schema_migrations"))
+
+
+def split_statements(script: str) -> list:
+    """Split a SQL script into its statements."""
+    statements = []
+    current = ""
+    for line in script.splitlines(keepends=True):
+        current += line
+        if sqlite3.complete_statement(current):
+            statements.append(current.strip())
+            current = ""
+    return statements
+
+
+def migrate(conn) -> list:
+    """Apply the pending migrations in order, returns the versions applied."""
+    applied = applied_migrations(conn)
+    done = []
+    for version, name, migration in MIGRATIONS:
+        if version in applied:
+            continue
+        # executescript() commits first, so scripts are run statement by statement
+        # to keep every migration all or nothing
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if callable(migration):
+                migration(conn)
+            else:
+                for statement in split_statements(migration):
+                    conn.execute(statement)
+            conn.execute(
+                "INSERT INTO sup_schema_migrations (version, name) VALUES (?, ?)",
+                (version, name),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        print(f"Applied migration {version}: {name}")
+        done.append(version)
+    return done
+
+
+# Queries the API runs on every agent cycle or page, with sample parameters.
+# check_query_plans() requires each of them to be answered through an index.
+HOT_QUERIES = {
+    "strategy by id": (
+        "SELECT * FROM sup_strategies WHERE strategy_id = ?",
+        ["s"],
+    ),
+    "strategies page of an agent": (
+        "SELECT * FROM sup_strategies WHERE (agent_id = ?) AND ((created_at, id) < (?, ?)) "
+        "ORDER BY created_at DESC, id DESC LIMIT ?",
+        ["a", "2024-01-01", 1, 800],
+    ),
+    "chat history by id": (
+        "SELECT * FROM sup_chat_history WHERE history_id = ?",
+        ["h"],
+    ),
+    "chat history page of a session": (
+        "SELECT * FROM sup_chat_history WHERE (session_id = ?) AND ((timestamp, id) > (?, ?)) "
+        "ORDER BY timestamp ASC, id ASC LIMIT ?",
+        ["s", "2024-01-01", 1, 800],
+    ),
+    "strategies export chunk": (
+        "SELECT * FROM sup_strategies WHERE (created_at >= ? AND created_at < ?) "
+        "AND ((created_at, id) > (?, ?)) ORDER BY created_at ASC, id ASC LIMIT ?",
+        ["2024-01-01", "2024-02-01", "2024-01-15", 1, 1001],
+    ),
+    "chat history export chunk": (
+        "SELECT * FROM sup_chat_history WHERE ((timestamp, id) > (?, ?)) "
+        "ORDER BY timestamp ASC, id ASC LIMIT ?",
+        ["2024-01-15", 1, 1001],
+    ),
+    "notification by id": (
+        "SELECT * FROM sup_notifications WHERE notification_id = ?",
+        ["n"],
+    ),
+    "notifications page": (
+        "SELECT * FROM sup_notifications WHERE ((notification_date, id) < (?, ?)) "
+        "ORDER BY notification_date DESC, id DESC LIMIT ?",
+        ["2024-01-01", 1, 800],
+    ),
+    "notifications page of a source": (
+        "SELECT * FROM sup_notifications WHERE (source = ?) AND ((notification_date, id) < (?, ?)) "
+        "ORDER BY notification_date DESC, id DESC LIMIT ?",
+        ["twitter_feed", "2024-01-01", 1, 800],
+    ),
+    "latest notifications per source": (
+        """
+        SELECT * FROM (
+            SELECT sup_latest_notifications.*,
+                ROW_NUMBER() OVER (PARTITION BY source ORDER BY notification_date DESC, id DESC) AS row_num
+            FROM sup_latest_notifications
+            WHERE source IN (?, ?)
+        ) ranked
+        WHERE row_num <= ?
+        """,
+        ["twitter_feed", "crypto_news_bitcoin_magazine", 5],
+    ),
+    "latest notifications per source, past the latest table": (
+        """
+        SELECT * FROM (
+            SELECT sup_notifications.*,
+                ROW_NUMBER() OVER (PARTITION BY source ORDER BY notification_date DESC, id DESC) AS row_num
+            FROM sup_notifications
+            WHERE source IN (?, ?)
+        ) ranked
+        WHERE row_num <= ?
+        """,
+        ["twitter_feed", "crypto_news_bitcoin_magazine", 100],
+    ),
+    "session by id": (
+        "SELECT * FROM sup_agent_sessions WHERE session_id = ? AND agent_id = ?",
+        ["s", "a"],
+    ),
+    "sessions of an agent": (
+        "SELECT * FROM sup_agent_sessions WHERE agent_id = ? LIMIT ? OFFSET ?",
+        ["a", 800, 0],
+    ),
+    "expired running sessions": (
+        "SELECT * FROM sup_agent_sessions WHERE status = ? AND will_end_at < ?",
+        ["running", "2024-01-01"],
+    ),
+    "llm calls page of a session": (
+        "SELECT * FROM sup_llm_calls WHERE session_id = ? ORDER BY started_at DESC LIMIT ? OFFSET ?",
+        ["s", 800, 0],
+    ),
+}
+
+
+def check_query_plans(conn) -> list:
+    """EXPLAIN QUERY PLAN every hot query, returns the ones that scan a table with their plan."""
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    failures = []
+    for name, (query, params) in HOT_QUERIES.items():
+        plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+        # Only scans of stored tables count, "SCAN ranked" walks a subquery's rows
+        if any(step.startswith("SCAN ") and step.split()[1] in tables for step in plan):
+            failures.append((name, plan))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument("--db", default=SQLITE_DB_FILE, help="Database file")
+    parser.add_argument("--status", action="store_true", help="List the migrations without applying them")
+    parser.add_argument("--check", action="store_true", help="Fail if a hot query scans a table")
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    if args.status:
+        applied = applied_migrations(conn)
+        for version, name, _ in MIGRATIONS:
+            print(f"{version:>3}  {name:<28} {applied.get(version, 'pending')}")
+        return
+
+    migrate(conn)
+    if not args.check:
+        return
+    failures = check_query_plans(conn)
+    for name, plan in failures:
+        print(f"{name} scans a table:\n  " + "\n  ".join(plan))
+    print(f"{len(HOT_QUERIES) - len(failures)}/{len(HOT_QUERIES)} hot queries use an index")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,12 +11,12 @@ router = APIRouter()
 
 
 @router.post("/api_v1/agent_sessions/create")
-def create_agent_sessions(
+async def create_agent_sessions(
     _x_api_key: X_API_KEY_DEPS, request: Request, params: intf_as.AgentSessionsParams
 ):
     """Creates a new agent session."""
     # Check if agent exists first
-    count, results = db_a.get_all_agents_db(
+    count, results = await db_a.get_all_agents_db(
         intf_a.RESULT_COLS, {"agent_id": params.agent_id}, {}
     )
     # If no agent found with given agent_id, return 404 error
@@ -31,7 +31,7 @@ def create_agent_sessions(
     if not params.session_id:
         req_data["session_id"] = str(uuid.uuid4())
 
-    db_as.insert_agent_sessions_db(req_data)
+    await db_as.insert_agent_sessions_db(req_data)
     return {
         "status": "success",
         "msg": "agent session inserted",
@@ -40,7 +40,7 @@ def create_agent_sessions(
 
 
 @router.post("/api_v1/agent_sessions/update")
-def update_agent_sessions(
+async def update_agent_sessions(
     _x_api_key: X_API_KEY_DEPS,
     request: Request,
     params: intf_as.AgentSessionsUpdateParams,
@@ -49,12 +49,35 @@ def update_agent_sessions(
     where_dict = {"session_id": params.session_id}
     if params.agent_id:
         where_dict["agent_id"] = params.agent_id
-    db_as.update_agent_sessions_db(params.__dict__, where_dict)
+    await db_as.update_agent_sessions_db(params.__dict__, where_dict)
     return {"status": "success", "msg": "agent session updated"}
 
 
+@router.post("/api_v1/agent_sessions/increment")
+async def increment_agent_sessions(
+    _x_api_key: X_API_KEY_DEPS,
+    request: Request,
+    params: intf_as.AgentSessionsIncrementParams,
+):
+    """Atomically adds to the cycle and trade counters of a session, a cycle also sets last_cycle."""
+    where_dict = {"session_id": params.session_id}
+    if params.agent_id:
+        where_dict["agent_id"] = params.agent_id
+    increments = {
+        "cycle_count": params.cycle_count,
+        "trades_count": params.trades_count,
+    }
+    counters = await db_as.increment_agent_sessions_db(increments, where_dict)
+    if counters is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Agent session with ID {params.session_id} does not exist.",
+        )
+    return {"status": "success", "msg": "agent session incremented", "data": counters}
+
+
 @router.post("/api_v1/agent_sessions/get")
-def get_agent_sessions(
+async def get_agent_sessions(
     _x_api_key: X_API_KEY_DEPS,
     request: Request,
     params: intf_as.AgentSessionsUpdateParams,
@@ -66,26 +89,26 @@ def get_agent_sessions(
     """
     # If session_id is provided, get single session
     if params.session_id:
-        count, results = db_as.get_all_agent_sessions_db(
+        count, results = await db_as.get_all_agent_sessions_db(
             intf_as.RESULT_COLS, {"session_id": params.session_id}, {}
         )
         return {"status": "success", "data": results[0]}
     else:
-        count, results = db_as.get_all_agent_sessions_db(
+        count, results = await db_as.get_all_agent_sessions_db(
             intf_as.RESULT_COLS, params.__dict__, {}
         )
         return {"status": "success", "data": results, "total_items": count}
 
 
 @router.post("/api_v1/agent_sessions/get_v2")
-def get_agent_sessions(
+async def get_agent_sessions(
     _x_api_key: X_API_KEY_DEPS,
     request: Request,
     params: intf_as.AgentSessionsUpdateParams,
 ):
     """Alternative endpoint to retrieve agent sessions (v2)."""
     # Get all sessions matching parameters
-    count, results = db_as.get_all_agent_sessions_db(
+    count, results = await db_as.get_all_agent_sessions_db(
         intf_as.RESULT_COLS, params.__dict__, {}
     )
     return {"status": "success", "data": results, "total_items": count}
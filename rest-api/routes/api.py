@@ -8,16 +8,20 @@ Imports:
         * agent_sessions:   Session management for agents
         * agents:           Agent-related operations
         * chat_history:     Chat log management
+        * llm_calls:        LLM call telemetry
         * strategies:       Trading strategy operations
         * user:             User management functions
         * wallet_snapshots: Wallet tracking
         * notification:     System notifications
         * test:             Testing endpoints
         * payments:         Payment processing and tracking
+        * cache:            Response cache statistics
 
 Router Setup:
     - Creates FastAPI instance
     - Includes all route modules
+    - Caches the hot read endpoints, see utils/cache.py
+    - Closes the pooled SQLite connections on shutdown
     - Configures logging
 
 Logger Configuration:
@@ -38,26 +42,40 @@ from fastapi import (
 import logging, sys
 
 import routes.test             as test
+import routes.cache            as cache
 import routes.user             as user
 import routes.agents           as agents
 import routes.payments         as payments
 import routes.strategies       as strategies
 import routes.chat_history     as chat_history
+import routes.llm_calls        as llm_calls
 import routes.notification     as notification
 import routes.agent_sessions   as agent_sessions
 import routes.wallet_snapshots as wallet_snapshots
 
+from utils.cache import ResponseCacheMiddleware
+from utils.utils import close_connections
+
 app = FastAPI()
+app.add_middleware(ResponseCacheMiddleware)
 
 app.include_router(agent_sessions.router)
 app.include_router(agents.router)
 app.include_router(chat_history.router)
+app.include_router(llm_calls.router)
 app.include_router(strategies.router)
 app.include_router(user.router)
 app.include_router(wallet_snapshots.router)
 app.include_router(notification.router)
 app.include_router(test.router)
 app.include_router(payments.router)
+app.include_router(cache.router)
+
+
+@app.on_event("shutdown")
+def shutdown():
+    close_connections()
+
 
 logger = logging.getLogger(__name__)
 
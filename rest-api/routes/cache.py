@@ -0,0 +1,11 @@
+from fastapi     import APIRouter
+from utils.cache import response_cache
+from utils.utils import X_API_KEY_DEPS
+
+router = APIRouter()
+
+
+@router.get("/api_v1/cache/stats")
+async def get_cache_stats(_x_api_key: X_API_KEY_DEPS):
+    """Hit ratio and size of this process's response cache."""
+    return {"status": "success", "data": response_cache.stats()}
@@ -2,20 +2,23 @@ import uuid
 import db.chat_history        as db_as
 import interface.chat_history as intf_ch
 
-from fastapi     import APIRouter, Request
-from utils.utils import X_API_KEY_DEPS
+from fastapi          import APIRouter, Request
+from utils.utils      import X_API_KEY_DEPS
+from utils.export     import export_response
+from utils.pagination import PAGINATION_FIELDS, page_response, pagination_params
+from utils.response   import project_columns
 
 router = APIRouter()
 
 
 @router.post("/api_v1/chat_history/create")
-def create_chat_history(
+async def create_chat_history(
     _x_api_key: X_API_KEY_DEPS, request: Request, params: intf_ch.ChatHistoryParams
 ):
     """Create a new chat history record."""
     req_data = params.__dict__
     req_data["history_id"] = str(uuid.uuid4())
-    db_as.insert_chat_history_db(req_data)
+    await db_as.insert_chat_history_db(req_data)
     return {
         "status": "success",
         "msg": "chat history inserted",
@@ -23,32 +26,74 @@ def create_chat_history(
     }
 
 
+@router.post("/api_v1/chat_history/create_batch")
+async def create_chat_history_batch(
+    _x_api_key: X_API_KEY_DEPS, request: Request, params: intf_ch.ChatHistoryBatchParams
+):
+    """Create the chat history records of a whole conversation in one transaction."""
+    rows = [
+        {
+            **message.__dict__,
+            "session_id": params.session_id,
+            "history_id": str(uuid.uuid4()),
+        }
+        for message in params.messages
+    ]
+    if rows:
+        await db_as.insert_chat_history_batch_db(rows)
+    return {
+        "status": "success",
+        "msg": "chat history inserted",
+        "data": {"history_ids": [row["history_id"] for row in rows]},
+    }
+
+
 @router.post("/api_v1/chat_history/update")
-def update_chat_history(
+async def update_chat_history(
     _x_api_key: X_API_KEY_DEPS,
     request: Request,
     params: intf_ch.ChatHistoryUpdateParams,
 ):
     """Update an existing chat history record."""
-    db_as.update_chat_history_db(params.__dict__, {"history_id": params.history_id})
+    await db_as.update_chat_history_db(params.__dict__, {"history_id": params.history_id})
     return {"status": "success", "msg": "chat history updated"}
 
 
 @router.post("/api_v1/chat_history/get")
-def get_chat_history(
+async def get_chat_history(
     _x_api_key: X_API_KEY_DEPS,
     request: Request,
-    params: intf_ch.ChatHistoryUpdateParams,
+    params: intf_ch.ChatHistoryGetParams,
 ):
-    """Retrieve chat history records based on provided parameters."""
+    """Retrieve chat history records based on provided parameters, oldest first."""
+    columns = project_columns(params.fields, intf_ch.RESULT_COLS, ("id", "timestamp"))
     if params.history_id:
-        count, results = db_as.get_all_chat_history_db(
-            intf_ch.RESULT_COLS, {"history_id": params.history_id}, {}
+        count, results, _ = await db_as.get_all_chat_history_db(
+            columns, {"history_id": params.history_id}, {}
         )
         return {"status": "success", "data": results[0]}
     else:
-        count, results = db_as.get_all_chat_history_db(
-            intf_ch.RESULT_COLS, params.__dict__, {}
+        count, results, next_cursor = await db_as.get_all_chat_history_db(
+            columns,
+            params.model_dump(exclude=PAGINATION_FIELDS),
+            pagination_params(params),
+        )
+        return page_response(results, count, next_cursor)
+
+
+@router.post("/api_v1/chat_history/export")
+async def export_chat_history(
+    _x_api_key: X_API_KEY_DEPS,
+    request: Request,
+    params: intf_ch.ChatHistoryExportParams,
+):
+    """Stream every matching chat history record as NDJSON, oldest first, gzip or zstd if accepted."""
+    columns = project_columns(params.fields, intf_ch.RESULT_COLS, ("id", "timestamp"))
+    where = {"session_id": params.session_id, "message_type": params.message_type}
+
+    async def fetch_chunk(cursor):
+        return await db_as.export_chat_history_db(
+            columns, dict(where), params.since, params.until, cursor
         )
-        return {"status": "success", "data": results, "total_items": count}
 
+    return export_response(fetch_chunk, request.headers.get("accept-encoding", ""))
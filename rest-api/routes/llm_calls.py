@@ -0,0 +1,50 @@
+import db.llm_calls        as db_lc
+import interface.llm_calls as intf_lc
+
+from fastapi        import APIRouter, Request
+from utils.response import RowJSONResponse
+from utils.utils    import X_API_KEY_DEPS
+
+router = APIRouter()
+
+
+@router.post("/api_v1/llm_calls/create_batch")
+async def create_llm_calls(
+    _x_api_key: X_API_KEY_DEPS, request: Request, params: intf_lc.LLMCallBatchParams
+):
+    """Store a batch of LLM call telemetry records."""
+    records = [record.__dict__ for record in params.records]
+    if records:
+        await db_lc.insert_llm_calls_db(records)
+    return {
+        "status": "success",
+        "msg": "llm calls inserted",
+        "data": {"inserted": len(records)},
+    }
+
+
+@router.post("/api_v1/llm_calls/get")
+async def get_llm_calls(
+    _x_api_key: X_API_KEY_DEPS, request: Request, params: intf_lc.LLMCallQueryParams
+):
+    """Retrieve LLM call records, newest first."""
+    where = params.__dict__.copy()
+    pagination = {"page": where.pop("page"), "page_size": where.pop("page_size")}
+    count, results = await db_lc.get_all_llm_calls_db(intf_lc.RESULT_COLS, where, pagination)
+    return RowJSONResponse({"status": "success", "data": results, "total_items": count})
+
+
+@router.post("/api_v1/llm_calls/summary")
+async def get_llm_call_summary(
+    _x_api_key: X_API_KEY_DEPS, request: Request, params: intf_lc.LLMCallSummaryParams
+):
+    """Aggregate LLM call latency, tokens and cost, by stage and model by default."""
+    where = {
+        "session_id": params.session_id,
+        "stage": params.stage,
+        "model": params.model,
+    }
+    group_by = [col for col in intf_lc.GROUP_COLS if col in params.group_by]
+    group_by = group_by or ["stage", "model"]
+    results = await db_lc.get_llm_call_summary_db(group_by, where, params.since)
+    return {"status": "success", "data": results}
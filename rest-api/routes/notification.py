@@ -3,75 +3,77 @@ import logging
 import db.notification        as db_not
 import interface.notification as intf_not
 
-from fastapi import APIRouter, Request
-from utils.utils import X_API_KEY_DEPS
+from fastapi          import APIRouter, HTTPException, Request
+from utils.utils      import X_API_KEY_DEPS
+from utils.pagination import PAGINATION_FIELDS, page_response, pagination_params
+from utils.response   import RowJSONResponse, project_columns
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
 @router.post("/api_v1/notification/create")
-def create_notification(
+async def create_notification(
     _x_api_key: X_API_KEY_DEPS, request: Request, params: intf_not.NotificationsParams
 ):
     """Create a new notification record with duplicate prevention."""
     try:
         req_data = params.__dict__
         req_data["notification_id"] = str(uuid.uuid4())
-        # Insert notification with duplicate prevention
-        err = db_not.insert_notifications_prevent_duplicate_db(req_data)
-        if err == "success":
-            return {
-                "status": "success",
-                "msg": "notification inserted",
-                "data": {"notification_id": req_data["notification_id"]},
-            }
-        else:
-            return {"status": "error", "msg": err}
+        # Insert notification with duplicate prevention, a duplicate gets the stored notification's id
+        notification_id, inserted = await db_not.insert_notifications_prevent_duplicate_db(req_data)
+        return {
+            "status": "success",
+            "msg": "notification inserted" if inserted else "duplicate notification, already stored",
+            "data": {"notification_id": notification_id, "duplicate": not inserted},
+        }
     except Exception as e:
         return {"status": "error", "msg": str(e)}
 
 
 @router.post("/api_v1/notification/create_batch")
-def create_batch_notifications(
+async def create_batch_notifications(
     _x_api_key: X_API_KEY_DEPS,
     request: Request,
     params: intf_not.NotificationsBatchParams,
 ):
-    """Create multiple notification records in a single batch operation."""
+    """Create multiple notification records in a single transaction, skipping duplicates."""
     try:
-        # Convert the batch params to a dictionary
-        batch_data = {"notifications": []}
-        notification_ids = []
+        notifications = []
 
         # Process each notification in the batch
         for notification in params.notifications:
             # Convert Pydantic model to dict
             notification_dict = notification.dict()
             # Add notification_id
-            notification_id = str(uuid.uuid4())
-            notification_dict["notification_id"] = notification_id
-            # Add to batch data
-            batch_data["notifications"].append(notification_dict)
-            # Track IDs for response
-            notification_ids.append(notification_id)
-
-        # Process the batch
-        err = db_not.insert_notifications_batch_prevent_duplicate_db(batch_data)
-        if err == "success":
-            return {
-                "status": "success",
-                "msg": "notifications inserted",
-                "data": {"notification_ids": notification_ids},
-            }
-        else:
-            return {"status": "error", "msg": err}
+            notification_dict["notification_id"] = str(uuid.uuid4())
+            notifications.append(notification_dict)
+
+        # Notifications already stored are ignored by their dedup key
+        results = await db_not.insert_notifications_batch_db(notifications)
+        notification_ids = []
+        duplicate_ids = []
+        reported = set()
+        for notification_id, inserted in results:
+            if notification_id in reported:
+                continue  # Repeated within the batch, reported once with its first copy
+            reported.add(notification_id)
+            (notification_ids if inserted else duplicate_ids).append(notification_id)
+        return {
+            "status": "success",
+            "msg": "notifications inserted",
+            "data": {
+                "notification_ids": notification_ids,
+                "duplicate_ids": duplicate_ids,
+                "inserted": len(notification_ids),
+            },
+        }
     except Exception as e:
         return {"status": "error", "msg": str(e)}
 
 
 @router.post("/api_v1/notification/update")
-def update_notification(
+async def update_notification(
     _x_api_key: X_API_KEY_DEPS,
     request: Request,
     params: intf_not.NotificationsUpdateParams,
@@ -82,7 +84,7 @@ def update_notification(
         if not params.notification_id:
             return {"status": "error", "msg": "notification_id is required"}
         # Update notification in database using notification_id as filter
-        err = db_not.update_notifications_db(
+        err = await db_not.update_notifications_db(
             params.__dict__, {"notification_id": params.notification_id}
         )
         if err == "success":
@@ -94,44 +96,51 @@ def update_notification(
 
 
 @router.post("/api_v1/notification/get")
-def get_notification(
+async def get_notification(
     _x_api_key: X_API_KEY_DEPS,
     request: Request,
-    params: intf_not.NotificationsUpdateParams,
+    params: intf_not.NotificationsGetParams,
 ):
-    """Retrieve notification records based on provided parameters."""
+    """Retrieve notification records based on provided parameters, newest first."""
     try:
+        columns = project_columns(
+            params.fields, intf_not.RESULT_COLS, ("id", "notification_date")
+        )
         if params.notification_id:
-            status, count, results = db_not.get_all_notifications_db(
-                intf_not.RESULT_COLS, {"notification_id": params.notification_id}, {}
+            status, count, results, _ = await db_not.get_all_notifications_db(
+                columns, {"notification_id": params.notification_id}, {}
             )
-            if status == "success" and count > 0:
+            if status == "success" and results:
                 return {"status": "success", "data": results[0]}
             elif status == "success":
                 return {"status": "error", "msg": "notification not found"}
             else:
                 return {"status": "error", "msg": status}
         else:
-            status, count, results = db_not.get_all_notifications_db(
-                intf_not.RESULT_COLS, params.__dict__, {}
+            status, count, results, next_cursor = await db_not.get_all_notifications_db(
+                columns,
+                params.model_dump(exclude=PAGINATION_FIELDS),
+                pagination_params(params),
             )
             if status == "success":
-                return {"status": "success", "data": results, "total_items": count}
+                return page_response(results, count, next_cursor)
             else:
                 return {"status": "error", "msg": status}
+    except HTTPException:
+        raise
     except Exception as e:
         return {"status": "error", "msg": str(e)}
 
 
 @router.post("/api_v1/notification/get_v2")
-def get_notification(
+async def get_notification(
     _x_api_key: X_API_KEY_DEPS,
     request: Request,
     params: intf_not.NotificationsUpdateParamsv2,
 ):
     """Version 2 endpoint to retrieve notification records with additional filtering options."""
     if params.notification_id:
-        count, results = db_not.get_all_notifications_old_db(
+        count, results = await db_not.get_all_notifications_old_db(
             intf_not.RESULT_COLS, {"notification_id": params.notification_id}, {}
         )
         return {"status": "success", "data": results[0]}
@@ -144,28 +153,29 @@ def get_notification(
         del where_dict["sources"]
         del where_dict["limit"]
         # Get filtered notifications with pagination
-        count, results = db_not.get_all_notifications_db(
+        status, count, results, next_cursor = await db_not.get_all_notifications_db(
             intf_not.RESULT_COLS, params.__dict__, {"page_size": a}
         )
-        return {"status": "success", "data": results, "total_items": count}
+        return RowJSONResponse({"status": "success", "data": results, "next_cursor": next_cursor})
 
 
 @router.post("/api_v1/notification/get_v3")
-def get_notification(
+async def get_notification(
     _x_api_key: X_API_KEY_DEPS,
     request: Request,
     params: intf_not.NotificationsUpdateParamsv3,
 ):
     """Version 3 endpoint to retrieve notification records using specialized query method."""
     # Uses alfath query 
-    count, results = db_not.get_notifications_alfath(
-        intf_not.RESULT_COLS, params.sources, params.limit
+    columns = params.fields and project_columns(params.fields, intf_not.RESULT_COLS)
+    count, results = await db_not.get_notifications_alfath(
+        columns, params.sources, params.limit
     )
-    return {"status": "success", "data": results, "total_items": count}
+    return RowJSONResponse({"status": "success", "data": results, "total_items": count})
 
 
 @router.get("/api_v1/notification/debug")
-def debug_logging(_x_api_key: X_API_KEY_DEPS):
+async def debug_logging(_x_api_key: X_API_KEY_DEPS):
     """Debug endpoint to test logging functionality."""
     print("Direct print statement - should appear in console")
 
@@ -187,10 +197,10 @@ def debug_logging(_x_api_key: X_API_KEY_DEPS):
 
 
 @router.get("/api_v1/notification/sources")
-def get_rss_topics(_x_api_key: X_API_KEY_DEPS):
+async def get_rss_topics(_x_api_key: X_API_KEY_DEPS):
     """Get all available source notification from database"""
     try:
-        status, count, sources = db_not.get_notification_sources()
+        status, count, sources = await db_not.get_notification_sources()
         if status == "success":
             return {"status": "success", "total": count, "data": sources}
         else:
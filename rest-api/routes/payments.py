@@ -67,7 +67,7 @@ async def kill_agent_session(
     """
     try:
         # Get sessions directly from database
-        count, results = db_agent_sessions.get_all_agent_sessions_db(
+        count, results = await db_agent_sessions.get_all_agent_sessions_db(
             [
                 "id",
                 "session_id",
@@ -107,7 +107,7 @@ async def kill_agent_session(
 
         success = await kill_session(session_id)
         if success:
-            db_agent_sessions.update_agent_sessions_db(
+            await db_agent_sessions.update_agent_sessions_db(
                 {"status": "stopped", "ended_at": current_time},
                 {"session_id": session_id},
             )
@@ -131,7 +131,7 @@ async def kill_agent_session(
 
 
 @router.post("/api_v1/payments/topup")
-def topup(
+async def topup(
     _x_api_key: X_API_KEY_DEPS, request: Request, params: intf_payments.PaymentParams
 ):
     """
@@ -157,7 +157,7 @@ def topup(
     """
     try:
         # Get sessions directly from database
-        count, results = db_agent_sessions.get_all_agent_sessions_db(
+        count, results = await db_agent_sessions.get_all_agent_sessions_db(
             [
                 "id",
                 "session_id",
@@ -191,10 +191,10 @@ def topup(
         if not payment_data.get("transaction_id"):
             payment_data["transaction_id"] = str(uuid.uuid4())
         payment_data["created_at"] = datetime.now()
-        db_payments.insert_payments(payment_data)
+        await db_payments.insert_payments(payment_data)
 
         # Update agent session with new end time
-        db_agent_sessions.update_agent_sessions_db(
+        await db_agent_sessions.update_agent_sessions_db(
             {"will_end_at": new_will_end_at}, {"session_id": session["session_id"]}
         )
 
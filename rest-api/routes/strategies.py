@@ -2,20 +2,40 @@ import uuid
 import db.strategies        as db_st
 import interface.strategies as intf_st
 
-from fastapi     import APIRouter, Request
-from utils.utils import X_API_KEY_DEPS
+from fastapi          import APIRouter, HTTPException, Request
+from utils            import codec
+from utils.utils      import X_API_KEY_DEPS
+from utils.export     import export_response
+from utils.pagination import PAGINATION_FIELDS, page_response, pagination_params
+from utils.response   import RowJSONResponse, project_columns
 
 router = APIRouter()
 
 
+def transcode_parameters(results, payload_format):
+    """Re-encode the `parameters` payload of strategy rows in the requested format."""
+    if not payload_format:
+        return results
+    try:
+        transcoded = []
+        for row in results:
+            row = dict(row)
+            if row.get("parameters"):
+                row["parameters"] = codec.transcode(row["parameters"], payload_format)
+            transcoded.append(row)
+        return transcoded
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Cannot transcode parameters: {e}")
+
+
 @router.post("/api_v1/strategies/create")
-def create_strategies(
+async def create_strategies(
     _x_api_key: X_API_KEY_DEPS, request: Request, params: intf_st.StrategyParams
 ):
     """Create a new strategy record."""
     req_data = params.__dict__
     req_data["strategy_id"] = str(uuid.uuid4())
-    db_st.insert_strategies_db(req_data)
+    await db_st.insert_strategies_db(req_data)
     return {
         "status": "success",
         "msg": "strategy inserted",
@@ -24,44 +44,97 @@ def create_strategies(
 
 
 @router.post("/api_v1/strategies/update")
-def update_strategies(
+async def update_strategies(
     _x_api_key: X_API_KEY_DEPS, request: Request, params: intf_st.StrategyUpdateParams
 ):
     """Update an existing strategy record."""
-    db_st.update_strategies_db(params.__dict__, {"strategy_id": params.strategy_id})
+    await db_st.update_strategies_db(params.__dict__, {"strategy_id": params.strategy_id})
     return {"status": "success", "msg": "strategy updated"}
 
 
 @router.post("/api_v1/strategies/get")
-def get_strategies(
-    _x_api_key: X_API_KEY_DEPS, request: Request, params: intf_st.StrategyUpdateParams
+async def get_strategies(
+    _x_api_key: X_API_KEY_DEPS, request: Request, params: intf_st.StrategyGetParams
 ):
-    """Retrieve strategy records based on provided parameters."""
+    """Retrieve strategy records based on provided parameters, newest first."""
+    where = params.model_dump(exclude={"payload_format"} | PAGINATION_FIELDS)
+    columns = project_columns(params.fields, intf_st.RESULT_COLS, ("id", "created_at"))
     if params.strategy_id:
-        count, results = db_st.get_all_strategies_db(
-            intf_st.RESULT_COLS, {"strategy_id": params.strategy_id}, {}
+        count, results, _ = await db_st.get_all_strategies_db(
+            columns, {"strategy_id": params.strategy_id}, {}
         )
+        results = transcode_parameters(results, params.payload_format)
         return {"status": "success", "data": results[0]}
     else:
-        count, results = db_st.get_all_strategies_db(
-            intf_st.RESULT_COLS, params.__dict__, {}
+        count, results, next_cursor = await db_st.get_all_strategies_db(
+            columns, where, pagination_params(params)
         )
-        return {"status": "success", "data": results, "total_items": count}
+        results = transcode_parameters(results, params.payload_format)
+        return page_response(results, count, next_cursor)
 
 
 @router.post("/api_v1/strategies/get_2")
-def get_strategies_2(
-    _x_api_key: X_API_KEY_DEPS, request: Request, params: intf_st.StrategyUpdateParams
+async def get_strategies_2(
+    _x_api_key: X_API_KEY_DEPS, request: Request, params: intf_st.StrategyGetParams
 ):
-    """Alternative endpoint to retrieve strategy records using a different database method."""
+    """
+    Alternative endpoint to retrieve strategy records, kept for older clients.
+
+    Same records as /strategies/get, in the response shape it always had: a single
+    object for a `strategy_id`, else the newest `page_size` strategies with their
+    `total_items` and no cursor.
+    """
     if params.strategy_id:
-        count, results = db_st.get_all_strategies_db_2(
-            intf_st.RESULT_COLS, {"strategy_id": params.strategy_id}, {}
-        )
-        return {"status": "success", "data": results[0]}
-    else:
-        count, results = db_st.get_all_strategies_db_2(
-            intf_st.RESULT_COLS, params.__dict__, {}
+        return await get_strategies(_x_api_key, request, params)
+    where = params.model_dump(exclude={"payload_format"} | PAGINATION_FIELDS)
+    columns = project_columns(params.fields, intf_st.RESULT_COLS, ("id", "created_at"))
+    count, results, _ = await db_st.get_all_strategies_db(
+        columns, where, {**pagination_params(params), "with_total": True}
+    )
+    results = transcode_parameters(results, params.payload_format)
+    return RowJSONResponse({"status": "success", "data": results, "total_items": count})
+
+
+@router.post("/api_v1/strategies/get_by_agent")
+async def get_agent_strategies(
+    _x_api_key: X_API_KEY_DEPS, request: Request, params: intf_st.StrategyAgentParams
+):
+    """Retrieve the strategies of an agent, newest first."""
+    results = await db_st.get_agent_strategies_db(
+        project_columns(params.fields, intf_st.RESULT_COLS), params.agent_id, params.limit
+    )
+    results = transcode_parameters(results, params.payload_format)
+    return RowJSONResponse({"status": "success", "data": results})
+
+
+@router.post("/api_v1/strategies/latest")
+async def get_latest_strategy(
+    _x_api_key: X_API_KEY_DEPS, request: Request, params: intf_st.StrategyLatestParams
+):
+    """Retrieve the most recent strategy of an agent, null if it has none."""
+    results = await db_st.get_agent_strategies_db(intf_st.RESULT_COLS, params.agent_id, 1)
+    results = transcode_parameters(results, params.payload_format)
+    return {"status": "success", "data": results[0] if results else None}
+
+
+@router.post("/api_v1/strategies/export")
+async def export_strategies(
+    _x_api_key: X_API_KEY_DEPS, request: Request, params: intf_st.StrategyExportParams
+):
+    """Stream every matching strategy as NDJSON, oldest first, gzip or zstd if accepted."""
+    columns = project_columns(params.fields, intf_st.RESULT_COLS, ("id", "created_at"))
+    where = {"agent_id": params.agent_id, "strategy_result": params.strategy_result}
+    if params.payload_format:
+        # Fail before streaming starts, the status cannot change afterwards
+        try:
+            codec.check_format(params.payload_format)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    async def fetch_chunk(cursor):
+        rows, next_cursor = await db_st.export_strategies_db(
+            columns, dict(where), params.since, params.until, cursor
         )
-        return {"status": "success", "data": results, "total_items": count}
+        return transcode_parameters(rows, params.payload_format), next_cursor
 
+    return export_response(fetch_chunk, request.headers.get("accept-encoding", ""))
@@ -1,3 +1,5 @@
 #!/bin/bash
 
+python migrations.py || exit 1
+
 exec uvicorn routes.api:app --host 0.0.0.0 --port 9020
@@ -0,0 +1,287 @@
+"""
+In-process cache of the hot read endpoints.
+
+Agents poll the same records between writes: their agent, their session and the
+latest notifications of the same sources. Responses of the endpoints in
+`CACHED_ENDPOINTS` are kept for `RESPONSE_CACHE_TTL_S` seconds, keyed on the
+endpoint, its normalized JSON body and the API key. A write through one of the
+`WRITE_ENDPOINTS` drops every cached response read from the tables it changes,
+and concurrent identical requests share one trip to the database.
+
+The cache lives in the API process, every worker has its own.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict, defaultdict
+
+from config import RESPONSE_CACHE_TTL_S, RESPONSE_CACHE_MAX_ENTRIES
+
+# Read endpoints whose responses are cached, and the tables they read
+CACHED_ENDPOINTS = {
+    "/api_v1/agent/get":               ("sup_agents",),
+    "/api_v1/agent_sessions/get":      ("sup_agent_sessions",),
+    "/api_v1/agent_sessions/get_v2":   ("sup_agent_sessions",),
+    "/api_v1/notification/get_v3":     ("sup_notifications",),
+    "/api_v1/notification/sources":    ("sup_notifications",),
+    "/api_v1/strategies/latest":       ("sup_strategies",),
+}
+
+# Endpoints that write, and the tables they change
+WRITE_ENDPOINTS = {
+    "/api_v1/agent/create":                ("sup_agents",),
+    "/api_v1/agent/update":                ("sup_agents",),
+    "/api_v1/agent_sessions/create":       ("sup_agent_sessions",),
+    "/api_v1/agent_sessions/update":       ("sup_agent_sessions",),
+    "/api_v1/agent_sessions/increment":    ("sup_agent_sessions",),
+    "/api_v1/payments/kill_session":       ("sup_agent_sessions",),
+    "/api_v1/payments/topup":              ("sup_agent_sessions",),
+    "/api_v1/notification/create":         ("sup_notifications",),
+    "/api_v1/notification/create_batch":   ("sup_notifications",),
+    "/api_v1/notification/update":         ("sup_notifications",),
+    "/api_v1/strategies/create":           ("sup_strategies",),
+    "/api_v1/strategies/update":           ("sup_strategies",),
+}
+
+
+class CachedResponse:
+    __slots__ = ("status", "headers", "body", "tables", "expires_at")
+
+    def __init__(self, status, headers, body, tables, expires_at):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.tables = tables
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """TTL and LRU bounded responses, invalidated per table."""
+
+    def __init__(self, ttl: float = RESPONSE_CACHE_TTL_S, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.keys_by_table = defaultdict(set)
+        # Bumped on every write, a read only stores its response if no write
+        # to its tables finished while it ran
+        self.generations = defaultdict(int)
+        self.inflight = {}
+        self.counters = defaultdict(int)
+        self.endpoint_counters = defaultdict(lambda: defaultdict(int))
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def generation(self, tables) -> tuple:
+        return tuple(self.generations[table] for table in tables)
+
+    def put(self, key, entry: CachedResponse):
+        if key in self.entries:
+            self._remove(key)
+        self.entries[key] = entry
+        for table in entry.tables:
+            self.keys_by_table[table].add(key)
+        while len(self.entries) > self.max_entries:
+            self._remove(next(iter(self.entries)))
+            self.counters["evictions"] += 1
+
+    def invalidate(self, tables):
+        """Drop every response read from `tables`."""
+        for table in tables:
+            self.generations[table] += 1
+            for key in list(self.keys_by_table.pop(table, ())):
+                self._remove(key)
+                self.counters["invalidations"] += 1
+
+    def _remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        for table in entry.tables:
+            keys = self.keys_by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+
+    def record(self, path: str, outcome: str):
+        self.counters[outcome] += 1
+        self.endpoint_counters[path][outcome] += 1
+
+    def stats(self) -> dict:
+        """Hit ratio overall and per endpoint, coalesced requests count as hits."""
+
+        def ratio(counters):
+            served = counters["hits"] + counters["coalesced"]
+            total = served + counters["misses"]
+            return round(served / total, 4) if total else None
+
+        return {
+            "enabled": self.enabled,
+            "ttl_s": self.ttl,
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.counters["hits"],
+            "coalesced": self.counters["coalesced"],
+            "misses": self.counters["misses"],
+            "invalidations": self.counters["invalidations"],
+            "evictions": self.counters["evictions"],
+            "hit_ratio": ratio(self.counters),
+            "endpoints": {
+                path: {
+                    "hits": counters["hits"],
+                    "coalesced": counters["coalesced"],
+                    "misses": counters["misses"],
+                    "hit_ratio": ratio(counters),
+                }
+                for path, counters in self.endpoint_counters.items()
+            },
+        }
+
+
+response_cache = ResponseCache()
+
+
+def cache_key(scope, body: bytes):
+    """Endpoint, query string, API key and JSON body with sorted keys, None if the body is not JSON."""
+    try:
+        params = json.loads(body) if body else None
+    except ValueError:
+        return None
+    headers = dict(scope["headers"])
+    raw = json.dumps(
+        [
+            scope["method"],
+            scope["path"],
+            sorted(scope["query_string"].decode("latin-1").split("&")),
+            headers.get(b"x-api-key", b"").decode("latin-1"),
+            params,
+        ],
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+async def read_body(receive) -> bytes:
+    body = b""
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            return body
+        body += message.get("body", b"")
+        if not message.get("more_body", False):
+            return body
+
+
+def replay_body(body: bytes, receive):
+    """A `receive` handing the already read body to the app, then waiting on the client."""
+    sent = False
+
+    async def replay():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replay
+
+
+async def send_cached(send, entry: CachedResponse, outcome: str):
+    headers = [(k, v) for k, v in entry.headers if k != b"x-cache"]
+    headers.append((b"x-cache", outcome.encode()))
+    await send({"type": "http.response.start", "status": entry.status, "headers": headers})
+    await send({"type": "http.response.body", "body": entry.body})
+
+
+class ResponseCacheMiddleware:
+    """ASGI middleware serving `CACHED_ENDPOINTS` from `response_cache`, see the module docstring."""
+
+    def __init__(self, app, cache: ResponseCache = response_cache):
+        self.app = app
+        self.cache = cache
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.cache.enabled:
+            return await self.app(scope, receive, send)
+
+        path = scope["path"]
+        if path in WRITE_ENDPOINTS:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                # Even a failed write may have committed part of its changes
+                self.cache.invalidate(WRITE_ENDPOINTS[path])
+            return
+
+        tables = CACHED_ENDPOINTS.get(path)
+        if tables is None:
+            return await self.app(scope, receive, send)
+
+        body = await read_body(receive)
+        receive = replay_body(body, receive)
+        key = cache_key(scope, body)
+        if key is None:
+            return await self.app(scope, receive, send)
+
+        entry = self.cache.get(key)
+        if entry is not None:
+            self.cache.record(path, "hits")
+            return await send_cached(send, entry, "HIT")
+
+        leader = self.cache.inflight.get(key)
+        if leader is not None:
+            # The same request is already on its way to the database, share its response
+            entry = await asyncio.shield(leader)
+            if entry is not None:
+                self.cache.record(path, "coalesced")
+                return await send_cached(send, entry, "COALESCED")
+
+        self.cache.record(path, "misses")
+        await self._fetch(scope, receive, send, key, tables)
+
+    async def _fetch(self, scope, receive, send, key, tables):
+        """Run the endpoint, then cache its response if it succeeded and no write overtook it."""
+        generation = self.cache.generation(tables)
+        future = asyncio.get_running_loop().create_future()
+        self.cache.inflight.setdefault(key, future)
+        response = {"status": None, "headers": [], "body": b""}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = list(message.get("headers", []))
+                message = {**message, "headers": response["headers"] + [(b"x-cache", b"MISS")]}
+            elif message["type"] == "http.response.body":
+                response["body"] += message.get("body", b"")
+            await send(message)
+
+        entry = None
+        try:
+            await self.app(scope, receive, capture)
+            if response["status"] == 200 and self.cache.generation(tables) == generation:
+                entry = CachedResponse(
+                    response["status"],
+                    response["headers"],
+                    response["body"],
+                    tables,
+                    time.monotonic() + self.cache.ttl,
+                )
+                self.cache.put(key, entry)
+        finally:
+            if self.cache.inflight.get(key) is future:
+                del self.cache.inflight[key]
+            future.set_result(entry)
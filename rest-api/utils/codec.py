@@ -0,0 +1,146 @@
+"""
+Codec for the JSON payloads stored as strings: strategy `parameters` and the
+`strategy_data` kept in the RAG metadata.
+
+Payloads keep travelling as strings through the REST API, its TEXT columns and
+the RAG docstore, so every service can pass them through untouched. A payload
+encoded with a non-JSON format starts with a version header:
+
+    sa1:orjson:{"apis": [...], ...}
+    sa1:msgpack:eJxrYJmZmZ...     (msgpack, zlib-compressed, base64-encoded)
+
+Payloads without a header are plain JSON, so rows written before the codec
+existed still decode. This file, `agent/src/codec.py`, is the source: the REST
+API (`utils/codec.py`) and the RAG API (`codec.py`) ship copies of it written by
+`sync_codec.py` at the repository root. Edit it here only, then run that script;
+`python sync_codec.py --check` fails while a copy differs.
+
+`orjson` and `msgpack` are optional dependencies, only needed to write or read
+payloads in their format.
+"""
+
+import base64
+import json
+import zlib
+from typing import Any, Literal
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional
+    msgpack = None
+
+CODEC_VERSION = 1
+HEADER_PREFIX = "sa"
+
+PayloadFormat = Literal["json", "orjson", "msgpack"]
+PAYLOAD_FORMATS = ("json", "orjson", "msgpack")
+
+
+def check_format(fmt: str) -> None:
+    """
+    Check that a payload format is known and its library is installed.
+
+    Args:
+        fmt (str): One of `PAYLOAD_FORMATS`
+
+    Raises:
+        ValueError: If the format is unknown or its library is missing
+    """
+    if fmt not in PAYLOAD_FORMATS:
+        raise ValueError(f"Unknown payload format {fmt!r}, expected one of {PAYLOAD_FORMATS}")
+    if fmt == "orjson" and orjson is None:
+        raise ValueError("Payload format 'orjson' needs the orjson package")
+    if fmt == "msgpack" and msgpack is None:
+        raise ValueError("Payload format 'msgpack' needs the msgpack package")
+
+
+def encode(value: Any, fmt: PayloadFormat = "json") -> str:
+    """
+    Encode a JSON-compatible value into a payload string.
+
+    Args:
+        value (Any): Value to encode, e.g. strategy parameters
+        fmt (PayloadFormat): "json" for a plain JSON string, "orjson" or "msgpack" for a headed payload
+
+    Raises:
+        ValueError: If the format is unknown or its library is missing
+
+    Returns:
+        str: The payload
+    """
+    check_format(fmt)
+    if fmt == "json":
+        return json.dumps(value)
+
+    header = f"{HEADER_PREFIX}{CODEC_VERSION}:{fmt}:"
+    if fmt == "orjson":
+        return header + orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    packed = msgpack.packb(value, use_bin_type=True)
+    return header + base64.b64encode(zlib.compress(packed)).decode("ascii")
+
+
+def payload_format(payload: str) -> str:
+    """
+    Get the format a payload was encoded with.
+
+    Args:
+        payload (str): The payload
+
+    Returns:
+        str: "json" for payloads without a header, otherwise the header's format
+    """
+    if not payload.startswith(HEADER_PREFIX):
+        return "json"
+    parts = payload.split(":", 2)
+    return parts[1] if len(parts) == 3 else "json"
+
+
+def decode(payload: str) -> Any:
+    """
+    Decode a payload string, with or without a header.
+
+    Args:
+        payload (str): The payload
+
+    Raises:
+        ValueError: If the payload is malformed, was written by a newer codec
+            version, or its format's library is missing
+
+    Returns:
+        Any: The decoded value
+    """
+    if not payload.startswith(HEADER_PREFIX):
+        return json.loads(payload)
+
+    version, fmt, body = payload.split(":", 2)
+    if version != f"{HEADER_PREFIX}{CODEC_VERSION}":
+        raise ValueError(f"Unsupported payload version {version!r}")
+    check_format(fmt)
+
+    if fmt == "orjson":
+        return orjson.loads(body)
+    if fmt == "msgpack":
+        return msgpack.unpackb(zlib.decompress(base64.b64decode(body)), raw=False)
+    return json.loads(body)
+
+
+def transcode(payload: str, fmt: PayloadFormat = "json") -> str:
+    """
+    Re-encode a payload in another format, e.g. to serve JSON to clients without the codec.
+
+    Args:
+        payload (str): The payload
+        fmt (PayloadFormat): Format to re-encode into
+
+    Returns:
+        str: The payload in the requested format, unchanged if it already is
+    """
+    if payload_format(payload) == fmt:
+        return payload
+    return encode(decode(payload), fmt)
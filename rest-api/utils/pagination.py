@@ -0,0 +1,134 @@
+"""
+Keyset pagination on (timestamp, id).
+
+Pages are read by seeking past the last row of the previous page instead of
+skipping rows with OFFSET, so every page costs the same on an index whose
+last column is the timestamp (the rowid `id` is implicitly part of every
+SQLite index). The position is handed to clients as an opaque cursor.
+"""
+
+import base64
+import json
+
+from fastapi        import HTTPException
+from utils.response import RowJSONResponse
+
+DEFAULT_PAGE_SIZE = 800
+
+# Request fields that select the page and its columns rather than filter the rows
+PAGINATION_FIELDS = {"cursor", "page_size", "include_total", "fields"}
+
+
+def pagination_params(params) -> dict:
+    """Read the keyset pagination fields of a request model."""
+    return {
+        "cursor": params.cursor,
+        "page_size": params.page_size,
+        "with_total": params.include_total,
+    }
+
+
+def page_response(results, count, next_cursor) -> RowJSONResponse:
+    """Build the response of a paginated query, `total_items` only when it was counted."""
+    response = {"status": "success", "data": results, "next_cursor": next_cursor}
+    if count is not None:
+        response["total_items"] = count
+    return RowJSONResponse(response)
+
+
+def encode_cursor(timestamp, row_id) -> str:
+    """Encode the position after a row as an opaque cursor."""
+    raw = json.dumps([timestamp, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """Decode a cursor from `encode_cursor`, a malformed one is a 400."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, row_id = json.loads(raw)
+        if not isinstance(row_id, int):
+            raise ValueError(cursor)
+        if timestamp is not None and not isinstance(timestamp, (str, int, float)):
+            raise ValueError(cursor)
+        return timestamp, row_id
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def time_range(timestamp_col: str, since=None, until=None) -> tuple:
+    """Condition keeping rows with `since <= timestamp < until`, either bound optional, and its values."""
+    conditions = []
+    values = []
+    if since is not None:
+        conditions.append(f"{timestamp_col} >= ?")
+        values.append(since)
+    if until is not None:
+        conditions.append(f"{timestamp_col} < ?")
+        values.append(until)
+    return " AND ".join(conditions), values
+
+
+def _segments(timestamp_col: str, descending: bool, page_cursor) -> list:
+    """
+    Conditions selecting the rows after the cursor, in page order.
+
+    A row value comparison lets SQLite seek the index, but never matches a NULL
+    timestamp. SQLite sorts NULLs first, so they are read as their own segment:
+    after every other row when descending, before them when ascending.
+    """
+    op = "<" if descending else ">"
+    if page_cursor is None:
+        return [("", [])]
+
+    timestamp, row_id = decode_cursor(page_cursor)
+    if timestamp is not None:
+        after = (f"({timestamp_col}, id) {op} (?, ?)", [timestamp, row_id])
+        if descending:
+            return [after, (f"{timestamp_col} IS NULL", [])]
+        return [after]
+
+    after_nulls = (f"{timestamp_col} IS NULL AND id {op} ?", [row_id])
+    if descending:
+        return [after_nulls]
+    return [after_nulls, (f"{timestamp_col} IS NOT NULL", [])]
+
+
+def fetch_keyset_page(
+    cursor,
+    table: str,
+    select_clause: str,
+    where_clause: str,
+    where_values: list,
+    timestamp_col: str,
+    descending: bool,
+    page_size: int,
+    page_cursor=None,
+) -> tuple:
+    """
+    Fetch one page of rows ordered by (timestamp, id), and the cursor to the next page.
+
+    The selected columns must include `id` and the timestamp column. Returns the
+    rows and the next cursor, None on the last page.
+    """
+    direction = "DESC" if descending else "ASC"
+    order_by = f"ORDER BY {timestamp_col} {direction}, id {direction}"
+
+    rows = []
+    for condition, values in _segments(timestamp_col, descending, page_cursor):
+        conditions = [c for c in (where_clause, condition) if c]
+        query = f"SELECT {select_clause} FROM {table}"
+        if conditions:
+            query += " WHERE " + " AND ".join(f"({c})" for c in conditions)
+        # One row past the page tells whether there is a next page
+        query += f" {order_by} LIMIT ?"
+        cursor.execute(query, where_values + values + [page_size + 1 - len(rows)])
+        rows += cursor.fetchall()
+        if len(rows) > page_size:
+            break
+
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    last = rows[-1]
+    return rows, encode_cursor(last[timestamp_col], last["id"])
@@ -0,0 +1,64 @@
+"""
+Shaping the responses of the get endpoints: column projection and fast JSON.
+
+FastAPI passes whatever a route returns through `jsonable_encoder`, which walks
+every value of every row in Python before the JSON is written. Routes that
+return many rows build a `RowJSONResponse` themselves instead, which serializes
+`sqlite3.Row`s in one pass with orjson.
+
+`orjson` is an optional dependency, without it the standard library encoder is
+used, still skipping `jsonable_encoder`.
+"""
+
+import json
+import sqlite3
+
+from fastapi           import HTTPException
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+
+def _row_to_dict(value):
+    if isinstance(value, sqlite3.Row):
+        return dict(zip(value.keys(), value))
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    """Serialize to compact JSON, `sqlite3.Row`s as objects."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_row_to_dict)
+    return json.dumps(
+        content, default=_row_to_dict, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class RowJSONResponse(JSONResponse):
+    """JSON response whose content may hold `sqlite3.Row`s, returned as objects."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def project_columns(fields, result_columns: list, required=("id",)) -> list:
+    """
+    Columns to select for a `fields` projection, in the order of `result_columns`.
+
+    `required` columns are always selected, e.g. those keyset pagination needs
+    to build the next cursor. No projection selects every result column.
+    Unknown fields are a 400.
+    """
+    if not fields:
+        return result_columns
+    unknown = set(fields) - set(result_columns)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields {sorted(unknown)}, expected some of {result_columns}",
+        )
+    wanted = set(fields) | set(required)
+    return [col for col in result_columns if col in wanted]
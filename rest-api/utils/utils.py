@@ -1,11 +1,23 @@
+import asyncio
 import sqlite3
+import threading
 from typing            import Annotated
 from pathlib           import Path
-from functools         import wraps
+from functools         import partial, wraps
+from concurrent.futures import ThreadPoolExecutor
 from fastapi           import Header, HTTPException, Depends
 from fastapi.responses import JSONResponse
 
 from config import MYSQL_HOST, MYSQL_USER, MYSQL_PASSWORD, MYSQL_DATABASE, API_KEY
+from config import (
+    SQLITE_DB_FILE,
+    SQLITE_MMAP_SIZE,
+    SQLITE_CACHE_SIZE_KB,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_STATEMENT_CACHE,
+    SQLITE_DB_WORKERS,
+    SQLITE_DB_QUEUE_SIZE,
+)
 
 db_config = {
     "host":     MYSQL_HOST,
@@ -14,27 +26,139 @@ db_config = {
     "database": MYSQL_DATABASE,
 }
 
+# DB functions run on a small dedicated pool instead of the event loop or
+# Starlette's threadpool, each of its threads keeps one long-lived connection
+_db_executor = ThreadPoolExecutor(
+    max_workers=SQLITE_DB_WORKERS, thread_name_prefix="sqlite"
+)
+_db_pending = 0
+_local = threading.local()
+_connections = []
+_connections_lock = threading.Lock()
+
+
+def open_connection():
+    """
+    Open a SQLite connection tuned for many concurrent readers and one writer.
+    - WAL lets readers proceed while a write is in progress.
+    - synchronous=NORMAL only syncs at checkpoints, safe in WAL mode.
+    - Memory-mapped I/O and a larger page cache keep hot pages out of syscalls.
+    - busy_timeout waits for the write lock instead of failing with "database is locked".
+    """
+    connection = sqlite3.connect(
+        SQLITE_DB_FILE,
+        timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+        cached_statements=SQLITE_STATEMENT_CACHE,
+        # Only its own thread uses a connection, this lets close_connections() reach them all
+        check_same_thread=False,
+    )
+    connection.row_factory = sqlite3.Row  # Enables dictionary-like row access
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.execute("PRAGMA synchronous = NORMAL")
+    connection.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+    connection.execute(f"PRAGMA cache_size = -{SQLITE_CACHE_SIZE_KB}")
+    connection.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+    connection.execute("PRAGMA temp_store = MEMORY")
+    return connection
+
+
+def get_connection():
+    """Return the calling thread's connection, opening it on first use."""
+    connection = getattr(_local, "connection", None)
+    if connection is None:
+        connection = open_connection()
+        _local.connection = connection
+        _local.depth = 0
+        with _connections_lock:
+            _connections.append(connection)
+    return connection
+
+
+def close_connections():
+    """Wait for the queued DB calls, then close every pooled connection, e.g. on shutdown."""
+    _db_executor.shutdown(wait=True)
+    with _connections_lock:
+        for connection in _connections:
+            connection.close()
+        _connections.clear()
+
+
+def _discard_connection():
+    connection = getattr(_local, "connection", None)
+    _local.connection = None
+    if connection is None:
+        return
+    with _connections_lock:
+        if connection in _connections:
+            _connections.remove(connection)
+    try:
+        connection.close()
+    except sqlite3.Error:
+        pass
+
+
+async def run_in_db_executor(func, *args, **kwargs):
+    """
+    Run a blocking DB call on the DB pool and wait for it without blocking the event loop.
+    Calls queued beyond SQLITE_DB_QUEUE_SIZE are refused with a 503 instead of piling up.
+    """
+    global _db_pending
+    if _db_pending >= SQLITE_DB_QUEUE_SIZE:
+        raise HTTPException(
+            status_code=503,
+            detail="Database busy, retry later",
+            headers={"Retry-After": "1"},
+        )
+
+    _db_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_db_executor, partial(func, *args, **kwargs))
+    finally:
+        _db_pending -= 1
+
+
 def db_connection_decorator(func):
+    """
+    Turns `func(cursor, ...)` into a coroutine function run on the DB pool, in a transaction.
+    The blocking version stays available as `.sync`, for DB functions calling each other.
+    """
+
     @wraps(func)
-    def wrapper(*args, **kwargs):
-        # Define SQLite database file path
-        connection = sqlite3.connect("database.db")
-        connection.row_factory = sqlite3.Row  # Enables dictionary-like row access
-        
+    def sync(*args, **kwargs):
+        connection = get_connection()
+        # Calls nested in another DB function join its transaction
+        outermost = _local.depth == 0
+        _local.depth += 1
+
+        cursor = connection.cursor()
         try:
-            cursor = connection.cursor()
             result = func(cursor, *args, **kwargs)
-            connection.commit()  # Commit changes if successful
+            if outermost:
+                connection.commit()  # Commit changes if successful
         except Exception as e:
-            connection.rollback()  # Rollback in case of error
+            if outermost:
+                try:
+                    connection.rollback()  # Rollback in case of error
+                except sqlite3.Error:
+                    # The connection itself is broken, open a new one next time
+                    _discard_connection()
             print(f"An error occurred: {e}")
             raise
         finally:
-            cursor.close()
-            connection.close()  # Ensure connection is closed
-        
+            _local.depth -= 1
+            try:
+                cursor.close()
+            except sqlite3.Error:
+                pass  # Its connection was discarded
+
         return result
-    
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_in_db_executor(sync, *args, **kwargs)
+
+    wrapper.sync = sync
     return wrapper
 
 
@@ -0,0 +1,51 @@
+"""
+Vendor the payload codec into the services that cannot import it.
+
+`agent/src/codec.py` is the only copy to edit. The REST API and the RAG API are
+built from their own directories, so each ships a copy of it, which this script
+writes and checks.
+
+Usage:
+    python sync_codec.py            # copy the codec over the vendored copies
+    python sync_codec.py --check    # fail if a vendored copy differs from the codec
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+SOURCE = ROOT / "agent" / "src" / "codec.py"
+VENDORED = [
+    ROOT / "rest-api" / "utils" / "codec.py",
+    ROOT / "rag-api" / "codec.py",
+]
+
+
+def stale_copies(source: bytes) -> list:
+    """Vendored copies that are missing or differ from `source`."""
+    return [path for path in VENDORED if not path.exists() or path.read_bytes() != source]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument("--check", action="store_true", help="Fail if a vendored copy differs from the codec")
+    args = parser.parse_args()
+
+    source = SOURCE.read_bytes()
+    stale = stale_copies(source)
+    if args.check:
+        for path in stale:
+            print(f"{path.relative_to(ROOT)} differs from {SOURCE.relative_to(ROOT)}")
+        print(f"{len(VENDORED) - len(stale)}/{len(VENDORED)} vendored copies up to date")
+        if stale:
+            print("Run `python sync_codec.py` and commit the copies")
+        sys.exit(1 if stale else 0)
+
+    for path in stale:
+        path.write_bytes(source)
+        print(f"Updated {path.relative_to(ROOT)}")
+
+
+if __name__ == "__main__":
+    main()